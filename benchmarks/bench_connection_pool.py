@@ -0,0 +1,126 @@
+"""Compare LLM request latency with and without keep-alive connection reuse.
+
+Run from the repository root::
+
+    python benchmarks/bench_connection_pool.py --requests 200
+
+A local HTTP/1.1 stub answers every request with a canned completion, so the
+numbers isolate client-side connection cost. Loopback TCP has no TLS handshake
+and near-zero RTT; savings against a remote HTTPS endpoint are much larger.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager  # noqa: E402
+from http_pool import ConnectionPool  # noqa: E402
+from llm_client import LLMClient  # noqa: E402
+from styles import StyleManager  # noqa: E402
+
+_COMPLETION = json.dumps(
+    {
+        "choices": [
+            {
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "pong"},
+            }
+        ]
+    }
+).encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls.
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(_COMPLETION)))
+        self.end_headers()
+        self.wfile.write(_COMPLETION)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def _client(config_dir: str, port: int, pool: ConnectionPool) -> LLMClient:
+    cfg = ConfigManager(os.path.join(config_dir, "config.json"))
+    cfg.update(
+        {
+            "llm": {
+                **cfg.get("llm"),
+                "base_url": f"http://127.0.0.1:{port}/v1",
+                "api_key": "benchmark",
+            }
+        }
+    )
+    return LLMClient(cfg, StyleManager(cfg), pool=pool)
+
+
+def _measure(client: LLMClient, requests: int) -> list[float]:
+    snapshot = client.prepare_connectivity()
+    latencies = []
+    for _index in range(requests):
+        started = time.perf_counter()
+        ok, text = client.run_connectivity(snapshot)
+        latencies.append(time.perf_counter() - started)
+        if not ok:
+            raise RuntimeError(text)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<12} mean {statistics.fmean(ordered) * 1000:7.3f} ms  "
+        f"p50 {statistics.median(ordered) * 1000:7.3f} ms  "
+        f"p99 {p99 * 1000:7.3f} ms"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            fresh = _client(config_dir, port, ConnectionPool(idle_timeout=0))
+            pooled = _client(config_dir, port, ConnectionPool())
+            try:
+                # Warm both paths so imports and the first accept do not skew results.
+                _measure(fresh, 5)
+                _measure(pooled, 5)
+                _report("no reuse", _measure(fresh, args.requests))
+                _report("keep-alive", _measure(pooled, args.requests))
+            finally:
+                fresh.close()
+                pooled.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""Compare rendering diagnostics with and without a shared line index.
+
+Run from the repository root::
+
+    python benchmarks/bench_source_index.py --megabytes 2 --diagnostics 100
+
+The baseline splits the whole source once per diagnostic, as the renderers did
+before :class:`diagnostics.SourceIndex`. Both paths render the same output.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diagnostics import (  # noqa: E402
+    CompileResult,
+    Diagnostic,
+    SourceIndex,
+    _caret,
+    render_diagnostics,
+)
+
+
+def _split_per_diagnostic(result: CompileResult, source_text: str) -> str:
+    blocks = []
+    for diagnostic in result.diagnostics:
+        snippet = source_text.split("\n")[diagnostic.line - 1]
+        blocks.append(
+            "\n".join(
+                (
+                    f'  File "<input>", line {diagnostic.line}',
+                    f"    {snippet}",
+                    f"    {_caret(diagnostic)}",
+                    f"LanguageError: {diagnostic.message}",
+                )
+            )
+        )
+    return "\n\n".join(blocks)
+
+
+def _fixture(megabytes: float, count: int) -> tuple[str, CompileResult]:
+    line = "The quick brown fox jumps over teh lazy dog near the river bank."
+    lines = [line] * max(1, int(megabytes * 1024 * 1024) // (len(line) + 1))
+    step = max(1, len(lines) // count)
+    diagnostics = tuple(
+        Diagnostic(number, 32, 35, "spelling", "error", "Possible typo", "teh", "the")
+        for number in range(1, len(lines) + 1, step)
+    )[:count]
+    return "\n".join(lines), CompileResult("en", diagnostics)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=2.0)
+    parser.add_argument("--diagnostics", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    source_text, result = _fixture(args.megabytes, args.diagnostics)
+    index = SourceIndex(source_text)
+    if _split_per_diagnostic(result, source_text) != render_diagnostics(
+        "Python", result, index
+    ):
+        raise RuntimeError("Renderers disagree")
+
+    cases = (
+        ("split each", lambda: _split_per_diagnostic(result, source_text)),
+        ("build index", lambda: SourceIndex(source_text)),
+        ("shared index", lambda: render_diagnostics("Python", result, index)),
+    )
+    print(
+        f"{len(source_text) / 1024 / 1024:.1f} MiB, "
+        f"{len(result.diagnostics)} diagnostics, best of {args.repeat}"
+    )
+    for label, case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f"{label:<13} {best * 1000:9.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+"""Drive LLM analyses at a target request rate and report throughput and latency.
+
+Run from the repository root::
+
+    python benchmarks/load_test.py --qps 50 --duration 20 \\
+        --latency lognormal:0.3:0.5 --faults 429=0.02,503=0.01 --seed 1
+
+Without ``--base-url`` the requests go to an in-process
+``benchmarks/stub_server.py``, which takes the same latency and fault options,
+so a run is reproducible offline. ``--llm-settings`` merges a JSON object into
+the ``llm`` configuration to compare client features such as retries,
+hedging, or streaming under the same load.
+
+Arrivals are open-loop: request ``i`` is due ``i / qps`` seconds after the
+start, or at Poisson-distributed times with ``--poisson``, whether or not
+earlier requests have finished. Latency counts from when a request was due,
+so a client that falls behind shows up as latency rather than as a lower
+offered rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager  # noqa: E402
+from file_ops import read_document  # noqa: E402
+from http_pool import ConnectionPool  # noqa: E402
+from llm_async import AsyncLLMClient  # noqa: E402
+from llm_client import LLMClient  # noqa: E402
+from stub_server import StubServer, behavior_arguments, behavior_from  # noqa: E402
+from styles import StyleManager  # noqa: E402
+
+_SAMPLE_TEXT = "\n".join(
+    (
+        "We recieve teh report every Monday morning.",
+        "The two teams work on seperate parts of the codebase.",
+        "An error occured while saving the file.",
+        "Please send it to the adress on the invoice.",
+    )
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _Sample:
+    latency: float
+    error: str | None
+
+
+def _schedule(qps: float, duration: float, poisson: bool, seed: int | None):
+    rng = random.Random(seed)
+    due = 0.0
+    count = 0
+    while True:
+        due = due + rng.expovariate(qps) if poisson else count / qps
+        if due >= duration:
+            return
+        count += 1
+        yield due
+
+
+def _error_label(error: BaseException) -> str:
+    label = f"{type(error).__name__}: {error}"
+    return label if len(label) <= 100 else label[:97] + "..."
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _run_sync(client: LLMClient, args: argparse.Namespace, text: str) -> list[_Sample]:
+    samples: list[_Sample] = []
+    lock = threading.Lock()
+
+    def analyze(due: float) -> None:
+        error = None
+        try:
+            client.run_analysis(client.prepare_analysis(args.profile, text))
+        except Exception as failure:
+            error = _error_label(failure)
+        sample = _Sample(time.perf_counter() - due, error)
+        with lock:
+            samples.append(sample)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        started = time.perf_counter()
+        for offset in _schedule(args.qps, args.duration, args.poisson, args.seed):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(analyze, started + offset)
+    return samples
+
+
+async def _run_async(
+    client: AsyncLLMClient, args: argparse.Namespace, text: str
+) -> list[_Sample]:
+    async def analyze(due: float) -> _Sample:
+        error = None
+        try:
+            await client.run_analysis(client.prepare_analysis(args.profile, text))
+        except Exception as failure:
+            error = _error_label(failure)
+        return _Sample(time.perf_counter() - due, error)
+
+    tasks = []
+    started = time.perf_counter()
+    for offset in _schedule(args.qps, args.duration, args.poisson, args.seed):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(analyze(started + offset)))
+    return list(await asyncio.gather(*tasks))
+
+
+def _report(samples: list[_Sample], elapsed: float, args: argparse.Namespace) -> None:
+    latencies = sorted(sample.latency for sample in samples if sample.error is None)
+    failures = Counter(sample.error for sample in samples if sample.error is not None)
+    print(
+        f"Offered {args.qps:g} req/s for {args.duration:g} s with the "
+        f"{args.client} client: {len(samples)} requests, {len(latencies)} ok, "
+        f"{len(samples) - len(latencies)} failed in {elapsed:.2f} s"
+    )
+    print(f"Throughput {len(latencies) / elapsed:.1f} ok/s")
+    if latencies:
+        print(
+            "Latency of successful requests from when each was due: "
+            f"p50 {_percentile(latencies, 0.50) * 1000:.1f} ms, "
+            f"p90 {_percentile(latencies, 0.90) * 1000:.1f} ms, "
+            f"p99 {_percentile(latencies, 0.99) * 1000:.1f} ms, "
+            f"max {latencies[-1] * 1000:.1f} ms"
+        )
+    for label, count in failures.most_common():
+        print(f"{count:>7}  {label}")
+
+
+def _llm_settings(args: argparse.Namespace, base_url: str) -> dict[str, Any]:
+    settings: dict[str, Any] = {
+        "base_url": base_url,
+        "api_key": args.api_key,
+        "stream": args.stream,
+    }
+    if args.llm_settings:
+        with open(args.llm_settings, encoding="utf-8") as handle:
+            overrides = json.load(handle)
+        if not isinstance(overrides, dict):
+            raise ValueError("--llm-settings must hold a JSON object")
+        settings.update(overrides)
+    return settings
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--qps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="most requests in flight"
+    )
+    parser.add_argument("--client", choices=("sync", "async"), default="sync")
+    parser.add_argument("--poisson", action="store_true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--profile", default="Python")
+    parser.add_argument("--text", metavar="FILE", help="document to analyze")
+    parser.add_argument(
+        "--base-url", help="real endpoint to load instead of the local stub"
+    )
+    parser.add_argument("--api-key", default="benchmark")
+    parser.add_argument(
+        "--llm-settings", metavar="FILE", help="JSON object merged into llm"
+    )
+    parser.add_argument(
+        "--metrics", metavar="FILE", help="write client metrics as Prometheus text"
+    )
+    behavior_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.qps <= 0 or args.duration <= 0 or args.concurrency <= 0:
+        parser.error("--qps, --duration, and --concurrency must be positive")
+    text = read_document(args.text).text if args.text else _SAMPLE_TEXT
+
+    server = None if args.base_url else StubServer(behavior_from(args)).start()
+    base_url = args.base_url or server.base_url
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            cfg = ConfigManager(os.path.join(config_dir, "config.json"))
+            cfg.update({"llm": {**cfg.get("llm"), **_llm_settings(args, base_url)}})
+            started = time.perf_counter()
+            if args.client == "sync":
+                pool = ConnectionPool(max_per_host=args.concurrency)
+                client = LLMClient(cfg, StyleManager(cfg), pool=pool)
+                try:
+                    samples = _run_sync(client, args, text)
+                finally:
+                    client.close()
+            else:
+
+                async def run() -> tuple[LLMClient, list[_Sample]]:
+                    async with AsyncLLMClient(
+                        cfg, StyleManager(cfg), max_concurrency=args.concurrency
+                    ) as async_client:
+                        return async_client.client, await _run_async(
+                            async_client, args, text
+                        )
+
+                client, samples = asyncio.run(run())
+            elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.close()
+
+    _report(samples, elapsed, args)
+    retries = client.retry_stats.stats()
+    print(
+        f"Client made {retries['attempts']} attempts, "
+        f"{retries['retries']} of them retries"
+    )
+    if server is not None:
+        print(f"Stub responses: {dict(sorted(server.stats().items()))}")
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as handle:
+            handle.write(client.metrics.prometheus_text())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
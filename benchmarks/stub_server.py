@@ -0,0 +1,514 @@
+"""A local OpenAI-compatible stand-in for an LLM endpoint, for offline load tests.
+
+Run from the repository root::
+
+    python benchmarks/stub_server.py --port 8000 --latency lognormal:0.8:0.5 \\
+        --faults 429=0.05,503=0.02,truncate=0.01 --seed 1
+
+and point ``llm.base_url`` at ``http://127.0.0.1:8000/v1``. The server answers
+``POST .../chat/completions`` with plain JSON or, when the request sets
+``"stream": true``, with server-sent events. By default each response reports
+the common misspellings in ``_TYPOS`` at their real coordinates, so analyses
+validate like real ones; ``--payload`` returns a fixed model reply instead.
+
+Latency specs are ``SECONDS``, ``constant:SECONDS``, ``uniform:LOW:HIGH``,
+``normal:MEAN:STDDEV``, ``lognormal:MEDIAN:SIGMA``, or ``exponential:MEAN``.
+Faults are ``KIND=PROBABILITY`` pairs drawn once per request, where KIND is an
+HTTP status (429, 500, 502, 503, 504), ``redirect``, ``truncate`` (the
+connection drops mid-body), ``length`` (a cut-off completion), or
+``content_filter``. A fixed ``--seed`` replays the same latencies and faults.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diagnostics import MAX_DIAGNOSTICS  # noqa: E402
+from token_budget import estimate_tokens  # noqa: E402
+
+FAULT_KINDS = (
+    "429",
+    "500",
+    "502",
+    "503",
+    "504",
+    "redirect",
+    "truncate",
+    "length",
+    "content_filter",
+)
+# Misspellings found by word and reported as the model would report them.
+_TYPOS = {
+    "teh": "the",
+    "recieve": "receive",
+    "seperate": "separate",
+    "occured": "occurred",
+    "definately": "definitely",
+    "wich": "which",
+    "untill": "until",
+    "adress": "address",
+}
+_TYPO_PATTERN = re.compile(r"\b(?:" + "|".join(_TYPOS) + r")\b")
+_LATENCY_ARITY = {
+    "constant": 1,
+    "uniform": 2,
+    "normal": 2,
+    "lognormal": 2,
+    "exponential": 1,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Latency:
+    """A delay distribution in seconds; samples are never negative."""
+
+    kind: str = "constant"
+    params: tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> Latency:
+        name, _, rest = spec.partition(":")
+        if not rest:
+            name, rest = "constant", spec
+        if name not in _LATENCY_ARITY:
+            raise ValueError(f"Unknown latency distribution: {name}")
+        try:
+            params = tuple(float(part) for part in rest.split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid latency parameters: {spec}") from None
+        if len(params) != _LATENCY_ARITY[name]:
+            raise ValueError(
+                f"Latency {name!r} takes {_LATENCY_ARITY[name]} parameters"
+            )
+        if any(not math.isfinite(value) or value < 0 for value in params):
+            raise ValueError("Latency parameters must be non-negative numbers")
+        return cls(name, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = median * math.exp(rng.gauss(0.0, sigma)) if median else 0.0
+        elif self.kind == "exponential":
+            mean = self.params[0]
+            value = rng.expovariate(1.0 / mean) if mean else 0.0
+        else:
+            value = self.params[0]
+        return max(0.0, value)
+
+
+def parse_faults(spec: str) -> dict[str, float]:
+    """Parse ``KIND=PROBABILITY`` pairs separated by commas."""
+
+    faults: dict[str, float] = {}
+    for part in filter(None, (item.strip() for item in spec.split(","))):
+        kind, separator, value = part.partition("=")
+        kind = kind.strip()
+        if not separator or kind not in FAULT_KINDS:
+            raise ValueError(f"Unknown fault: {part}")
+        try:
+            probability = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid fault probability: {part}") from None
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError(f"Fault probability must be in [0, 1]: {part}")
+        faults[kind] = probability
+    if sum(faults.values()) > 1.0:
+        raise ValueError("Fault probabilities add up to more than 1")
+    return faults
+
+
+@dataclass(frozen=True)
+class StubBehavior:
+    """How the stub server delays, breaks, and fills its responses.
+
+    ``latency`` delays each response's first byte; a streamed response then
+    waits ``chunk_latency`` before each further event of ``chunk_chars``
+    characters. ``payload`` replaces the generated model reply when set.
+    """
+
+    latency: Latency = field(default_factory=Latency)
+    chunk_latency: Latency = field(default_factory=Latency)
+    chunk_chars: int = 48
+    faults: Mapping[str, float] = field(default_factory=dict)
+    retry_after: float = 1.0
+    payload: str | None = None
+    seed: int | None = None
+
+
+def _documents(messages: Any) -> tuple[list[tuple[str, str]], bool] | None:
+    """Return ``(id, text)`` pairs the request asks about and if it is a batch."""
+
+    if not isinstance(messages, list) or not messages:
+        return None
+    content = messages[-1].get("content") if isinstance(messages[-1], dict) else None
+    try:
+        request = json.loads(content) if isinstance(content, str) else None
+    except ValueError:
+        return None
+    if not isinstance(request, dict):
+        return None
+    if isinstance(request.get("input_text"), str):
+        return [("", request["input_text"])], False
+    documents = request.get("documents")
+    if isinstance(documents, list):
+        pairs = [
+            (str(item.get("id", "")), str(item.get("text", "")))
+            for item in documents
+            if isinstance(item, dict)
+        ]
+        return pairs, True
+    return None
+
+
+def _typo_diagnostics(text: str) -> list[dict[str, Any]]:
+    diagnostics = []
+    for number, line in enumerate(text.split("\n"), start=1):
+        for match in _TYPO_PATTERN.finditer(line):
+            diagnostics.append(
+                {
+                    "line": number,
+                    "start_column": match.start() + 1,
+                    "end_column": match.end() + 1,
+                    "category": "spelling",
+                    "severity": "error",
+                    "message": f"Possible misspelling of '{_TYPOS[match[0]]}'",
+                    "original": match[0],
+                    "replacement": _TYPOS[match[0]],
+                    "explanation": "",
+                }
+            )
+            if len(diagnostics) == MAX_DIAGNOSTICS:
+                return diagnostics
+    return diagnostics
+
+
+def model_reply(messages: Any) -> str:
+    """Answer like a model that reports the misspellings in ``_TYPOS``."""
+
+    found = _documents(messages)
+    if found is None:
+        return "pong"
+    documents, batch = found
+    if not batch:
+        text = documents[0][1]
+        return json.dumps({"language": "en", "diagnostics": _typo_diagnostics(text)})
+    return json.dumps(
+        {
+            "documents": [
+                {
+                    "id": number,
+                    "language": "en",
+                    "diagnostics": _typo_diagnostics(text),
+                }
+                for number, text in documents
+            ]
+        }
+    )
+
+
+def _prompt_tokens(messages: Any) -> int:
+    if not isinstance(messages, list):
+        return 0
+    return sum(
+        estimate_tokens(json.dumps(message.get("content"), ensure_ascii=False))
+        for message in messages
+        if isinstance(message, dict)
+    )
+
+
+class StubServer(ThreadingHTTPServer):
+    """An OpenAI-compatible HTTP/1.1 server that serves from a daemon thread."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        behavior: StubBehavior | None = None,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+    ) -> None:
+        super().__init__(address, _StubHandler)
+        self.behavior = behavior or StubBehavior()
+        self._rng = random.Random(self.behavior.seed)
+        self._lock = threading.Lock()
+        self._outcomes: Counter[str] = Counter()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> StubServer:
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> StubServer:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def draw(self) -> tuple[str | None, float, random.Random]:
+        """Choose one request's fault and first-byte delay.
+
+        Returns a private generator seeded from the shared one for the
+        request's remaining draws, so that a seeded run is reproducible no
+        matter how request threads interleave afterwards.
+        """
+
+        behavior = self.behavior
+        with self._lock:
+            roll = self._rng.random()
+            delay = behavior.latency.sample(self._rng)
+            private = random.Random(self._rng.getrandbits(64))
+        fault = None
+        for kind, probability in behavior.faults.items():
+            roll -= probability
+            if roll < 0:
+                fault = kind
+                break
+        return fault, delay, private
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._outcomes[outcome] += 1
+
+    def stats(self) -> dict[str, int]:
+        """Count the responses served so far by outcome."""
+
+        with self._lock:
+            return dict(self._outcomes)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls.
+    disable_nagle_algorithm = True
+    server: StubServer
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if not self.path.split("?", 1)[0].endswith("/chat/completions"):
+            self._reply(404, {"error": {"message": "Not found"}})
+            return
+        if self.headers.get("Content-Encoding", "").lower() == "gzip":
+            raw = gzip.decompress(raw)
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            self._reply(400, {"error": {"message": "Request body is not JSON"}})
+            return
+        fault, delay, rng = self.server.draw()
+        time.sleep(delay)
+        self.server.record(fault or "ok")
+        if fault is not None and fault.isdigit():
+            headers = {"Retry-After": str(self.server.behavior.retry_after)}
+            message = f"Injected HTTP {fault}"
+            self._reply(int(fault), {"error": {"message": message}}, headers)
+            return
+        if fault == "redirect":
+            self._reply(307, {}, {"Location": self.path})
+            return
+        behavior = self.server.behavior
+        messages = request.get("messages")
+        content = behavior.payload
+        if content is None:
+            content = model_reply(messages)
+        finish = "stop"
+        if fault == "length":
+            content, finish = content[: len(content) // 2], "length"
+        elif fault == "content_filter":
+            content, finish = "", "content_filter"
+        usage = {
+            "prompt_tokens": _prompt_tokens(messages),
+            "completion_tokens": estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if request.get("stream") is True:
+            self._stream(content, finish, usage, rng, truncate=fault == "truncate")
+            return
+        completion = {
+            "object": "chat.completion",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": finish,
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": usage,
+        }
+        self._reply(200, completion, truncate=fault == "truncate")
+
+    def _reply(
+        self,
+        status: int,
+        payload: Mapping[str, Any],
+        headers: Mapping[str, str] | None = None,
+        *,
+        truncate: bool = False,
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if truncate:
+            # Promise the whole body, send half, and hang up.
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def _events(
+        self, content: str, finish: str, usage: Mapping[str, int]
+    ) -> Iterator[dict[str, Any]]:
+        size = max(1, self.server.behavior.chunk_chars)
+        yield {"choices": [{"index": 0, "delta": {"role": "assistant"}}]}
+        for start in range(0, len(content), size):
+            delta = {"content": content[start : start + size]}
+            yield {"choices": [{"index": 0, "delta": delta}]}
+        yield {"choices": [{"index": 0, "delta": {}, "finish_reason": finish}]}
+        yield {"choices": [], "usage": dict(usage)}
+
+    def _stream(
+        self,
+        content: str,
+        finish: str,
+        usage: Mapping[str, int],
+        rng: random.Random,
+        *,
+        truncate: bool,
+    ) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = list(self._events(content, finish, usage))
+        if truncate:
+            events = events[: max(1, len(events) // 2)]
+        for number, event in enumerate(events):
+            if number:
+                time.sleep(self.server.behavior.chunk_latency.sample(rng))
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+        if truncate:
+            self.close_connection = True
+            return
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+def behavior_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that build a :class:`StubBehavior` to ``parser``."""
+
+    parser.add_argument(
+        "--latency",
+        type=Latency.parse,
+        default=Latency(),
+        help="delay before each response's first byte (default 0)",
+    )
+    parser.add_argument(
+        "--chunk-latency",
+        type=Latency.parse,
+        default=Latency(),
+        help="delay between streamed events (default 0)",
+    )
+    parser.add_argument(
+        "--chunk-chars",
+        type=int,
+        default=48,
+        help="characters per streamed event",
+    )
+    parser.add_argument(
+        "--faults",
+        type=parse_faults,
+        default={},
+        help="comma-separated KIND=PROBABILITY pairs, for example 429=0.05",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=1.0,
+        help="Retry-After seconds sent with injected errors",
+    )
+    parser.add_argument(
+        "--payload",
+        metavar="FILE",
+        help="file whose text is every reply's model content",
+    )
+    parser.add_argument("--seed", type=int, help="seed for latencies and faults")
+
+
+def behavior_from(args: argparse.Namespace) -> StubBehavior:
+    payload = None
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as handle:
+            payload = handle.read()
+    return StubBehavior(
+        latency=args.latency,
+        chunk_latency=args.chunk_latency,
+        chunk_chars=args.chunk_chars,
+        faults=args.faults,
+        retry_after=args.retry_after,
+        payload=payload,
+        seed=args.seed,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    behavior_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = StubServer(behavior_from(args), (args.host, args.port))
+    print(f"Serving {server.base_url}/chat/completions; press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Responses: {server.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
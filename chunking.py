@@ -0,0 +1,217 @@
+"""Token-budgeted document chunks and remapping of their diagnostics."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+
+from diagnostics import CompileResult, Diagnostic, Rejection, canonical_diagnostics
+from token_budget import estimate_tokens
+
+# Boundaries from coarsest to finest. Each pattern matches the separator that a
+# chunk may end with, so every cut falls just after it.
+_BOUNDARIES = (
+    re.compile(r"\n[ \t]*\n\s*"),
+    re.compile(r"\n"),
+    re.compile(r"[.!?…]+[\"'”’)\]]*\s+|[。！？]+[」』”’）]*"),
+    re.compile(r"\s+"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    """A contiguous slice of a document and where it starts in the original.
+
+    ``line_offset`` counts the lines before the chunk's first line, and
+    ``column_offset`` counts the characters before the chunk on that line.
+    """
+
+    text: str
+    line_offset: int
+    column_offset: int
+
+
+def _cuts(text: str, start: int, end: int, level: int) -> list[tuple[int, int]]:
+    pieces: list[tuple[int, int]] = []
+    position = start
+    for match in _BOUNDARIES[level].finditer(text, start, end):
+        if match.end() < end:
+            pieces.append((position, match.end()))
+            position = match.end()
+    pieces.append((position, end))
+    return pieces
+
+
+def _split(
+    text: str, start: int, end: int, budget: int, level: int
+) -> list[tuple[int, int]]:
+    if estimate_tokens(text[start:end]) <= budget:
+        return [(start, end)]
+    if level >= len(_BOUNDARIES):
+        # No natural boundary is small enough; cut by characters as a last resort.
+        width = max(1, budget * 3)
+        spans = []
+        position = start
+        while position < end:
+            stop = position + width
+            while stop > position + 1 and estimate_tokens(text[position:stop]) > budget:
+                stop = position + max(1, (stop - position) * 3 // 4)
+            spans.append((position, min(stop, end)))
+            position = min(stop, end)
+        return spans
+
+    spans: list[tuple[int, int]] = []
+    current: tuple[int, int] | None = None
+    current_tokens = 0
+    for piece_start, piece_end in _cuts(text, start, end, level):
+        tokens = estimate_tokens(text[piece_start:piece_end])
+        if current is not None and current_tokens + tokens <= budget:
+            current = (current[0], piece_end)
+            current_tokens += tokens
+            continue
+        if current is not None:
+            spans.append(current)
+        if tokens > budget:
+            spans.extend(_split(text, piece_start, piece_end, budget, level + 1))
+            current, current_tokens = None, 0
+        else:
+            current, current_tokens = (piece_start, piece_end), tokens
+    if current is not None:
+        spans.append(current)
+    return spans
+
+
+def plan_chunks(text: str, max_tokens: int) -> tuple[Chunk, ...]:
+    """Split text at paragraph, line, sentence, then word boundaries.
+
+    Chunks are contiguous and together reproduce ``text`` exactly. A chunk is
+    only cut at a finer boundary when the coarser unit alone exceeds the budget.
+    """
+
+    if not isinstance(text, str):
+        raise TypeError("text must be a string")
+    if isinstance(max_tokens, bool) or not isinstance(max_tokens, int):
+        raise ValueError("max_tokens must be a positive integer")
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be a positive integer")
+    if not text:
+        return ()
+    chunks: list[Chunk] = []
+    line_offset = 0
+    line_start = 0
+    for start, end in _split(text, 0, len(text), max_tokens, 0):
+        chunks.append(Chunk(text[start:end], line_offset, start - line_start))
+        newlines = text.count("\n", start, end)
+        if newlines:
+            line_offset += newlines
+            line_start = text.rindex("\n", start, end) + 1
+    return tuple(chunks)
+
+
+def plan_batches(
+    sizes: Sequence[int], max_tokens: int, max_items: int
+) -> tuple[tuple[int, ...], ...]:
+    """Pack item indices into groups within a token budget and an item count.
+
+    Items are placed largest first into the first group with room left, which
+    keeps the number of groups close to the minimum. An item larger than the
+    budget gets a group of its own. Each group lists its indices in order.
+    """
+
+    for name, value in (("max_tokens", max_tokens), ("max_items", max_items)):
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise ValueError(f"{name} must be a positive integer")
+    groups: list[list[int]] = []
+    totals: list[int] = []
+    for index in sorted(range(len(sizes)), key=lambda item: -sizes[item]):
+        size = sizes[index]
+        for position, group in enumerate(groups):
+            if len(group) < max_items and totals[position] + size <= max_tokens:
+                group.append(index)
+                totals[position] += size
+                break
+        else:
+            groups.append([index])
+            totals.append(size)
+    return tuple(sorted(tuple(sorted(group)) for group in groups))
+
+
+def split_paragraphs(text: str) -> tuple[Chunk, ...]:
+    """Split text after each blank-line separator into contiguous paragraphs.
+
+    Every paragraph keeps its trailing separator up to its last line break, so
+    the paragraphs together reproduce ``text`` exactly and each starts at
+    column zero, indentation included.
+    """
+
+    if not isinstance(text, str):
+        raise TypeError("text must be a string")
+    paragraphs: list[Chunk] = []
+    line_offset = 0
+    start = 0
+    for match in _BOUNDARIES[0].finditer(text):
+        end = text.rindex("\n", match.start(), match.end()) + 1
+        paragraphs.append(Chunk(text[start:end], line_offset, 0))
+        line_offset += text.count("\n", start, end)
+        start = end
+    if start < len(text):
+        paragraphs.append(Chunk(text[start:], line_offset, 0))
+    return tuple(paragraphs)
+
+
+def offset_chunk(inner: Chunk, outer: Chunk) -> Chunk:
+    """Express a chunk of ``outer.text`` in the coordinates of outer's document."""
+
+    column = inner.column_offset
+    if inner.line_offset == 0:
+        column += outer.column_offset
+    return Chunk(inner.text, outer.line_offset + inner.line_offset, column)
+
+
+def remap_diagnostic(diagnostic: Diagnostic, chunk: Chunk) -> Diagnostic:
+    """Translate chunk-relative coordinates to the original document."""
+
+    shift = chunk.column_offset if diagnostic.line == 1 else 0
+    return replace(
+        diagnostic,
+        line=diagnostic.line + chunk.line_offset,
+        start_column=diagnostic.start_column + shift,
+        end_column=diagnostic.end_column + shift,
+    )
+
+
+def merge_chunk_results(
+    results: Iterable[tuple[Chunk, CompileResult]],
+) -> CompileResult:
+    """Combine per-chunk results into one result for the original document."""
+
+    languages: Counter[str] = Counter()
+    diagnostics: list[Diagnostic] = []
+    raw_responses: list[str] = []
+    rejected: list[Rejection] = []
+    for chunk, result in results:
+        languages[result.language] += len(chunk.text)
+        diagnostics.extend(remap_diagnostic(item, chunk) for item in result.diagnostics)
+        raw_responses.append(result.raw_response)
+        # Rejected items stay as the model wrote them, in chunk coordinates.
+        rejected.extend(result.rejected)
+    language = languages.most_common(1)[0][0] if languages else "und"
+    return CompileResult(
+        language,
+        canonical_diagnostics(diagnostics),
+        "\n".join(raw_responses),
+        tuple(rejected),
+    )
+
+
+def chunk_line_range(chunk: Chunk) -> tuple[int, int]:
+    """Return the first and last one-based original line covered by a chunk."""
+
+    first = chunk.line_offset + 1
+    newlines = chunk.text.count("\n")
+    # A trailing newline ends the chunk; the line after it belongs to the next one.
+    if newlines and chunk.text.endswith("\n"):
+        newlines -= 1
+    return first, first + newlines
@@ -0,0 +1,280 @@
+"""Per-endpoint circuit breakers that fail fast while an endpoint is down."""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from config_manager import APP_DIR
+from file_ops import _atomic_write
+
+CIRCUIT_PATH = os.path.join(APP_DIR, "circuits.json")
+DEFAULT_FAILURE_PERCENT = 50.0
+DEFAULT_SLOW_SECONDS = 60.0
+DEFAULT_SLOW_PERCENT = 100.0
+DEFAULT_MINIMUM_REQUESTS = 10
+DEFAULT_WINDOW_SECONDS = 60.0
+DEFAULT_OPEN_SECONDS = 30.0
+MAX_OPEN_SECONDS = 600.0
+MAX_STATE_BYTES = 256 * 1024
+# Saved circuits that expired this long ago belong to endpoints no longer used.
+STALE_SECONDS = 24 * 3600.0
+_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CircuitPolicy:
+    """When an endpoint's circuit opens and how long it stays open.
+
+    Within the last ``window_seconds``, and once at least
+    ``minimum_requests`` outcomes were seen, the circuit opens when
+    ``failure_percent`` of them failed or ``slow_percent`` of them took longer
+    than ``slow_seconds``. It then stays open for ``open_seconds``, doubling
+    each time a probe fails, up to :data:`MAX_OPEN_SECONDS`.
+    """
+
+    failure_percent: float = DEFAULT_FAILURE_PERCENT
+    slow_seconds: float = DEFAULT_SLOW_SECONDS
+    slow_percent: float = DEFAULT_SLOW_PERCENT
+    minimum_requests: int = DEFAULT_MINIMUM_REQUESTS
+    window_seconds: float = DEFAULT_WINDOW_SECONDS
+    open_seconds: float = DEFAULT_OPEN_SECONDS
+
+
+class _Circuit:
+    __slots__ = (
+        "state",
+        "outcomes",
+        "failures",
+        "slow",
+        "open_until",
+        "trips",
+        "probing",
+    )
+
+    def __init__(self) -> None:
+        self.state = "closed"
+        # (finished, failed, slow) for outcomes inside the policy window.
+        self.outcomes: deque[tuple[float, bool, bool]] = deque()
+        self.failures = 0
+        self.slow = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self.probing = False
+
+    def forget_before(self, cutoff: float) -> None:
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            _finished, failed, slow = self.outcomes.popleft()
+            self.failures -= failed
+            self.slow -= slow
+
+    def reset_window(self) -> None:
+        self.outcomes.clear()
+        self.failures = 0
+        self.slow = 0
+
+
+class CircuitBreakers:
+    """Closed, open, and half-open circuits keyed by endpoint URL.
+
+    A closed circuit admits every request and watches failure and slow-call
+    rates. An open one rejects requests immediately, so callers fail in
+    milliseconds instead of waiting out their timeout. Once the open period
+    ends, the circuit is half-open and admits a single probe: success closes
+    it, failure opens it again for twice as long.
+
+    With a ``path``, open and half-open circuits are saved whenever they
+    change state and restored on the next start, so an endpoint known to be
+    down is not hit again by every launch before its open period ends.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = os.path.abspath(os.fspath(path)) if path else None
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _Circuit] = {}
+        self.rejected = 0
+        if self.path is not None:
+            self._load()
+
+    def _circuit_locked(self, key: str) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit()
+        return circuit
+
+    def allow(self, key: str) -> bool:
+        """Admit one request to ``key``; False means fail fast.
+
+        An admitted request must be reported through :meth:`record`, even
+        when it is abandoned, so that a half-open probe is not held forever.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit_locked(key)
+            if circuit.state == "open" and circuit.open_until <= now:
+                circuit.state = "half_open"
+                circuit.probing = False
+            if circuit.state == "closed":
+                return True
+            if circuit.state == "half_open" and not circuit.probing:
+                circuit.probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(
+        self,
+        key: str,
+        policy: CircuitPolicy,
+        elapsed: float,
+        *,
+        healthy: bool | None,
+    ) -> None:
+        """Report an outcome; ``healthy`` None means it says nothing about health."""
+
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit_locked(key)
+            if healthy is None:
+                if circuit.state == "half_open":
+                    circuit.probing = False
+                return
+            slow = elapsed > policy.slow_seconds
+            if circuit.state != "closed":
+                # A probe, or a request admitted before the circuit opened.
+                if healthy and not slow:
+                    self._close_locked(circuit)
+                elif circuit.state == "half_open":
+                    self._open_locked(circuit, policy, now)
+                return
+            circuit.forget_before(now - policy.window_seconds)
+            circuit.outcomes.append((now, not healthy, slow))
+            circuit.failures += not healthy
+            circuit.slow += slow
+            total = len(circuit.outcomes)
+            if total < policy.minimum_requests:
+                return
+            if (
+                circuit.failures * 100 >= policy.failure_percent * total
+                or circuit.slow * 100 >= policy.slow_percent * total
+            ):
+                self._open_locked(circuit, policy, now)
+
+    def _open_locked(
+        self, circuit: _Circuit, policy: CircuitPolicy, now: float
+    ) -> None:
+        circuit.trips += 1
+        period = policy.open_seconds * 2 ** min(circuit.trips - 1, 16)
+        circuit.state = "open"
+        circuit.open_until = now + min(period, MAX_OPEN_SECONDS)
+        circuit.probing = False
+        circuit.reset_window()
+        self._save_locked()
+
+    def _close_locked(self, circuit: _Circuit) -> None:
+        circuit.state = "closed"
+        circuit.open_until = 0.0
+        circuit.trips = 0
+        circuit.probing = False
+        circuit.reset_window()
+        self._save_locked()
+
+    def state(self, key: str) -> tuple[str, float]:
+        """Return the circuit state for ``key`` and seconds until it may probe."""
+
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return "closed", 0.0
+            if circuit.state == "open" and circuit.open_until <= now:
+                return "half_open", 0.0
+            return circuit.state, max(0.0, circuit.open_until - now)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "rb") as source:
+                raw = source.read(MAX_STATE_BYTES + 1)
+            if len(raw) > MAX_STATE_BYTES:
+                return
+            data = json.loads(raw.decode("utf-8"))
+        except (OSError, UnicodeError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != _FORMAT_VERSION:
+            return
+        circuits = data.get("circuits")
+        if not isinstance(circuits, dict):
+            return
+        wall = time.time()
+        now = time.monotonic()
+        for key, entry in circuits.items():
+            if not isinstance(key, str) or not isinstance(entry, dict):
+                continue
+            open_until = entry.get("open_until")
+            trips = entry.get("trips")
+            if (
+                isinstance(open_until, bool)
+                or not isinstance(open_until, (int, float))
+                or not math.isfinite(open_until)
+                or isinstance(trips, bool)
+                or not isinstance(trips, int)
+                or trips < 1
+                or open_until < wall - STALE_SECONDS
+            ):
+                continue
+            circuit = self._circuit_locked(key)
+            circuit.state = "open"
+            circuit.trips = trips
+            # Never trust a clock jump to keep an endpoint out for longer.
+            remaining = min(max(0.0, open_until - wall), MAX_OPEN_SECONDS)
+            circuit.open_until = now + remaining
+
+    def _save_locked(self) -> None:
+        if self.path is None:
+            return
+        wall = time.time()
+        now = time.monotonic()
+        circuits = {
+            key: {
+                "open_until": wall + max(0.0, circuit.open_until - now),
+                "trips": circuit.trips,
+            }
+            for key, circuit in self._circuits.items()
+            if circuit.state != "closed"
+        }
+        payload = json.dumps(
+            {"version": _FORMAT_VERSION, "circuits": circuits},
+            ensure_ascii=False,
+            allow_nan=False,
+        ).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            _atomic_write(self.path, payload)
+        except OSError:
+            # The breaker still protects this session; persistence is best effort.
+            pass
+
+    def stats(self) -> dict[str, dict[str, float | str]]:
+        now = time.monotonic()
+        with self._lock:
+            stats: dict[str, dict[str, float | str]] = {}
+            for key, circuit in self._circuits.items():
+                state = circuit.state
+                if state == "open" and circuit.open_until <= now:
+                    state = "half_open"
+                total = len(circuit.outcomes)
+                stats[key] = {
+                    "state": state,
+                    "requests": total,
+                    "failure_percent": circuit.failures * 100 / total if total else 0.0,
+                    "slow_percent": circuit.slow * 100 / total if total else 0.0,
+                    "open_for": max(0.0, circuit.open_until - now),
+                    "trips": circuit.trips,
+                }
+            return stats
@@ -31,8 +31,53 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "max_tokens": 900,
         "token_parameter": "max_tokens",
         "timeout_seconds": 60,
+        "stream": False,
+        "compression": {
+            "request": False,
+            "response": False,
+            "min_request_bytes": 1_024,
+        },
+        "prompt_cache": {"layout": "combined", "cache_control": False},
+        "token_budget": {
+            "enabled": True,
+            "context_tokens": 32_768,
+            "max_completion_tokens": 4_096,
+            "diagnostics_per_1k_tokens": 10.0,
+            "tokens_per_diagnostic": 70,
+        },
+        "chunking": {"max_chunk_tokens": 2_000, "max_workers": 4},
+        "batching": {"enabled": False, "max_batch_tokens": 2_000, "max_documents": 16},
+        "recovery": {"enabled": False, "repair": False, "max_repair_items": 20},
+        "rate_limit": {
+            "requests_per_minute": 0,
+            "tokens_per_minute": 0,
+            "max_concurrency": 64,
+            "adaptive": True,
+        },
+        "retry": {
+            "connection": 3,
+            "server": 3,
+            "throttled": 4,
+            "truncated": 2,
+            "base_delay_seconds": 0.5,
+            "max_delay_seconds": 20.0,
+        },
+        "hedge": {"enabled": False, "percentile": 95.0, "budget_percent": 10.0},
+        "circuit_breaker": {
+            "enabled": True,
+            "failure_percent": 50.0,
+            "slow_seconds": 60.0,
+            "slow_percent": 100.0,
+            "minimum_requests": 10,
+            "window_seconds": 60.0,
+            "open_seconds": 30.0,
+        },
+        "endpoints": [],
+        "balancing": "least_outstanding",
     },
     "styles": {},
+    "cache": {"enabled": True, "max_megabytes": 64, "paragraphs": True},
+    "auto_check": {"enabled": False, "delay_ms": 800},
 }
 
 
@@ -249,6 +294,45 @@ class ConfigManager:
                 config["styles"] = normalized_styles
                 changed = True
 
+        cache = config.get("cache")
+        if not isinstance(cache, dict):
+            config["cache"] = deepcopy(DEFAULT_CONFIG["cache"])
+            cache = config["cache"]
+            changed = True
+        for flag in ("enabled", "paragraphs"):
+            if not isinstance(cache.get(flag), bool):
+                cache[flag] = DEFAULT_CONFIG["cache"][flag]
+                changed = True
+        max_megabytes_raw = cache.get("max_megabytes")
+        max_megabytes = self._as_int(
+            max_megabytes_raw,
+            DEFAULT_CONFIG["cache"]["max_megabytes"],
+            minimum=1,
+            maximum=4_096,
+        )
+        if type(max_megabytes_raw) is not int or max_megabytes != max_megabytes_raw:
+            cache["max_megabytes"] = max_megabytes
+            changed = True
+
+        auto_check = config.get("auto_check")
+        if not isinstance(auto_check, dict):
+            config["auto_check"] = deepcopy(DEFAULT_CONFIG["auto_check"])
+            auto_check = config["auto_check"]
+            changed = True
+        if not isinstance(auto_check.get("enabled"), bool):
+            auto_check["enabled"] = DEFAULT_CONFIG["auto_check"]["enabled"]
+            changed = True
+        delay_raw = auto_check.get("delay_ms")
+        delay_ms = self._as_int(
+            delay_raw,
+            DEFAULT_CONFIG["auto_check"]["delay_ms"],
+            minimum=200,
+            maximum=10_000,
+        )
+        if type(delay_raw) is not int or delay_ms != delay_raw:
+            auto_check["delay_ms"] = delay_ms
+            changed = True
+
         llm = config.get("llm")
         if not isinstance(llm, dict):
             config["llm"] = deepcopy(DEFAULT_CONFIG["llm"])
@@ -311,6 +395,264 @@ class ConfigManager:
             llm["timeout_seconds"] = timeout
             changed = True
 
+        if not isinstance(llm.get("stream"), bool):
+            llm["stream"] = DEFAULT_CONFIG["llm"]["stream"]
+            changed = True
+
+        chunking = llm.get("chunking")
+        if not isinstance(chunking, dict):
+            llm["chunking"] = deepcopy(DEFAULT_CONFIG["llm"]["chunking"])
+            chunking = llm["chunking"]
+            changed = True
+        for key, maximum in (("max_chunk_tokens", 500_000), ("max_workers", 32)):
+            raw = chunking.get(key)
+            value = self._as_int(
+                raw, DEFAULT_CONFIG["llm"]["chunking"][key], minimum=1, maximum=maximum
+            )
+            if type(raw) is not int or value != raw:
+                chunking[key] = value
+                changed = True
+
+        token_budget = llm.get("token_budget")
+        if not isinstance(token_budget, dict):
+            llm["token_budget"] = deepcopy(DEFAULT_CONFIG["llm"]["token_budget"])
+            token_budget = llm["token_budget"]
+            changed = True
+        if not isinstance(token_budget.get("enabled"), bool):
+            token_budget["enabled"] = DEFAULT_CONFIG["llm"]["token_budget"]["enabled"]
+            changed = True
+        for key, minimum, maximum in (
+            ("context_tokens", 256, 10_000_000),
+            ("max_completion_tokens", 16, 1_000_000),
+            ("tokens_per_diagnostic", 1, 10_000),
+        ):
+            raw = token_budget.get(key)
+            value = self._as_int(
+                raw,
+                DEFAULT_CONFIG["llm"]["token_budget"][key],
+                minimum=minimum,
+                maximum=maximum,
+            )
+            if type(raw) is not int or value != raw:
+                token_budget[key] = value
+                changed = True
+        raw = token_budget.get("diagnostics_per_1k_tokens")
+        value = self._as_float(
+            raw,
+            DEFAULT_CONFIG["llm"]["token_budget"]["diagnostics_per_1k_tokens"],
+            minimum=0.1,
+            maximum=1_000.0,
+        )
+        if isinstance(raw, bool) or not isinstance(raw, (int, float)) or value != raw:
+            token_budget["diagnostics_per_1k_tokens"] = value
+            changed = True
+
+        compression = llm.get("compression")
+        if not isinstance(compression, dict):
+            llm["compression"] = deepcopy(DEFAULT_CONFIG["llm"]["compression"])
+            compression = llm["compression"]
+            changed = True
+        for key in ("request", "response"):
+            if not isinstance(compression.get(key), bool):
+                compression[key] = DEFAULT_CONFIG["llm"]["compression"][key]
+                changed = True
+        raw = compression.get("min_request_bytes")
+        value = self._as_int(
+            raw,
+            DEFAULT_CONFIG["llm"]["compression"]["min_request_bytes"],
+            minimum=0,
+            maximum=2 * 1024 * 1024,
+        )
+        if type(raw) is not int or value != raw:
+            compression["min_request_bytes"] = value
+            changed = True
+
+        prompt_cache = llm.get("prompt_cache")
+        if not isinstance(prompt_cache, dict):
+            llm["prompt_cache"] = deepcopy(DEFAULT_CONFIG["llm"]["prompt_cache"])
+            prompt_cache = llm["prompt_cache"]
+            changed = True
+        if prompt_cache.get("layout") not in {"combined", "prefix"}:
+            prompt_cache["layout"] = DEFAULT_CONFIG["llm"]["prompt_cache"]["layout"]
+            changed = True
+        if not isinstance(prompt_cache.get("cache_control"), bool):
+            prompt_cache["cache_control"] = DEFAULT_CONFIG["llm"]["prompt_cache"][
+                "cache_control"
+            ]
+            changed = True
+
+        batching = llm.get("batching")
+        if not isinstance(batching, dict):
+            llm["batching"] = deepcopy(DEFAULT_CONFIG["llm"]["batching"])
+            batching = llm["batching"]
+            changed = True
+        if not isinstance(batching.get("enabled"), bool):
+            batching["enabled"] = DEFAULT_CONFIG["llm"]["batching"]["enabled"]
+            changed = True
+        for key, maximum in (("max_batch_tokens", 500_000), ("max_documents", 100)):
+            raw = batching.get(key)
+            value = self._as_int(
+                raw, DEFAULT_CONFIG["llm"]["batching"][key], minimum=1, maximum=maximum
+            )
+            if type(raw) is not int or value != raw:
+                batching[key] = value
+                changed = True
+
+        recovery = llm.get("recovery")
+        if not isinstance(recovery, dict):
+            llm["recovery"] = deepcopy(DEFAULT_CONFIG["llm"]["recovery"])
+            recovery = llm["recovery"]
+            changed = True
+        for key in ("enabled", "repair"):
+            if not isinstance(recovery.get(key), bool):
+                recovery[key] = DEFAULT_CONFIG["llm"]["recovery"][key]
+                changed = True
+        raw = recovery.get("max_repair_items")
+        value = self._as_int(
+            raw,
+            DEFAULT_CONFIG["llm"]["recovery"]["max_repair_items"],
+            minimum=1,
+            maximum=100,
+        )
+        if type(raw) is not int or value != raw:
+            recovery["max_repair_items"] = value
+            changed = True
+
+        rate_limit = llm.get("rate_limit")
+        if not isinstance(rate_limit, dict):
+            llm["rate_limit"] = deepcopy(DEFAULT_CONFIG["llm"]["rate_limit"])
+            rate_limit = llm["rate_limit"]
+            changed = True
+        for key, minimum, maximum in (
+            ("requests_per_minute", 0, 100_000_000),
+            ("tokens_per_minute", 0, 100_000_000),
+            ("max_concurrency", 1, 256),
+        ):
+            raw = rate_limit.get(key)
+            value = self._as_int(
+                raw,
+                DEFAULT_CONFIG["llm"]["rate_limit"][key],
+                minimum=minimum,
+                maximum=maximum,
+            )
+            if type(raw) is not int or value != raw:
+                rate_limit[key] = value
+                changed = True
+        if not isinstance(rate_limit.get("adaptive"), bool):
+            rate_limit["adaptive"] = DEFAULT_CONFIG["llm"]["rate_limit"]["adaptive"]
+            changed = True
+
+        retry = llm.get("retry")
+        if not isinstance(retry, dict):
+            llm["retry"] = deepcopy(DEFAULT_CONFIG["llm"]["retry"])
+            retry = llm["retry"]
+            changed = True
+        for key in ("connection", "server", "throttled", "truncated"):
+            raw = retry.get(key)
+            value = self._as_int(
+                raw, DEFAULT_CONFIG["llm"]["retry"][key], minimum=0, maximum=10
+            )
+            if type(raw) is not int or value != raw:
+                retry[key] = value
+                changed = True
+        for key in ("base_delay_seconds", "max_delay_seconds"):
+            raw = retry.get(key)
+            value = self._as_float(
+                raw, DEFAULT_CONFIG["llm"]["retry"][key], minimum=0.001, maximum=300.0
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or value != raw
+            ):
+                retry[key] = value
+                changed = True
+        if retry["base_delay_seconds"] > retry["max_delay_seconds"]:
+            for key in ("base_delay_seconds", "max_delay_seconds"):
+                retry[key] = DEFAULT_CONFIG["llm"]["retry"][key]
+            changed = True
+
+        hedge = llm.get("hedge")
+        if not isinstance(hedge, dict):
+            llm["hedge"] = deepcopy(DEFAULT_CONFIG["llm"]["hedge"])
+            hedge = llm["hedge"]
+            changed = True
+        if not isinstance(hedge.get("enabled"), bool):
+            hedge["enabled"] = DEFAULT_CONFIG["llm"]["hedge"]["enabled"]
+            changed = True
+        for key, minimum, maximum in (
+            ("percentile", 50.0, 99.9),
+            ("budget_percent", 0.0, 100.0),
+        ):
+            raw = hedge.get(key)
+            value = self._as_float(
+                raw,
+                DEFAULT_CONFIG["llm"]["hedge"][key],
+                minimum=minimum,
+                maximum=maximum,
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or value != raw
+            ):
+                hedge[key] = value
+                changed = True
+
+        circuit = llm.get("circuit_breaker")
+        if not isinstance(circuit, dict):
+            llm["circuit_breaker"] = deepcopy(DEFAULT_CONFIG["llm"]["circuit_breaker"])
+            circuit = llm["circuit_breaker"]
+            changed = True
+        if not isinstance(circuit.get("enabled"), bool):
+            circuit["enabled"] = DEFAULT_CONFIG["llm"]["circuit_breaker"]["enabled"]
+            changed = True
+        for key, minimum, maximum in (
+            ("failure_percent", 1.0, 100.0),
+            ("slow_seconds", 0.1, 3_600.0),
+            ("slow_percent", 1.0, 100.0),
+            ("window_seconds", 1.0, 3_600.0),
+            ("open_seconds", 1.0, 600.0),
+        ):
+            raw = circuit.get(key)
+            value = self._as_float(
+                raw,
+                DEFAULT_CONFIG["llm"]["circuit_breaker"][key],
+                minimum=minimum,
+                maximum=maximum,
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or value != raw
+            ):
+                circuit[key] = value
+                changed = True
+        minimum_requests_raw = circuit.get("minimum_requests")
+        minimum_requests = self._as_int(
+            minimum_requests_raw,
+            DEFAULT_CONFIG["llm"]["circuit_breaker"]["minimum_requests"],
+            minimum=1,
+            maximum=10_000,
+        )
+        if (
+            type(minimum_requests_raw) is not int
+            or minimum_requests != minimum_requests_raw
+        ):
+            circuit["minimum_requests"] = minimum_requests
+            changed = True
+
+        endpoints = llm.get("endpoints")
+        if not isinstance(endpoints, list):
+            llm["endpoints"] = []
+            changed = True
+        elif not all(isinstance(entry, dict) for entry in endpoints):
+            llm["endpoints"] = [entry for entry in endpoints if isinstance(entry, dict)]
+            changed = True
+        if llm.get("balancing") not in {"least_outstanding", "latency"}:
+            llm["balancing"] = DEFAULT_CONFIG["llm"]["balancing"]
+            changed = True
+
         return changed
 
     def snapshot(self) -> Mapping[str, Any]:
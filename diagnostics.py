@@ -2,12 +2,64 @@
 
 from __future__ import annotations
 
+import bisect
 import json
+import re
+from array import array
 from dataclasses import dataclass
-from typing import Any, Iterable
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Iterable, Mapping
 
 MAX_DIAGNOSTICS = 100
+# The client reads at most 2 MiB of response, and UTF-8 never spends less than
+# a byte on a character.
+MAX_RESPONSE_CHARS = 2 * 1024 * 1024
 SEVERITIES = {"error", "warning", "info", "hint"}
+# Lines above and below its reported line searched for a diagnostic's text.
+ANCHOR_SEARCH_LINES = 1
+_TOO_MANY = f"Response has more than {MAX_DIAGNOSTICS} diagnostics"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_ITEM_SEPARATOR = re.compile(r"[ \t\n\r]*,[ \t\n\r]*")
+# How a JSON value cut off mid-token can end: inside a number or a literal.
+_PARTIAL_TOKEN = re.compile(
+    r"[ \t\n\r]*(?:[-+.eE0-9]*|-?I(?:n(?:f(?:i(?:n(?:i(?:ty?)?)?)?)?)?)?"
+    r"|N(?:aN?)?|t(?:r(?:ue?)?)?|f(?:a(?:l(?:se?)?)?)?|n(?:u(?:ll?)?)?)"
+)
+# What may follow a decoded number whose fraction or exponent was cut off.
+_PARTIAL_NUMBER = re.compile(r"\.?|[eE][-+]?")
+# A \u escape cut off before its four hex digits, or before a low surrogate.
+_PARTIAL_ESCAPE = re.compile(r"u[0-9a-fA-F]{0,4}(?:\\(?:u[0-9a-fA-F]{0,4})?)?")
+_VALUE_STARTS = frozenset('["-0123456789tfnNI')
+_RESCAN_CHARS = 8192
+_INCOMPLETE = object()
+# DiagnosticParser states and, for a response that ends in them, what is missing.
+(
+    _START,
+    _OPEN,
+    _FIRST_KEY,
+    _KEY,
+    _COLON,
+    _VALUE,
+    _FIRST_ITEM,
+    _ITEM,
+    _ITEM_END,
+    _MEMBER_END,
+    _TRAILER,
+    _DONE,
+) = range(12)
+_EXPECTED = {
+    _OPEN: "Expecting value",
+    _FIRST_KEY: "Expecting property name enclosed in double quotes",
+    _KEY: "Expecting property name enclosed in double quotes",
+    _COLON: "Expecting ':' delimiter",
+    _VALUE: "Expecting value",
+    _FIRST_ITEM: "Expecting value",
+    _ITEM: "Expecting value",
+    _ITEM_END: "Expecting ',' delimiter",
+    _MEMBER_END: "Expecting ',' delimiter",
+}
 
 
 @dataclass(frozen=True, slots=True)
@@ -25,32 +77,63 @@ class Diagnostic:
     explanation: str = ""
 
 
+@dataclass(frozen=True, slots=True)
+class Rejection:
+    """A diagnostic that failed validation, kept by a lenient parse.
+
+    ``index`` is the item's position in the response's ``diagnostics`` array
+    and ``text`` its JSON exactly as the model wrote it.
+    """
+
+    index: int
+    text: str
+    reason: str
+
+
 @dataclass(frozen=True, slots=True)
 class CompileResult:
-    """The validated response returned by a language-analysis request."""
+    """The validated response returned by a language-analysis request.
+
+    ``rejected`` lists the diagnostics a lenient parse left out; a strict
+    parse raises on the first of them instead.
+    """
 
     language: str
     diagnostics: tuple[Diagnostic, ...]
     raw_response: str = ""
+    rejected: tuple[Rejection, ...] = ()
 
     @property
     def clean(self) -> bool:
         return not self.diagnostics
 
 
+class _StrictJSONError(ValueError):
+    """Well-formed JSON that breaks a rule of the strict decoder."""
+
+
 def _reject_constant(value: str) -> None:
-    raise ValueError(f"Non-finite JSON number: {value}")
+    raise _StrictJSONError(f"Non-finite JSON number: {value}")
 
 
 def _reject_duplicate_keys(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
-    result: dict[str, Any] = {}
-    for key, value in pairs:
-        if key in result:
-            raise ValueError(f"Duplicate JSON key: {key}")
-        result[key] = value
+    result = dict(pairs)
+    if len(result) != len(pairs):
+        seen: set[str] = set()
+        for key, _value in pairs:
+            if key in seen:
+                raise _StrictJSONError(f"Duplicate JSON key: {key}")
+            seen.add(key)
     return result
 
 
+_DECODER = json.JSONDecoder(
+    parse_constant=_reject_constant, object_pairs_hook=_reject_duplicate_keys
+)
+# Only finds where a value that broke a strict rule ends, so it can be skipped.
+_PERMISSIVE_DECODER = json.JSONDecoder()
+
+
 def _strip_code_fence(payload: str) -> str:
     text = payload.strip()
     if not text.startswith("```"):
@@ -84,19 +167,136 @@ def _required_int(item: dict[str, Any], name: str) -> int:
     return value
 
 
-def _source_lines(source_text: str) -> list[str]:
-    return source_text.split("\n") or [""]
+class SourceIndex:
+    """Line-start offsets of one source text for constant-time line access.
 
+    Lines are separated by ``"\n"`` only, matching the coordinates the model is
+    asked to report and Tk text indices. Build one per analyzed source with
+    :meth:`of` and share it between parsing, validation, and rendering.
+    """
+
+    __slots__ = ("text", "_starts")
+
+    def __init__(self, text: str) -> None:
+        if not isinstance(text, str):
+            raise TypeError("source_text must be a string")
+        self.text = text
+        # One entry per line plus a sentinel one past the final line's end.
+        self._starts = array(
+            "q", accumulate((len(line) + 1 for line in text.split("\n")), initial=0)
+        )
 
-def _parse_item(item: Any, lines: list[str]) -> Diagnostic:
+    @classmethod
+    def of(cls, source: str | SourceIndex) -> SourceIndex:
+        if isinstance(source, SourceIndex):
+            return source
+        return _cached_index(source)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._starts) - 1
+
+    def line(self, number: int) -> str:
+        """Return one-based line ``number`` without its newline."""
+
+        if number < 1 or number > self.line_count:
+            raise IndexError(f"Line {number} is outside the source")
+        return self.text[self._starts[number - 1] : self._starts[number] - 1]
+
+    def line_length(self, number: int) -> int:
+        if number < 1 or number > self.line_count:
+            raise IndexError(f"Line {number} is outside the source")
+        return self._starts[number] - self._starts[number - 1] - 1
+
+    def offset(self, line: int, column: int) -> int:
+        """Convert a one-based line and column to a character offset."""
+
+        if column < 1 or column > self.line_length(line) + 1:
+            raise IndexError(f"Column {column} is outside line {line}")
+        return self._starts[line - 1] + column - 1
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Convert a character offset to a one-based line and column."""
+
+        if offset < 0 or offset > len(self.text):
+            raise IndexError(f"Offset {offset} is outside the source")
+        line = bisect.bisect_right(self._starts, offset, hi=self.line_count)
+        return line, offset - self._starts[line - 1] + 1
+
+    def locate(
+        self, needle: str, line: int, column: int, radius: int = ANCHOR_SEARCH_LINES
+    ) -> tuple[int, int] | None:
+        """Find the occurrence of ``needle`` nearest to ``line`` and ``column``.
+
+        Only lines within ``radius`` of ``line`` are searched, and a match never
+        spans a newline. Nearer lines win over nearer columns. Returns the
+        one-based line and column where the match starts, or None.
+        """
+
+        if not needle or "\n" in needle:
+            return None
+        first = max(1, line - radius)
+        last = min(self.line_count, line + radius)
+        if first > last:
+            return None
+        text = self.text
+        best: tuple[int, int] | None = None
+        best_distance = (0, 0)
+        for number in range(first, last + 1):
+            line_start = self._starts[number - 1]
+            line_end = self._starts[number] - 1
+            found = text.find(needle, line_start, line_end)
+            while found >= 0:
+                match_column = found - line_start + 1
+                distance = (abs(number - line), abs(match_column - column))
+                if best is None or distance < best_distance:
+                    best, best_distance = (number, match_column), distance
+                found = text.find(needle, found + 1, line_end)
+        return best
+
+
+@lru_cache(maxsize=4)
+def _cached_index(source_text: str) -> SourceIndex:
+    return SourceIndex(source_text)
+
+
+def _anchored_span(
+    source: SourceIndex, line: int, start: int, end: int, original: str
+) -> tuple[int, int, int]:
+    """Snap a span to where its ``original`` text actually occurs.
+
+    Models often quote the right text at slightly wrong columns, for example
+    after tabs or wide characters. A span that already covers ``original`` is
+    kept; otherwise the nearest occurrence on or next to ``line`` is used, and
+    without one the reported span is validated as it is.
+    """
+
+    if (
+        1 <= line <= source.line_count
+        and 1 <= start
+        and end == start + len(original)
+        and end <= source.line_length(line) + 1
+        and source.text.startswith(original, source.offset(line, start))
+    ):
+        return line, start, end
+    match = source.locate(original, line, start)
+    if match is None:
+        return line, start, end
+    return match[0], match[1], match[1] + len(original)
+
+
+def _parse_item(item: Any, source: SourceIndex) -> Diagnostic:
     if not isinstance(item, dict):
         raise ValueError("Each diagnostic must be a JSON object")
     line = _required_int(item, "line")
     start = _required_int(item, "start_column")
     end = _required_int(item, "end_column")
-    if line < 1 or line > len(lines):
+    original = _optional_string(item, "original")
+    if original:
+        line, start, end = _anchored_span(source, line, start, end, original)
+    if line < 1 or line > source.line_count:
         raise ValueError(f"Diagnostic line {line} is outside the input")
-    line_length = len(lines[line - 1])
+    line_length = source.line_length(line)
     if start < 1 or start > line_length + 1:
         raise ValueError(f"Diagnostic start column {start} is outside line {line}")
     if end < start or end > line_length + 1:
@@ -112,17 +312,15 @@ def _parse_item(item: Any, lines: list[str]) -> Diagnostic:
         category=_required_string(item, "category"),
         severity=severity,
         message=_required_string(item, "message"),
-        original=_optional_string(item, "original"),
+        original=original,
         replacement=_optional_string(item, "replacement"),
         explanation=_optional_string(item, "explanation"),
     )
 
 
-def parse_diagnostics(payload: str | dict[str, Any], source_text: str) -> CompileResult:
-    """Parse and validate a JSON response against the exact analyzed source."""
+def _load_payload(payload: str | dict[str, Any]) -> tuple[dict[str, Any], str]:
+    """Decode a model response strictly; return the object and its raw text."""
 
-    if not isinstance(source_text, str):
-        raise TypeError("source_text must be a string")
     raw_response = payload if isinstance(payload, str) else json.dumps(payload)
     if isinstance(payload, str):
         text = _strip_code_fence(payload)
@@ -145,17 +343,140 @@ def parse_diagnostics(payload: str | dict[str, Any], source_text: str) -> Compil
 
     if not isinstance(data, dict):
         raise ValueError("The model response must be a JSON object")
+    return data, str(raw_response)
+
+
+def _parse_result(
+    data: dict[str, Any],
+    source: SourceIndex,
+    raw_response: str,
+    *,
+    lenient: bool = False,
+) -> CompileResult:
     language = data.get("language", "und")
     if not isinstance(language, str) or not language.strip():
         raise ValueError("Response field 'language' must be a non-empty string")
     items = data.get("diagnostics")
     if not isinstance(items, list):
         raise ValueError("Response field 'diagnostics' must be an array")
-    if len(items) > MAX_DIAGNOSTICS:
-        raise ValueError(f"Response has more than {MAX_DIAGNOSTICS} diagnostics")
+    if not lenient:
+        if len(items) > MAX_DIAGNOSTICS:
+            raise ValueError(_TOO_MANY)
+        parsed = [_parse_item(item, source) for item in items]
+        return CompileResult(
+            language.strip(), canonical_diagnostics(parsed), raw_response
+        )
+
+    parsed = []
+    rejected = []
+    for index, item in enumerate(items):
+        try:
+            if index >= MAX_DIAGNOSTICS:
+                raise ValueError(_TOO_MANY)
+            parsed.append(_parse_item(item, source))
+        except ValueError as error:
+            text = json.dumps(item, ensure_ascii=False)
+            rejected.append(Rejection(index, text, str(error)))
+    return CompileResult(
+        language.strip(),
+        canonical_diagnostics(parsed),
+        raw_response,
+        tuple(rejected),
+    )
+
+
+def parse_diagnostics(
+    payload: str | dict[str, Any],
+    source_text: str | SourceIndex,
+    *,
+    lenient: bool = False,
+) -> CompileResult:
+    """Parse and validate a JSON response against the exact analyzed source.
+
+    A strict parse rejects the whole response for one invalid diagnostic. A
+    ``lenient`` parse keeps the valid ones and lists the others, with the
+    reason for each, in ``CompileResult.rejected``. Either way a response that
+    is not well-formed JSON of the expected shape raises ``ValueError``.
+    """
+
+    source = SourceIndex.of(source_text)
+    if isinstance(payload, str):
+        parser = DiagnosticParser(source, lenient=lenient)
+        parser.feed(payload)
+        return parser.finish(payload)
+    data, raw_response = _load_payload(payload)
+    return _parse_result(data, source, raw_response, lenient=lenient)
+
+
+def parse_batch_diagnostics(
+    payload: str | dict[str, Any], sources: Mapping[str, str | SourceIndex]
+) -> dict[str, CompileResult]:
+    """Parse a multi-document response and return the documents that validate.
+
+    The response holds ``documents``, an array of objects that each carry an
+    ``id`` from ``sources`` plus the fields of a single-document response.
+    Every document is validated against its own source. Documents that are
+    missing, repeated, or invalid are left out so the caller can send them
+    again; only a response that is unusable as a whole raises ``ValueError``.
+    """
+
+    data, _raw_response = _load_payload(payload)
+    entries = data.get("documents")
+    if not isinstance(entries, list):
+        raise ValueError("Response field 'documents' must be an array")
+    found: dict[str, dict[str, Any]] = {}
+    repeated: set[str] = set()
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        key = entry.get("id")
+        if not isinstance(key, str) or key not in sources:
+            continue
+        if key in found:
+            repeated.add(key)
+        found[key] = entry
+    results: dict[str, CompileResult] = {}
+    for key, entry in found.items():
+        if key in repeated:
+            continue
+        try:
+            results[key] = _parse_result(
+                entry,
+                SourceIndex.of(sources[key]),
+                json.dumps(entry, ensure_ascii=False),
+            )
+        except ValueError:
+            continue
+    return results
+
+
+def rejection_line(rejection: Rejection, source: SourceIndex) -> int | None:
+    """Return the line of ``source`` a rejected item names, if it names one.
+
+    An out-of-range ``line`` falls back to where the item's ``original`` text
+    first occurs.
+    """
+
+    try:
+        item = json.loads(rejection.text)
+    except ValueError:
+        return None
+    if not isinstance(item, dict):
+        return None
+    line = item.get("line")
+    if type(line) is int and 1 <= line <= source.line_count:
+        return line
+    original = item.get("original")
+    if isinstance(original, str) and original.strip():
+        offset = source.text.find(original)
+        if offset >= 0:
+            return source.position(offset)[0]
+    return None
+
+
+def canonical_diagnostics(diagnostics: Iterable[Diagnostic]) -> tuple[Diagnostic, ...]:
+    """Deduplicate diagnostics and order them by source position."""
 
-    lines = _source_lines(source_text)
-    parsed = [_parse_item(item, lines) for item in items]
     unique = {
         (
             diagnostic.line,
@@ -164,9 +485,9 @@ def parse_diagnostics(payload: str | dict[str, Any], source_text: str) -> Compil
             diagnostic.severity,
             diagnostic.message,
         ): diagnostic
-        for diagnostic in parsed
+        for diagnostic in diagnostics
     }
-    ordered = tuple(
+    return tuple(
         sorted(
             unique.values(),
             key=lambda diagnostic: (
@@ -177,12 +498,298 @@ def parse_diagnostics(payload: str | dict[str, Any], source_text: str) -> Compil
             ),
         )
     )
-    return CompileResult(language.strip(), ordered, str(raw_response))
 
 
-def _line_at(source_text: str, line: int) -> str:
-    lines = _source_lines(source_text)
-    return lines[line - 1]
+class DiagnosticParser:
+    """Parse a single-document response incrementally, as its text arrives.
+
+    Text may be fed in pieces of any size. The top-level object is scanned
+    token by token and every value is decoded as soon as it is complete, so
+    each diagnostic is validated the moment its object closes. Only the
+    unparsed tail is kept between calls. The guarantees of a one-shot parse
+    hold throughout: duplicate keys, non-finite numbers, more than
+    ``MAX_DIAGNOSTICS`` items, and text beyond ``max_chars`` raise
+    ``ValueError`` as soon as they are seen, and every later call raises the
+    same error again.
+
+    A ``lenient`` parser instead records a well-formed diagnostic that fails
+    validation as a :class:`Rejection`, including those beyond
+    ``MAX_DIAGNOSTICS``, and goes on with the next one.
+    """
+
+    def __init__(
+        self,
+        source_text: str | SourceIndex,
+        *,
+        max_chars: int | None = MAX_RESPONSE_CHARS,
+        lenient: bool = False,
+    ) -> None:
+        self._source = SourceIndex.of(source_text)
+        self.max_chars = max_chars
+        self.lenient = lenient
+        self.consumed = 0
+        self._buffer = ""
+        self._pos = 0
+        # Text fed since the buffer was last joined.
+        self._queued: list[str] = []
+        self._queued_chars = 0
+        self._state = _START
+        self._fenced = False
+        self._keys: set[str] = set()
+        self._key = ""
+        self._language = "und"
+        self._diagnostics: list[Diagnostic] = []
+        self._rejected: list[Rejection] = []
+        # Unparsed characters when a value last failed to decode as incomplete.
+        self._stalled = 0
+        self._error: ValueError | None = None
+
+    def feed(self, text: str) -> list[Diagnostic]:
+        """Consume more response text; return the diagnostics it completed."""
+
+        self.consumed += len(text)
+        if self._error is not None:
+            raise self._error
+        try:
+            if self.max_chars is not None and self.consumed > self.max_chars:
+                raise ValueError(
+                    f"The model response exceeds {self.max_chars} characters"
+                )
+            self._queued.append(text)
+            self._queued_chars += len(text)
+            unparsed = len(self._buffer) - self._pos + self._queued_chars
+            # Retry a long value only once its text has doubled, so that a huge
+            # string arriving in small pieces is not rejoined and rescanned for
+            # every piece.
+            if _RESCAN_CHARS < unparsed < 2 * self._stalled:
+                return []
+            self._join()
+            return self._advance(final=False)
+        except ValueError as error:
+            self._error = error
+            raise
+
+    def finish(self, raw_response: str = "") -> CompileResult:
+        """Check that the response ended completely and return the result."""
+
+        if self._error is not None:
+            raise self._error
+        try:
+            self._join()
+            self._advance(final=True)
+            self._check_complete()
+        except ValueError as error:
+            self._error = error
+            raise
+        return CompileResult(
+            self._language,
+            canonical_diagnostics(self._diagnostics),
+            raw_response,
+            tuple(self._rejected),
+        )
+
+    def _join(self) -> None:
+        """Replace the buffer with its unparsed tail plus the queued text."""
+
+        pieces = self._queued
+        if self._pos < len(self._buffer):
+            pieces.insert(0, self._buffer[self._pos :])
+        self._buffer = pieces[0] if len(pieces) == 1 else "".join(pieces)
+        self._pos = 0
+        self._queued = []
+        self._queued_chars = 0
+
+    def _check_complete(self) -> None:
+        rest = self._buffer[self._pos :]
+        if self._state == _START:
+            if rest.startswith("```"):
+                raise ValueError("Incomplete JSON code fence")
+            raise ValueError("The model returned an empty response")
+        if self._state == _OPEN and self._fenced and rest.startswith("```"):
+            raise ValueError("The model returned an empty response")
+        if self._state == _TRAILER and self._fenced:
+            raise ValueError("Incomplete JSON code fence")
+        if self._state not in (_TRAILER, _DONE):
+            raise _syntax_error(_EXPECTED[self._state])
+        if "diagnostics" not in self._keys:
+            raise ValueError("Response field 'diagnostics' must be an array")
+
+    def _advance(self, *, final: bool) -> list[Diagnostic]:
+        ready: list[Diagnostic] = []
+        buffer = self._buffer
+        while True:
+            pos = self._pos = _WHITESPACE.match(buffer, self._pos).end()
+            if pos == len(buffer):
+                return ready
+            state = self._state
+            character = buffer[pos]
+            if state == _START:
+                if buffer.startswith("```", pos):
+                    newline = buffer.find("\n", pos)
+                    if newline < 0:
+                        return ready
+                    self._fenced = True
+                    self._pos = newline + 1
+                elif not final and "```".startswith(buffer[pos:]):
+                    return ready
+                self._state = _OPEN
+            elif state == _OPEN:
+                if character != "{":
+                    if character in _VALUE_STARTS:
+                        raise ValueError("The model response must be a JSON object")
+                    raise _syntax_error("Expecting value")
+                self._pos = pos + 1
+                self._state = _FIRST_KEY
+            elif state in (_FIRST_KEY, _KEY):
+                if character == "}" and state == _FIRST_KEY:
+                    self._pos = pos + 1
+                    self._state = _TRAILER
+                    continue
+                if character != '"':
+                    raise _syntax_error(_EXPECTED[state])
+                key = self._decode(final=final)
+                if key is _INCOMPLETE:
+                    return ready
+                if key in self._keys:
+                    raise ValueError(f"Duplicate JSON key: {key}")
+                self._keys.add(key)
+                self._key = key
+                self._state = _COLON
+            elif state == _COLON:
+                if character != ":":
+                    raise _syntax_error(_EXPECTED[state])
+                self._pos = pos + 1
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._key == "diagnostics":
+                    if character != "[":
+                        raise ValueError(
+                            "Response field 'diagnostics' must be an array"
+                        )
+                    self._pos = pos + 1
+                    self._state = _FIRST_ITEM
+                    continue
+                value = self._decode(final=final)
+                if value is _INCOMPLETE:
+                    return ready
+                if self._key == "language":
+                    if not isinstance(value, str) or not value.strip():
+                        raise ValueError(
+                            "Response field 'language' must be a non-empty string"
+                        )
+                    self._language = value.strip()
+                self._state = _MEMBER_END
+            elif state in (_FIRST_ITEM, _ITEM):
+                if character == "]" and state == _FIRST_ITEM:
+                    self._pos = pos + 1
+                    self._state = _MEMBER_END
+                    continue
+                if not self._read_items(ready, final=final):
+                    return ready
+            elif state in (_ITEM_END, _MEMBER_END):
+                closer = "]" if state == _ITEM_END else "}"
+                if character == ",":
+                    self._state = _ITEM if state == _ITEM_END else _KEY
+                elif character == closer:
+                    self._state = _MEMBER_END if state == _ITEM_END else _TRAILER
+                else:
+                    raise _syntax_error(_EXPECTED[state])
+                self._pos = pos + 1
+            elif state == _TRAILER and self._fenced:
+                if buffer.startswith("```", pos):
+                    self._pos = pos + 3
+                    self._state = _DONE
+                elif final or not "```".startswith(buffer[pos:]):
+                    raise ValueError("Incomplete JSON code fence")
+                else:
+                    return ready
+            else:
+                raise _syntax_error("Extra data")
+
+    def _read_items(self, ready: list[Diagnostic], *, final: bool) -> bool:
+        """Validate consecutive diagnostics; return False if one is incomplete.
+
+        Items are read in one pass as long as a comma follows each of them,
+        without going back through the state machine in between.
+        """
+
+        buffer = self._buffer
+        diagnostics = self._diagnostics
+        rejected = self._rejected
+        while True:
+            index = len(diagnostics) + len(rejected)
+            if index >= MAX_DIAGNOSTICS and not self.lenient:
+                raise ValueError(_TOO_MANY)
+            start = self._pos
+            try:
+                item = self._decode(final=final)
+                if item is _INCOMPLETE:
+                    self._state = _ITEM
+                    return False
+                if index >= MAX_DIAGNOSTICS:
+                    raise ValueError(_TOO_MANY)
+                diagnostic = _parse_item(item, self._source)
+            except _StrictJSONError as error:
+                if not self.lenient:
+                    raise
+                if self._decode(final=final, decoder=_PERMISSIVE_DECODER) is (
+                    _INCOMPLETE
+                ):
+                    self._state = _ITEM
+                    return False
+                rejected.append(Rejection(index, buffer[start : self._pos], str(error)))
+            except ValueError as error:
+                if not self.lenient or self._pos == start:
+                    raise
+                rejected.append(Rejection(index, buffer[start : self._pos], str(error)))
+            else:
+                diagnostics.append(diagnostic)
+                ready.append(diagnostic)
+            separator = _ITEM_SEPARATOR.match(buffer, self._pos)
+            if separator is None:
+                self._state = _ITEM_END
+                return True
+            self._pos = separator.end()
+            if self._pos == len(buffer):
+                self._state = _ITEM
+                return True
+
+    def _decode(self, *, final: bool, decoder: json.JSONDecoder = _DECODER) -> Any:
+        """Decode the JSON value at the current position, if it is complete."""
+
+        buffer, pos = self._buffer, self._pos
+        unparsed = len(buffer) - pos
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            if final or not _incomplete(error):
+                raise _syntax_error(error.msg) from error
+            self._stalled = unparsed
+            return _INCOMPLETE
+        if (
+            not final
+            and type(value) in (int, float)
+            and _PARTIAL_NUMBER.fullmatch(buffer, end) is not None
+        ):
+            # More digits of the number may still arrive.
+            self._stalled = unparsed
+            return _INCOMPLETE
+        self._stalled = 0
+        self._pos = end
+        return value
+
+
+def _syntax_error(message: str) -> ValueError:
+    return ValueError(f"The model response is not valid JSON: {message}")
+
+
+def _incomplete(error: json.JSONDecodeError) -> bool:
+    """Whether ``error`` may go away once more text is appended to its document."""
+
+    if error.msg.startswith("Unterminated string"):
+        return True
+    pattern = _PARTIAL_ESCAPE if error.msg.startswith("Invalid \\u") else _PARTIAL_TOKEN
+    return pattern.fullmatch(error.doc, error.pos) is not None
 
 
 def _caret(diagnostic: Diagnostic) -> str:
@@ -190,14 +797,16 @@ def _caret(diagnostic: Diagnostic) -> str:
     return " " * (diagnostic.start_column - 1) + "^" + "~" * (width - 1)
 
 
-def _render_python(diagnostics: Iterable[Diagnostic], source_text: str) -> str:
+def _render_python(
+    diagnostics: Iterable[Diagnostic], source: SourceIndex, filename: str
+) -> str:
     blocks: list[str] = []
     for diagnostic in diagnostics:
-        snippet = _line_at(source_text, diagnostic.line)
+        snippet = source.line(diagnostic.line)
         blocks.append(
             "\n".join(
                 (
-                    f'  File "<input>", line {diagnostic.line}',
+                    f'  File "{filename}", line {diagnostic.line}',
                     f"    {snippet}",
                     f"    {_caret(diagnostic)}",
                     f"LanguageError: {diagnostic.message}",
@@ -207,15 +816,17 @@ def _render_python(diagnostics: Iterable[Diagnostic], source_text: str) -> str:
     return "\n\n".join(blocks)
 
 
-def _render_java(diagnostics: Iterable[Diagnostic], source_text: str) -> str:
+def _render_java(
+    diagnostics: Iterable[Diagnostic], source: SourceIndex, filename: str
+) -> str:
     items = list(diagnostics)
     blocks = []
     for diagnostic in items:
-        snippet = _line_at(source_text, diagnostic.line)
+        snippet = source.line(diagnostic.line)
         blocks.append(
             "\n".join(
                 (
-                    f"Input.txt:{diagnostic.line}: error: {diagnostic.message}",
+                    f"{filename}:{diagnostic.line}: error: {diagnostic.message}",
                     f"    {snippet}",
                     f"    {_caret(diagnostic)}",
                 )
@@ -226,15 +837,17 @@ def _render_java(diagnostics: Iterable[Diagnostic], source_text: str) -> str:
     return "\n".join(blocks)
 
 
-def _render_cpp(diagnostics: Iterable[Diagnostic], source_text: str) -> str:
+def _render_cpp(
+    diagnostics: Iterable[Diagnostic], source: SourceIndex, filename: str
+) -> str:
     items = list(diagnostics)
     blocks = []
     for diagnostic in items:
-        snippet = _line_at(source_text, diagnostic.line)
+        snippet = source.line(diagnostic.line)
         blocks.append(
             "\n".join(
                 (
-                    f"input.txt:{diagnostic.line}:{diagnostic.start_column}: "
+                    f"{filename}:{diagnostic.line}:{diagnostic.start_column}: "
                     f"{diagnostic.severity}: {diagnostic.message}",
                     snippet,
                     _caret(diagnostic),
@@ -246,14 +859,24 @@ def _render_cpp(diagnostics: Iterable[Diagnostic], source_text: str) -> str:
     return "\n".join(blocks)
 
 
-def render_diagnostics(style_name: str, result: CompileResult, source_text: str) -> str:
-    """Render validated diagnostics locally, independent of model formatting."""
+def render_diagnostics(
+    style_name: str,
+    result: CompileResult,
+    source_text: str | SourceIndex,
+    *,
+    filename: str | None = None,
+) -> str:
+    """Render validated diagnostics locally, independent of model formatting.
+
+    ``filename`` replaces each style's placeholder input name in locations.
+    """
 
     if not result.diagnostics:
         return ""
+    source = SourceIndex.of(source_text)
     style = (style_name or "Python").casefold()
     if style == "java":
-        return _render_java(result.diagnostics, source_text)
+        return _render_java(result.diagnostics, source, filename or "Input.txt")
     if style in {"c++", "cpp", "cxx"}:
-        return _render_cpp(result.diagnostics, source_text)
-    return _render_python(result.diagnostics, source_text)
+        return _render_cpp(result.diagnostics, source, filename or "input.txt")
+    return _render_python(result.diagnostics, source, filename or "<input>")
@@ -0,0 +1,135 @@
+"""Adaptive hedge delays from a decaying histogram of recent request latencies."""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from dataclasses import dataclass
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_HEDGE_BUDGET_PERCENT = 10.0
+# Hedging waits for this many observed latencies before it trusts a percentile.
+MIN_SAMPLES = 20
+# Counts halve after this many observations so the histogram follows drift.
+DECAY_INTERVAL = 500
+_SMALLEST_BUCKET_SECONDS = 0.001
+_LARGEST_BUCKET_SECONDS = 3_600.0
+_BUCKET_GROWTH = 1.2
+_BUCKET_BOUNDS = tuple(
+    _SMALLEST_BUCKET_SECONDS * _BUCKET_GROWTH**index
+    for index in range(
+        math.ceil(
+            math.log(_LARGEST_BUCKET_SECONDS / _SMALLEST_BUCKET_SECONDS)
+            / math.log(_BUCKET_GROWTH)
+        )
+        + 1
+    )
+)
+
+
+@dataclass(frozen=True, slots=True)
+class HedgePolicy:
+    """When to send a duplicate request and how much extra load to allow.
+
+    A duplicate is sent once a request has been outstanding for longer than
+    ``percentile`` of recent latencies, for at most ``budget_percent`` of
+    requests.
+    """
+
+    percentile: float = DEFAULT_HEDGE_PERCENTILE
+    budget_percent: float = DEFAULT_HEDGE_BUDGET_PERCENT
+
+
+class LatencyHistogram:
+    """Log-bucketed latency counts with periodic exponential decay.
+
+    Buckets grow by 20%, so a percentile is accurate to within one bucket
+    width while memory stays constant however many requests are observed.
+    """
+
+    def __init__(self) -> None:
+        self._counts = [0.0] * (len(_BUCKET_BOUNDS) + 1)
+        self._total = 0.0
+        self._since_decay = 0
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(_BUCKET_BOUNDS, max(0.0, seconds))
+        self._counts[index] += 1
+        self._total += 1
+        self._since_decay += 1
+        if self._since_decay >= DECAY_INTERVAL:
+            self._since_decay = 0
+            self._counts = [count / 2 for count in self._counts]
+            self._total /= 2
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the upper bound of the bucket holding ``percent``, if any data."""
+
+        if self._total <= 0:
+            return None
+        target = self._total * min(100.0, max(0.0, percent)) / 100
+        running = 0.0
+        for index, count in enumerate(self._counts):
+            running += count
+            if running >= target and count:
+                return _BUCKET_BOUNDS[min(index, len(_BUCKET_BOUNDS) - 1)]
+        return _BUCKET_BOUNDS[-1]
+
+
+class Hedger:
+    """Thread-safe hedge decisions for one endpoint."""
+
+    def __init__(self, policy: HedgePolicy) -> None:
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._histogram = LatencyHistogram()
+        self._requests = 0.0
+        self._hedges = 0.0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> float | None:
+        """Count one request and return its hedge delay, or None not to hedge."""
+
+        with self._lock:
+            self._requests += 1
+            # Decay like the histogram so an old quiet period cannot fund a burst.
+            if self._requests >= DECAY_INTERVAL:
+                self._requests /= 2
+                self._hedges /= 2
+            if self._histogram.total < MIN_SAMPLES:
+                return None
+            return self._histogram.percentile(self.policy.percentile)
+
+    def allow(self) -> bool:
+        """Take a hedge from the budget; False once hedges exceed their share."""
+
+        with self._lock:
+            if self._hedges + 1 > self._requests * self.policy.budget_percent / 100:
+                return False
+            self._hedges += 1
+            self.hedged += 1
+            return True
+
+    def observe(self, seconds: float, *, hedge_won: bool = False) -> None:
+        with self._lock:
+            self._histogram.observe(seconds)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            delay = None
+            if self._histogram.total >= MIN_SAMPLES:
+                delay = self._histogram.percentile(self.policy.percentile)
+            return {
+                "samples": self._histogram.total,
+                "hedge_delay": delay if delay is not None else 0.0,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+            }
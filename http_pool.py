@@ -0,0 +1,301 @@
+"""Bounded per-endpoint pool of persistent HTTP/1.1 connections."""
+
+from __future__ import annotations
+
+import http.client
+import select
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from telemetry import RequestTrace
+
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_IDLE_TIMEOUT_SECONDS = 30.0
+# A reused socket may have been closed by the server while it sat idle. Only
+# these failures, raised before any response byte arrives, are replayed once.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+_PoolKey = tuple[str, str, int]
+
+
+@dataclass
+class _IdleConnection:
+    connection: http.client.HTTPConnection
+    released_at: float
+
+
+def _pool_key(url: str) -> _PoolKey:
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in {"http", "https"} or not parts.hostname:
+        raise ValueError("Pooled requests require an absolute http or https URL")
+    port = parts.port or (443 if scheme == "https" else 80)
+    return scheme, parts.hostname, port
+
+
+def _request_target(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+    return target
+
+
+def _timed_create_connection(trace: RequestTrace):
+    """Build a ``create_connection`` that times name resolution and TCP apart."""
+
+    def create_connection(address, timeout, source_address=None) -> socket.socket:
+        host, port = address
+        started = time.monotonic()
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        trace.dns = time.monotonic() - started
+        started = time.monotonic()
+        error: OSError | None = None
+        for _family, _type, _proto, _name, sockaddr in infos:
+            try:
+                sock = socket.create_connection(
+                    (sockaddr[0], sockaddr[1]), timeout, source_address
+                )
+            except OSError as failure:
+                error = failure
+                continue
+            trace.connect = time.monotonic() - started
+            return sock
+        raise error or OSError(f"No address found for {host}")
+
+    return create_connection
+
+
+def _is_healthy(connection: http.client.HTTPConnection) -> bool:
+    """An idle keep-alive socket must be open and have nothing pending to read."""
+
+    sock = connection.sock
+    if sock is None:
+        return False
+    try:
+        readable, _writable, _errored = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return False
+    # Readable while idle means EOF or unsolicited bytes; neither can be reused.
+    return not readable
+
+
+def _fully_read(response: http.client.HTTPResponse) -> bool:
+    if response.isclosed():
+        return True
+    # HTTPResponse.read1 leaves a length-delimited body open at zero bytes left.
+    if not response.chunked and response.length == 0:
+        response.close()
+        return True
+    return False
+
+
+class ConnectionPool:
+    """Reuse HTTP/1.1 connections per scheme, host, and port.
+
+    Connections are handed out one request at a time. A connection returns to the
+    pool only after its response body was read to the end without an error and
+    the server did not ask to close it. Idle connections expire after
+    ``idle_timeout`` seconds and are probed before reuse; ``idle_timeout=0``
+    disables reuse entirely while keeping the per-host limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        if isinstance(max_per_host, bool) or not isinstance(max_per_host, int):
+            raise ValueError("max_per_host must be a positive integer")
+        if max_per_host <= 0:
+            raise ValueError("max_per_host must be a positive integer")
+        if not idle_timeout >= 0:
+            raise ValueError("idle_timeout must be zero or a positive number")
+        self.max_per_host = max_per_host
+        self.idle_timeout = float(idle_timeout)
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._condition = threading.Condition()
+        self._idle: dict[_PoolKey, list[_IdleConnection]] = {}
+        self._in_use: dict[_PoolKey, int] = {}
+        self._closed = False
+
+    def _open_connection(
+        self, key: _PoolKey, timeout: float
+    ) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    @staticmethod
+    def _connect(
+        connection: http.client.HTTPConnection, trace: RequestTrace | None
+    ) -> None:
+        if trace is None:
+            connection._create_connection = socket.create_connection
+            connection.connect()
+            return
+        connection._create_connection = _timed_create_connection(trace)
+        started = time.monotonic()
+        connection.connect()
+        if isinstance(connection, http.client.HTTPSConnection):
+            # The handshake is whatever connect() spent after TCP was up.
+            trace.tls = max(
+                0.0,
+                time.monotonic()
+                - started
+                - (trace.dns or 0.0)
+                - (trace.connect or 0.0),
+            )
+
+    def _discard_expired_locked(self, key: _PoolKey, now: float) -> None:
+        idle = self._idle.get(key)
+        if not idle:
+            return
+        keep: list[_IdleConnection] = []
+        for entry in idle:
+            if now - entry.released_at >= self.idle_timeout:
+                entry.connection.close()
+            else:
+                keep.append(entry)
+        self._idle[key] = keep
+
+    def _acquire(
+        self, key: _PoolKey, deadline: float
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                now = time.monotonic()
+                self._discard_expired_locked(key, now)
+                idle = self._idle.get(key, [])
+                while idle:
+                    entry = idle.pop()
+                    if _is_healthy(entry.connection):
+                        self._in_use[key] = self._in_use.get(key, 0) + 1
+                        return entry.connection, True
+                    entry.connection.close()
+                if self._in_use.get(key, 0) < self.max_per_host:
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a pooled connection")
+                self._condition.wait(remaining)
+        try:
+            return self._open_connection(key, max(0.001, deadline - now)), False
+        except BaseException:
+            self._release(key, None)
+            raise
+
+    def _release(
+        self, key: _PoolKey, connection: http.client.HTTPConnection | None
+    ) -> None:
+        with self._condition:
+            self._in_use[key] = max(0, self._in_use.get(key, 0) - 1)
+            if connection is not None:
+                if self._closed or self.idle_timeout <= 0:
+                    connection.close()
+                else:
+                    self._idle.setdefault(key, []).append(
+                        _IdleConnection(connection, time.monotonic())
+                    )
+            self._condition.notify()
+
+    @contextmanager
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None,
+        headers: Mapping[str, str],
+        deadline: float,
+        on_socket: Callable[[socket.socket], None] | None = None,
+        trace: RequestTrace | None = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Send one request and yield its response on a pooled connection.
+
+        The caller owns reading the body inside the ``with`` block. Leaving the
+        block early or with an exception closes the connection instead of
+        returning a half-read stream to the pool. ``on_socket`` sees each
+        connected socket before the request is written, so another thread can
+        shut it down to abort the exchange. ``trace`` receives the connection
+        phase timings, the time to the response head, and the bytes sent.
+        """
+
+        key = _pool_key(url)
+        target = _request_target(url)
+        connection, reused = self._acquire(key, deadline)
+        response: http.client.HTTPResponse | None = None
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("LLM response exceeded the total timeout")
+                connection.timeout = remaining
+                if connection.sock is not None:
+                    connection.sock.settimeout(remaining)
+                try:
+                    if connection.sock is None:
+                        self._connect(connection, trace)
+                    if on_socket is not None:
+                        on_socket(connection.sock)
+                    sent = time.monotonic()
+                    connection.request(method, target, body=body, headers=dict(headers))
+                    response = connection.getresponse()
+                    if trace is not None:
+                        trace.ttfb = time.monotonic() - sent
+                        trace.bytes_sent = len(body or b"")
+                        trace.reused = reused
+                    break
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    connection.close()
+                    reused = False
+            yield response
+        except BaseException:
+            connection.close()
+            self._release(key, None)
+            raise
+        reusable = (
+            response is not None
+            and not response.will_close
+            and _fully_read(response)
+            and connection.sock is not None
+        )
+        if not reusable:
+            connection.close()
+        self._release(key, connection if reusable else None)
+
+    def idle_count(self, url: str) -> int:
+        with self._condition:
+            return len(self._idle.get(_pool_key(url), ()))
+
+    def close(self) -> None:
+        """Close idle connections and refuse further checkouts."""
+
+        with self._condition:
+            self._closed = True
+            for idle in self._idle.values():
+                for entry in idle:
+                    entry.connection.close()
+            self._idle.clear()
+            self._condition.notify_all()
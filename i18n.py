@@ -584,6 +584,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "Paste",
         "edit.select_all": "Select All",
         "run.cancel": "Cancel",
+        "run.auto_check": "Check as You Type",
         "workspace.input": "Text to review",
         "workspace.issues": "Diagnostics",
         "workspace.output_empty": "Run an analysis to see diagnostics.",
@@ -592,6 +593,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "Message",
         "status.cursor": "Ln {line}, Col {column}",
         "status.issue_count": "{count} issue(s) found",
+        "status.issue_count_rejected": "{count} issue(s) found, {rejected} invalid one(s) left out",
+        "status.issues_edited": "{count} issue(s) left, {edited} edited since the analysis",
+        "status.diagnostic_edited": "This text was edited after the analysis. Run again to check it.",
         "status.results_stale": "Results refer to an earlier text snapshot. Run again to refresh.",
         "status.analysis_failed": "Analysis failed",
         "status.cancelled": "Analysis cancelled",
@@ -607,6 +611,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "Remote endpoints require HTTPS. Local HTTP is limited to localhost. A locally stored key remains plain text; prefer the environment option.",
         "styles.template": "Review guidance",
         "styles.example_hint": "Allowed placeholders only: {input_text}, {style_name}. The input text is sent separately.",
+        "llm.stream": "Stream responses (show diagnostics as they arrive)",
+        "status.streaming": "{count} diagnostic(s) received so far...",
+        "status.cached": "{count} issue(s) from an earlier analysis of this text",
+        "status.circuit_open": "LLM paused after repeated failures; next try in {seconds} s",
+        "status.circuit_probing": "LLM recovering; checking whether the endpoint is back",
+        "status.circuit_partial": "{count} of {total} LLM endpoints paused after failures",
     },
     "zh": {
         "menu.edit": "编辑",
@@ -617,6 +627,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "粘贴",
         "edit.select_all": "全选",
         "run.cancel": "取消",
+        "run.auto_check": "边输入边检查",
         "workspace.input": "待检查文本",
         "workspace.issues": "诊断列表",
         "workspace.output_empty": "运行分析后将在此显示诊断。",
@@ -625,6 +636,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "信息",
         "status.cursor": "第 {line} 行，第 {column} 列",
         "status.issue_count": "发现 {count} 个问题",
+        "status.issue_count_rejected": "发现 {count} 个问题，另有 {rejected} 条无效诊断被略去",
+        "status.issues_edited": "剩余 {count} 个问题，{edited} 处已在分析后修改",
+        "status.diagnostic_edited": "这段文本在分析后已被修改，请重新运行以检查。",
         "status.results_stale": "结果对应较早的文本版本，请重新运行。",
         "status.analysis_failed": "分析失败",
         "status.cancelled": "已取消分析",
@@ -640,6 +654,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "远程端点必须使用 HTTPS；本地 HTTP 仅限回环地址。本地保存的密钥仍是明文，建议优先使用环境变量。",
         "styles.template": "检查指导语",
         "styles.example_hint": "仅允许占位符：{input_text}、{style_name}。输入文本会单独发送。",
+        "llm.stream": "流式响应（诊断到达即显示）",
+        "status.streaming": "已收到 {count} 条诊断...",
+        "status.cached": "{count} 个问题（来自此前对相同文本的分析）",
+        "status.circuit_open": "LLM 多次失败后已暂停，{seconds} 秒后重试",
+        "status.circuit_probing": "LLM 正在恢复，正在检查端点是否可用",
+        "status.circuit_partial": "{total} 个 LLM 端点中有 {count} 个因失败已暂停",
     },
     "ja": {
         "menu.edit": "編集",
@@ -650,6 +670,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "貼り付け",
         "edit.select_all": "すべて選択",
         "run.cancel": "キャンセル",
+        "run.auto_check": "入力中に自動チェック",
         "workspace.input": "確認するテキスト",
         "workspace.issues": "診断",
         "workspace.output_empty": "分析を実行すると診断が表示されます。",
@@ -658,6 +679,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "メッセージ",
         "status.cursor": "{line} 行、{column} 列",
         "status.issue_count": "{count} 件の問題",
+        "status.issue_count_rejected": "{count} 件の問題（無効な {rejected} 件は除外）",
+        "status.issues_edited": "残り {count} 件の問題（分析後に {edited} 件を編集）",
+        "status.diagnostic_edited": "このテキストは分析後に編集されました。再実行して確認してください。",
         "status.results_stale": "結果は以前のテキストに対するものです。再実行してください。",
         "status.analysis_failed": "分析に失敗しました",
         "status.cancelled": "分析をキャンセルしました",
@@ -673,6 +697,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "リモート接続は HTTPS 必須です。HTTP はローカルホストだけで使用できます。キーは環境変数での利用を推奨します。",
         "styles.template": "レビュー指示",
         "styles.example_hint": "使用可能なプレースホルダー：{input_text}、{style_name}。本文は別に送信されます。",
+        "llm.stream": "ストリーミング応答（診断を到着順に表示）",
+        "status.streaming": "これまでに {count} 件の診断を受信...",
+        "status.cached": "{count} 件の問題（同じテキストの以前の分析結果）",
+        "status.circuit_open": "LLM は失敗が続いたため一時停止中です。{seconds} 秒後に再試行します",
+        "status.circuit_probing": "LLM を復旧中です。エンドポイントが使えるか確認しています",
+        "status.circuit_partial": "{total} 個中 {count} 個の LLM エンドポイントが失敗により一時停止中です",
     },
     "ko": {
         "menu.edit": "편집",
@@ -683,6 +713,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "붙여넣기",
         "edit.select_all": "모두 선택",
         "run.cancel": "취소",
+        "run.auto_check": "입력하는 동안 검사",
         "workspace.input": "검토할 텍스트",
         "workspace.issues": "진단",
         "workspace.output_empty": "분석을 실행하면 진단이 표시됩니다.",
@@ -691,6 +722,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "메시지",
         "status.cursor": "{line}행, {column}열",
         "status.issue_count": "문제 {count}개 발견",
+        "status.issue_count_rejected": "문제 {count}개 발견, 잘못된 진단 {rejected}개 제외",
+        "status.issues_edited": "남은 문제 {count}개, 분석 후 {edited}개 수정됨",
+        "status.diagnostic_edited": "이 텍스트는 분석 후 수정되었습니다. 다시 실행하여 확인하세요.",
         "status.results_stale": "이 결과는 이전 텍스트에 대한 것입니다. 다시 실행하세요.",
         "status.analysis_failed": "분석 실패",
         "status.cancelled": "분석 취소됨",
@@ -706,6 +740,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "원격 엔드포인트는 HTTPS가 필요합니다. HTTP는 로컬 호스트에서만 허용됩니다. 환경 변수 사용을 권장합니다.",
         "styles.template": "검토 지침",
         "styles.example_hint": "허용된 자리표시자: {input_text}, {style_name}. 입력문은 별도로 전송됩니다.",
+        "llm.stream": "스트리밍 응답(진단이 도착하는 대로 표시)",
+        "status.streaming": "지금까지 진단 {count}개 수신...",
+        "status.cached": "문제 {count}개(같은 텍스트의 이전 분석 결과)",
+        "status.circuit_open": "LLM이 반복 실패로 일시 중지되었습니다. {seconds}초 후 다시 시도합니다",
+        "status.circuit_probing": "LLM 복구 중: 엔드포인트가 돌아왔는지 확인하는 중입니다",
+        "status.circuit_partial": "LLM 엔드포인트 {total}개 중 {count}개가 실패로 일시 중지되었습니다",
     },
     "es": {
         "menu.edit": "Editar",
@@ -716,6 +756,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "Pegar",
         "edit.select_all": "Seleccionar todo",
         "run.cancel": "Cancelar",
+        "run.auto_check": "Revisar al escribir",
         "workspace.input": "Texto para revisar",
         "workspace.issues": "Diagnósticos",
         "workspace.output_empty": "Ejecuta un análisis para ver los diagnósticos.",
@@ -724,6 +765,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "Mensaje",
         "status.cursor": "Lín. {line}, Col. {column}",
         "status.issue_count": "Se encontraron {count} problema(s)",
+        "status.issue_count_rejected": "Se encontraron {count} problema(s); se omitieron {rejected} no válido(s)",
+        "status.issues_edited": "Quedan {count} problema(s); {edited} editado(s) tras el análisis",
+        "status.diagnostic_edited": "Este texto se editó después del análisis. Ejecuta de nuevo para comprobarlo.",
         "status.results_stale": "Los resultados corresponden a un texto anterior. Ejecuta de nuevo.",
         "status.analysis_failed": "El análisis falló",
         "status.cancelled": "Análisis cancelado",
@@ -739,6 +783,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "Los servidores remotos requieren HTTPS; HTTP solo se permite en localhost. Se recomienda usar la variable de entorno.",
         "styles.template": "Instrucciones de revisión",
         "styles.example_hint": "Solo se permiten: {input_text}, {style_name}. El texto se envía por separado.",
+        "llm.stream": "Respuestas en streaming (mostrar diagnósticos al llegar)",
+        "status.streaming": "{count} diagnóstico(s) recibido(s) hasta ahora...",
+        "status.cached": "{count} problema(s) de un análisis anterior de este texto",
+        "status.circuit_open": "LLM en pausa tras fallos repetidos; nuevo intento en {seconds} s",
+        "status.circuit_probing": "LLM en recuperación; comprobando si el servidor ha vuelto",
+        "status.circuit_partial": "{count} de {total} servidores LLM en pausa por fallos",
     },
     "de": {
         "menu.edit": "Bearbeiten",
@@ -749,6 +799,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "Einfügen",
         "edit.select_all": "Alles auswählen",
         "run.cancel": "Abbrechen",
+        "run.auto_check": "Beim Tippen prüfen",
         "workspace.input": "Zu prüfender Text",
         "workspace.issues": "Diagnosen",
         "workspace.output_empty": "Führe eine Analyse aus, um Diagnosen anzuzeigen.",
@@ -757,6 +808,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "Meldung",
         "status.cursor": "Z. {line}, Sp. {column}",
         "status.issue_count": "{count} Problem(e) gefunden",
+        "status.issue_count_rejected": "{count} Problem(e) gefunden, {rejected} ungültige ausgelassen",
+        "status.issues_edited": "{count} Problem(e) übrig, {edited} seit der Analyse bearbeitet",
+        "status.diagnostic_edited": "Dieser Text wurde nach der Analyse bearbeitet. Bitte erneut ausführen, um ihn zu prüfen.",
         "status.results_stale": "Die Ergebnisse beziehen sich auf einen älteren Text. Bitte erneut ausführen.",
         "status.analysis_failed": "Analyse fehlgeschlagen",
         "status.cancelled": "Analyse abgebrochen",
@@ -772,6 +826,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "Entfernte Endpunkte erfordern HTTPS; HTTP ist nur lokal zulässig. Die Umgebungsvariable wird empfohlen.",
         "styles.template": "Prüfanweisung",
         "styles.example_hint": "Nur erlaubt: {input_text}, {style_name}. Der Text wird getrennt gesendet.",
+        "llm.stream": "Antworten streamen (Diagnosen sofort anzeigen)",
+        "status.streaming": "Bisher {count} Diagnose(n) empfangen...",
+        "status.cached": "{count} Problem(e) aus einer früheren Analyse dieses Textes",
+        "status.circuit_open": "LLM nach wiederholten Fehlern pausiert; neuer Versuch in {seconds} s",
+        "status.circuit_probing": "LLM erholt sich; es wird geprüft, ob der Endpunkt wieder erreichbar ist",
+        "status.circuit_partial": "{count} von {total} LLM-Endpunkten nach Fehlern pausiert",
     },
     "fr": {
         "menu.edit": "Édition",
@@ -782,6 +842,7 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "edit.paste": "Coller",
         "edit.select_all": "Tout sélectionner",
         "run.cancel": "Annuler",
+        "run.auto_check": "Vérifier pendant la saisie",
         "workspace.input": "Texte à vérifier",
         "workspace.issues": "Diagnostics",
         "workspace.output_empty": "Lancez une analyse pour afficher les diagnostics.",
@@ -790,6 +851,9 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "diagnostic.message": "Message",
         "status.cursor": "Lig. {line}, Col. {column}",
         "status.issue_count": "{count} problème(s) détecté(s)",
+        "status.issue_count_rejected": "{count} problème(s) trouvé(s), {rejected} invalide(s) écarté(s)",
+        "status.issues_edited": "{count} problème(s) restant(s), {edited} modifié(s) depuis l’analyse",
+        "status.diagnostic_edited": "Ce texte a été modifié après l’analyse. Relancez pour le vérifier.",
         "status.results_stale": "Les résultats concernent un texte antérieur. Relancez l’analyse.",
         "status.analysis_failed": "Échec de l’analyse",
         "status.cancelled": "Analyse annulée",
@@ -805,6 +869,12 @@ _WORKSPACE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "llm.security_note": "Les serveurs distants exigent HTTPS ; HTTP est réservé à localhost. La variable d’environnement est recommandée.",
         "styles.template": "Consignes de relecture",
         "styles.example_hint": "Champs autorisés : {input_text}, {style_name}. Le texte est envoyé séparément.",
+        "llm.stream": "Réponses en flux (afficher les diagnostics dès leur arrivée)",
+        "status.streaming": "{count} diagnostic(s) reçu(s) jusqu’ici...",
+        "status.cached": "{count} problème(s) issu(s) d’une analyse précédente de ce texte",
+        "status.circuit_open": "LLM en pause après des échecs répétés ; nouvel essai dans {seconds} s",
+        "status.circuit_probing": "LLM en reprise ; vérification de la disponibilité du serveur",
+        "status.circuit_partial": "{count} serveur(s) LLM sur {total} en pause après des échecs",
     },
 }
 
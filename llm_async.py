@@ -0,0 +1,923 @@
+"""asyncio client that runs frozen LLM requests on non-blocking sockets."""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import io
+import socket
+import ssl
+import time
+import urllib.parse
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Mapping
+from dataclasses import dataclass
+from typing import Tuple
+
+from circuit_breaker import CircuitBreakers
+from config_manager import ConfigManager
+from diagnostics import CompileResult, Diagnostic
+from http_pool import DEFAULT_IDLE_TIMEOUT_SECONDS
+from llm_client import (
+    _REDIRECT_CODES,
+    LENGTH_TRUNCATED_MESSAGE,
+    MAX_ERROR_BYTES,
+    MAX_RESPONSE_BYTES,
+    READ_CHUNK_BYTES,
+    AnalysisCancelled,
+    AnalysisRequest,
+    BatchAnalysisRequest,
+    BatchPart,
+    CancellationToken,
+    ChunkedAnalysisRequest,
+    LLMClient,
+    RequestSnapshot,
+    _Attempt,
+    _ContentDecoder,
+    _endpoint_health,
+    _error_failure,
+    _EventStreamReader,
+    _outcome_failure,
+)
+from rate_limit import RateLimiter
+from result_cache import ParagraphCache, ResultCache
+from retry import AttemptRecord
+from styles import StyleManager
+from telemetry import RequestTrace
+
+DEFAULT_MAX_CONCURRENCY = 64
+MAX_HEADER_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+# A reused socket may have been closed while idle; replay once on a fresh one.
+_STALE_CONNECTION_ERRORS = (
+    asyncio.IncompleteReadError,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+_PoolKey = tuple[str, str, int]
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    released_at: float = 0.0
+
+    def abort(self) -> None:
+        # abort() drops buffered data and closes the socket without a handshake.
+        self.writer.transport.abort()
+
+
+@dataclass
+class _Response:
+    status: int
+    reason: str
+    headers: http.client.HTTPMessage
+    length: int | None
+    chunked: bool
+    will_close: bool
+    complete: bool = False
+
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("LLM response exceeded the total timeout")
+    return remaining
+
+
+async def _within(awaitable, deadline: float):
+    try:
+        return await asyncio.wait_for(awaitable, _remaining(deadline))
+    except asyncio.TimeoutError:
+        raise TimeoutError("LLM response exceeded the total timeout") from None
+
+
+class AsyncLLMClient:
+    """Run analyses concurrently from one thread with the threaded client's rules.
+
+    Requests are prepared and validated by an inner :class:`LLMClient`, so
+    snapshots, response parsing, redaction, chunking, and caching are shared.
+    At most ``max_concurrency`` requests are in flight at once; keep-alive
+    connections are reused per scheme, host, and port. Cancelling a task aborts
+    its socket immediately. An instance belongs to the event loop that first
+    uses it. Endpoints reached through an environment proxy fall back to the
+    threaded client on a worker thread.
+    """
+
+    def __init__(
+        self,
+        cfg: ConfigManager,
+        style_manager: StyleManager,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        cache: ResultCache | None = None,
+        paragraph_cache: ParagraphCache | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+        circuits: CircuitBreakers | None = None,
+    ) -> None:
+        if isinstance(max_concurrency, bool) or not isinstance(max_concurrency, int):
+            raise ValueError("max_concurrency must be a positive integer")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer")
+        if not idle_timeout >= 0:
+            raise ValueError("idle_timeout must be zero or a positive number")
+        self.client = LLMClient(
+            cfg,
+            style_manager,
+            cache=cache,
+            paragraph_cache=paragraph_cache,
+            circuits=circuits,
+        )
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = float(idle_timeout)
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._idle: dict[_PoolKey, list[_Connection]] = {}
+        self._closed = False
+
+    def prepare_analysis(self, style_name: str, input_text: str) -> AnalysisRequest:
+        return self.client.prepare_analysis(style_name, input_text)
+
+    def prepare_document_analysis(
+        self, style_name: str, input_text: str
+    ) -> AnalysisRequest | ChunkedAnalysisRequest:
+        return self.client.prepare_document_analysis(style_name, input_text)
+
+    def prepare_batch_analysis(
+        self, style_name: str, documents: Mapping[str, str]
+    ) -> BatchAnalysisRequest:
+        return self.client.prepare_batch_analysis(style_name, documents)
+
+    def prepare_connectivity(self, overrides=None) -> RequestSnapshot:
+        return self.client.prepare_connectivity(overrides)
+
+    async def aclose(self) -> None:
+        """Close idle keep-alive connections and refuse further requests."""
+
+        self._closed = True
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.writer.close()
+        self.client.close()
+
+    async def __aenter__(self) -> AsyncLLMClient:
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:
+        await self.aclose()
+
+    async def run_connectivity(self, snapshot: RequestSnapshot) -> Tuple[bool, str]:
+        if not isinstance(snapshot, RequestSnapshot):
+            raise TypeError("snapshot must be a RequestSnapshot")
+        ok, text = await self._send_snapshot(snapshot)
+        if not ok:
+            return False, text
+        return self.client._is_connectivity_pong(text), text
+
+    async def analyze(self, style_name: str, input_text: str) -> CompileResult:
+        return await self.run_analysis(self.prepare_analysis(style_name, input_text))
+
+    async def run_analysis(
+        self,
+        request: AnalysisRequest | ChunkedAnalysisRequest,
+        *,
+        on_diagnostic: Callable[[Diagnostic], None] | None = None,
+    ) -> CompileResult:
+        """Execute a frozen request; see :meth:`LLMClient.run_analysis`."""
+
+        if isinstance(request, ChunkedAnalysisRequest):
+            request.cancel_token.raise_if_cancelled()
+            return await self._run_chunked_analysis(request, on_diagnostic)
+        if not isinstance(request, AnalysisRequest):
+            raise TypeError("request must be an AnalysisRequest")
+        request.cancel_token.raise_if_cancelled()
+        client = self.client
+        key = client._cache_key(request)
+        if key is not None:
+            cached = await asyncio.to_thread(client.cache.get, key, request.source_text)
+            if cached is not None:
+                return cached
+        parser = client._stream_parser(request, on_diagnostic)
+        ok, text = await self._send_snapshot(
+            request.request_snapshot,
+            on_content=client._diagnostic_feed(parser, on_diagnostic),
+            cancel_token=request.cancel_token,
+        )
+        if not ok:
+            raise RuntimeError(text)
+        result = client._parsed_result(parser, text, request)
+        repair = client._repair_request(request, result)
+        if repair is not None:
+            snapshot, unsent = repair
+            ok, text = await self._send_snapshot(
+                snapshot, cancel_token=request.cancel_token
+            )
+            result = client._repaired_result(
+                request, result, unsent, text if ok else None
+            )
+        if key is not None and not result.rejected:
+            await asyncio.to_thread(client.cache.put, key, result)
+        return result
+
+    async def _run_chunked_analysis(
+        self,
+        request: ChunkedAnalysisRequest,
+        on_diagnostic: Callable[[Diagnostic], None] | None,
+    ) -> CompileResult:
+        client = self.client
+        workers = asyncio.Semaphore(max(1, request.max_workers))
+        results: list[CompileResult | None] = [None] * len(request.parts)
+
+        async def run_part(index: int) -> None:
+            chunk, part = request.parts[index]
+            async with workers:
+                try:
+                    results[index] = await self.run_analysis(
+                        part,
+                        on_diagnostic=client._chunk_callback(chunk, on_diagnostic),
+                    )
+                except AnalysisCancelled:
+                    raise
+                except Exception as error:
+                    raise client._chunk_failure(chunk, error) from error
+
+        tasks = [
+            asyncio.ensure_future(run_part(index)) for index in range(len(results))
+        ]
+        try:
+            if tasks:
+                done, _pending = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_EXCEPTION
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return client._finish_chunked_analysis(request, results)
+
+    async def run_batch_analysis(
+        self, request: BatchAnalysisRequest
+    ) -> dict[str, CompileResult | Exception]:
+        """Run a frozen batch; see :meth:`LLMClient.run_batch_analysis`."""
+
+        if not isinstance(request, BatchAnalysisRequest):
+            raise TypeError("request must be a BatchAnalysisRequest")
+        request.cancel_token.raise_if_cancelled()
+        outcomes: dict[str, CompileResult | Exception] = dict(request.reused)
+        workers = asyncio.Semaphore(max(1, request.max_workers))
+
+        async def run_part(part: BatchPart) -> None:
+            async with workers:
+                outcomes.update(await self._run_batch_part(part, request.cancel_token))
+
+        tasks = [asyncio.ensure_future(run_part(part)) for part in request.parts]
+        try:
+            if tasks:
+                done, _pending = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_EXCEPTION
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return outcomes
+
+    async def _run_batch_part(
+        self, part: BatchPart, cancel_token: CancellationToken
+    ) -> dict[str, CompileResult | Exception]:
+        if part.request_snapshot is None:
+            return await self._run_single_document(*part.documents[0])
+        members = [
+            (str(number), key, document)
+            for number, (key, document) in enumerate(part.documents, start=1)
+        ]
+        return await self._run_packed(part.request_snapshot, members, cancel_token)
+
+    async def _run_single_document(
+        self, key: str, request: AnalysisRequest | ChunkedAnalysisRequest
+    ) -> dict[str, CompileResult | Exception]:
+        try:
+            return {key: await self.run_analysis(request)}
+        except AnalysisCancelled:
+            raise
+        except Exception as error:
+            return {key: error}
+
+    async def _run_packed(
+        self,
+        snapshot: RequestSnapshot,
+        members: list[tuple[str, str, AnalysisRequest]],
+        cancel_token: CancellationToken,
+    ) -> dict[str, CompileResult | Exception]:
+        client = self.client
+        ok, text = await self._send_snapshot(snapshot, cancel_token=cancel_token)
+        if not ok and not text.startswith(LENGTH_TRUNCATED_MESSAGE):
+            error = RuntimeError(text)
+            return {key: error for _number, key, _document in members}
+        found, missing = client._packed_results(members, text if ok else None)
+        outcomes: dict[str, CompileResult | Exception] = {}
+        for key, document, result in found:
+            outcomes[key] = result
+            cache_key = client._cache_key(document)
+            if cache_key is not None:
+                await asyncio.to_thread(client.cache.put, cache_key, result)
+        for half in client._halves(missing):
+            if len(half) == 1:
+                _number, key, document = half[0]
+                outcomes.update(await self._run_single_document(key, document))
+            else:
+                repacked = client._repacked(snapshot, {number for number, *_ in half})
+                outcomes.update(await self._run_packed(repacked, half, cancel_token))
+        return outcomes
+
+    async def _send_snapshot(
+        self,
+        snapshot: RequestSnapshot,
+        *,
+        on_content: Callable[[str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
+    ) -> Tuple[bool, str]:
+        """Async counterpart of :meth:`LLMClient._send_snapshot`.
+
+        Besides task cancellation, ``cancel_token`` may be cancelled from any
+        thread; it aborts the socket and raises :class:`AnalysisCancelled`.
+        """
+
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        if LLMClient._uses_proxy(snapshot.endpoint):
+            return await asyncio.to_thread(
+                self.client._send_snapshot,
+                snapshot,
+                on_content=on_content,
+                cancel_token=cancel_token,
+            )
+        client = self.client
+        deadline = time.monotonic() + snapshot.timeout
+        delivered = False
+
+        def forward(text: str) -> None:
+            nonlocal delivered
+            delivered = True
+            on_content(text)
+
+        retried: Counter[str] = Counter()
+        tried: set[int] = set()
+        delay = 0.0
+        number = 0
+        while True:
+            index = client._admit_endpoint(snapshot, tried)
+            if index is None:
+                client._finish_request(number, False)
+                return False, client._circuit_open_message(snapshot)
+            number += 1
+            tried.add(index)
+            target = snapshot.endpoints[index]
+            limiter = client._limiter_for(target)
+            started = time.monotonic()
+            if limiter is not None:
+                try:
+                    started = await self._acquire_rate_limit(
+                        limiter, target, cancel_token
+                    )
+                except BaseException:
+                    client._record_circuit(target, 0.0, None)
+                    raise
+            attempt = _Attempt(False, "Request was not sent")
+            try:
+                if snapshot.hedge is not None and on_content is None:
+                    attempt = await self._hedged_attempt(
+                        snapshot, index, deadline, cancel_token
+                    )
+                else:
+                    attempt = await self._attempt(
+                        target,
+                        deadline,
+                        forward if on_content is not None else None,
+                        cancel_token,
+                    )
+            finally:
+                if limiter is not None:
+                    limiter.release(
+                        started, status=attempt.status, headers=attempt.headers
+                    )
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            failover = LLMClient._should_fail_over(
+                snapshot, attempt, tried, deadline, delivered
+            )
+            retry_delay = (
+                0.0
+                if failover
+                else LLMClient._retry_delay(
+                    snapshot, attempt, retried, delay, deadline, delivered
+                )
+            )
+            client.retry_stats.record(
+                AttemptRecord(
+                    number,
+                    attempt.status,
+                    attempt.failure,
+                    time.monotonic() - started,
+                    retry_delay,
+                    target.endpoint,
+                )
+            )
+            if retry_delay is None:
+                client._finish_request(number, attempt.ok)
+                return attempt.ok, attempt.text
+            if failover:
+                continue
+            retried[attempt.failure] += 1
+            delay = retry_delay
+            await self._backoff(delay, cancel_token)
+
+    async def _attempt(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        cancel_token: CancellationToken | None,
+    ) -> _Attempt:
+        client = self.client
+        balancer = client.balancer
+        started = balancer.begin(snapshot.endpoint)
+        healthy: bool | None = None
+        trace = RequestTrace()
+        attempt: _Attempt | None = None
+        try:
+            try:
+                async with self._slots:
+                    attempt = await self._exchange(
+                        snapshot, deadline, on_content, cancel_token, trace
+                    )
+            except TimeoutError:
+                attempt = _Attempt(False, "LLM response exceeded the total timeout")
+            except Exception as error:
+                detail = LLMClient._safe_error_detail(str(error), snapshot)
+                attempt = _Attempt(False, detail, failure=_error_failure(error, None))
+            if cancel_token is None or not cancel_token.cancelled:
+                healthy = _endpoint_health(attempt)
+            return attempt
+        finally:
+            client._record_trace(snapshot, trace, started, attempt)
+            balancer.end(snapshot.endpoint, started, healthy=healthy)
+            client._record_circuit(snapshot, time.monotonic() - started, healthy)
+
+    async def _hedged_attempt(
+        self,
+        request: RequestSnapshot,
+        index: int,
+        deadline: float,
+        cancel_token: CancellationToken | None,
+    ) -> _Attempt:
+        """Async counterpart of :meth:`LLMClient._hedged_exchange`."""
+
+        client = self.client
+        snapshot = request.endpoints[index]
+        hedger = client._hedger_for(snapshot)
+        hedge_delay = hedger.delay()
+        started = time.monotonic()
+        primary = asyncio.create_task(
+            self._attempt(snapshot, deadline, None, cancel_token)
+        )
+        pending = {primary}
+        hedge: asyncio.Task[_Attempt] | None = None
+        limiter: RateLimiter | None = None
+        hedge_started = 0.0
+        failure: _Attempt | None = None
+        try:
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                hedge_index = None
+                if not done and hedger.allow():
+                    hedge_index = client._admit_endpoint(request, {index})
+                if hedge_index is not None:
+                    target = request.endpoints[hedge_index]
+                    limiter = client._limiter_for(target)
+                    if (
+                        limiter is None
+                        or limiter.try_acquire(target.estimated_tokens) <= 0
+                    ):
+                        hedge_started = time.monotonic()
+                        hedge = asyncio.create_task(
+                            self._attempt(target, deadline, None, cancel_token)
+                        )
+                        pending.add(hedge)
+                    else:
+                        client._record_circuit(target, 0.0, None)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    attempt = task.result()
+                    if attempt.ok:
+                        won = task is hedge
+                        since = hedge_started if won else started
+                        hedger.observe(time.monotonic() - since, hedge_won=won)
+                        if won:
+                            # The primary was at least this slow.
+                            hedger.observe(time.monotonic() - started)
+                        return attempt
+                    if failure is None or task is primary:
+                        failure = attempt
+            return failure
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if hedge is not None and limiter is not None:
+                hedged = None
+                if hedge.done() and not hedge.cancelled():
+                    hedged = hedge.result()
+                limiter.release(
+                    hedge_started,
+                    status=hedged.status if hedged else None,
+                    headers=hedged.headers if hedged else None,
+                )
+
+    @staticmethod
+    async def _backoff(delay: float, cancel_token: CancellationToken | None) -> None:
+        if cancel_token is None:
+            await asyncio.sleep(delay)
+            return
+        loop = asyncio.get_running_loop()
+        woken = asyncio.Event()
+        unregister = cancel_token.register(lambda: loop.call_soon_threadsafe(woken.set))
+        try:
+            await asyncio.wait_for(woken.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            unregister()
+        cancel_token.raise_if_cancelled()
+
+    @staticmethod
+    async def _acquire_rate_limit(
+        limiter: RateLimiter,
+        snapshot: RequestSnapshot,
+        cancel_token: CancellationToken | None,
+    ) -> float:
+        # The limiter's blocking wait would stall the event loop; poll instead.
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            wait = limiter.try_acquire(snapshot.estimated_tokens)
+            if wait <= 0:
+                return time.monotonic()
+            await asyncio.sleep(min(wait, 0.05))
+
+    async def _exchange(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        cancel_token: CancellationToken | None,
+        trace: RequestTrace,
+    ) -> _Attempt:
+        parts = urllib.parse.urlsplit(snapshot.endpoint)
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError("Async requests require an absolute http or https URL")
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        payload = self._request_bytes(snapshot, key, target)
+
+        loop = asyncio.get_running_loop()
+        unregister: list[Callable[[], None]] = []
+
+        def watch(connection: _Connection) -> None:
+            if cancel_token is not None:
+                unregister.append(
+                    cancel_token.register(
+                        lambda: loop.call_soon_threadsafe(connection.abort)
+                    )
+                )
+
+        connection, reused = await self._acquire(key, deadline, trace)
+        watch(connection)
+        reusable = False
+        try:
+            while True:
+                try:
+                    sent = time.monotonic()
+                    connection.writer.write(payload)
+                    await _within(connection.writer.drain(), deadline)
+                    response = await self._read_head(connection.reader, deadline)
+                    trace.ttfb = time.monotonic() - sent
+                    trace.bytes_sent = len(snapshot.wire_body)
+                    trace.reused = reused
+                    break
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    connection.abort()
+                    connection = await self._connect(key, deadline, trace)
+                    reused = False
+                    watch(connection)
+            status = response.status
+            headers = dict(response.headers.items())
+            try:
+                ok, text = await self._read_outcome(
+                    connection, response, snapshot, deadline, on_content, trace
+                )
+            except TimeoutError:
+                text = "LLM response exceeded the total timeout"
+                return _Attempt(False, text, status, headers)
+            except Exception as error:
+                detail = LLMClient._safe_error_detail(str(error), snapshot)
+                failure = _error_failure(error, status)
+                return _Attempt(False, detail, status, headers, failure)
+            reusable = response.complete and not response.will_close
+            failure = None if ok else _outcome_failure(status, text)
+            return _Attempt(ok, text, status, headers, failure)
+        finally:
+            for callback in unregister:
+                callback()
+            if cancel_token is not None and cancel_token.cancelled:
+                reusable = False
+            # Errors and cancellation land here too: never reuse a half-read socket.
+            if reusable and not self._closed and self.idle_timeout > 0:
+                connection.released_at = time.monotonic()
+                self._idle.setdefault(key, []).append(connection)
+            else:
+                connection.abort()
+
+    @staticmethod
+    def _request_bytes(snapshot: RequestSnapshot, key: _PoolKey, target: str) -> bytes:
+        scheme, host, port = key
+        default_port = 443 if scheme == "https" else 80
+        host_header = host if ":" not in host else f"[{host}]"
+        if port != default_port:
+            host_header += f":{port}"
+        body = snapshot.wire_body
+        lines = [
+            f"POST {target} HTTP/1.1",
+            f"Host: {host_header}",
+            f"Content-Length: {len(body)}",
+        ]
+        if "Accept-Encoding" not in snapshot.headers:
+            lines.append("Accept-Encoding: identity")
+        lines.extend(f"{name}: {value}" for name, value in snapshot.headers.items())
+        head = "\r\n".join(lines) + "\r\n\r\n"
+        return head.encode("latin-1") + body
+
+    async def _acquire(
+        self, key: _PoolKey, deadline: float, trace: RequestTrace | None = None
+    ) -> tuple[_Connection, bool]:
+        if self._closed:
+            raise RuntimeError("Async LLM client is closed")
+        idle = self._idle.get(key, [])
+        now = time.monotonic()
+        while idle:
+            connection = idle.pop()
+            if (
+                now - connection.released_at < self.idle_timeout
+                and not connection.reader.at_eof()
+                and not connection.writer.is_closing()
+            ):
+                return connection, True
+            connection.abort()
+        return await self._connect(key, deadline, trace), False
+
+    async def _connect(
+        self, key: _PoolKey, deadline: float, trace: RequestTrace | None = None
+    ) -> _Connection:
+        """Resolve, connect, and handshake as separately timed steps."""
+
+        scheme, host, port = key
+        context = self._ssl_context if scheme == "https" else None
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        infos = await _within(
+            loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), deadline
+        )
+        resolved = time.monotonic()
+        sock: socket.socket | None = None
+        error: OSError | None = None
+        for family, kind, proto, _name, address in infos:
+            candidate = socket.socket(family, kind, proto)
+            candidate.setblocking(False)
+            try:
+                await _within(loop.sock_connect(candidate, address), deadline)
+            except OSError as failure:
+                candidate.close()
+                error = failure
+                continue
+            except BaseException:
+                candidate.close()
+                raise
+            sock = candidate
+            break
+        if sock is None:
+            raise error or OSError(f"No address found for {host}")
+        connected = time.monotonic()
+        try:
+            reader, writer = await _within(
+                asyncio.open_connection(
+                    sock=sock,
+                    ssl=context,
+                    server_hostname=host if context is not None else None,
+                    limit=MAX_HEADER_BYTES,
+                ),
+                deadline,
+            )
+        except BaseException:
+            sock.close()
+            raise
+        if trace is not None:
+            trace.dns = resolved - started
+            trace.connect = connected - resolved
+            if context is not None:
+                trace.tls = time.monotonic() - connected
+        return _Connection(reader, writer)
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader, deadline: float) -> _Response:
+        try:
+            status_line = await _within(reader.readuntil(b"\r\n"), deadline)
+        except asyncio.LimitOverrunError:
+            raise ValueError("LLM response status line is too long") from None
+        version, _space, rest = status_line.decode("latin-1").strip().partition(" ")
+        code, _space, reason = rest.partition(" ")
+        if not version.startswith("HTTP/") or not code.isdigit() or len(code) != 3:
+            raise ValueError("LLM endpoint sent an invalid HTTP status line")
+        lines = []
+        size = 0
+        while True:
+            try:
+                line = await _within(reader.readuntil(b"\r\n"), deadline)
+            except asyncio.LimitOverrunError:
+                raise ValueError("LLM response headers are too large") from None
+            size += len(line)
+            if size > MAX_HEADER_BYTES or len(lines) > MAX_HEADER_LINES:
+                raise ValueError("LLM response headers are too large")
+            if line == b"\r\n":
+                break
+            lines.append(line)
+        headers = http.client.parse_headers(io.BytesIO(b"".join(lines) + b"\r\n"))
+        status = int(code)
+        chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+        length = None
+        if not chunked and headers.get("Content-Length"):
+            try:
+                length = int(headers["Content-Length"])
+            except ValueError:
+                raise ValueError("LLM response has an invalid Content-Length") from None
+            if length < 0:
+                raise ValueError("LLM response has an invalid Content-Length")
+        if status in {204, 304} or 100 <= status < 200:
+            length = 0
+        connection_header = headers.get("Connection", "").lower()
+        will_close = (
+            version == "HTTP/1.0"
+            or "close" in connection_header
+            or (length is None and not chunked)
+        )
+        return _Response(status, reason, headers, length, chunked, will_close)
+
+    async def _read_outcome(
+        self,
+        connection: _Connection,
+        response: _Response,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        trace: RequestTrace | None = None,
+    ) -> Tuple[bool, str]:
+        status = response.status
+        if not 200 <= status < 300:
+            raw_error = None
+            if status not in _REDIRECT_CODES:
+                try:
+                    raw_error = await self._read_limited(
+                        connection, response, MAX_ERROR_BYTES, deadline, trace
+                    )
+                except (ValueError, OSError, EOFError):
+                    raw_error = None
+            return LLMClient._http_error(status, raw_error, response.reason, snapshot)
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() == "text/event-stream":
+            reader = _EventStreamReader(snapshot, on_content, trace)
+            try:
+                async for chunk in self._iter_body(
+                    connection, response, MAX_RESPONSE_BYTES, deadline, trace
+                ):
+                    reader.feed(chunk)
+            except UnicodeDecodeError as error:
+                return False, f"LLM response is not valid UTF-8: {error}"
+            return reader.finish()
+        raw = await self._read_limited(
+            connection, response, MAX_RESPONSE_BYTES, deadline, trace
+        )
+        return LLMClient._parse_response(raw, snapshot, trace)
+
+    async def _read_limited(
+        self,
+        connection: _Connection,
+        response: _Response,
+        limit: int,
+        deadline: float,
+        trace: RequestTrace | None = None,
+    ) -> bytes:
+        chunks = [
+            chunk
+            async for chunk in self._iter_body(
+                connection, response, limit, deadline, trace
+            )
+        ]
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _iter_body(
+        connection: _Connection,
+        response: _Response,
+        limit: int,
+        deadline: float,
+        trace: RequestTrace | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield decoded body chunks as they arrive, bounded in size and time."""
+
+        decoder = _ContentDecoder.for_headers(response.headers, limit)
+        async for chunk in AsyncLLMClient._iter_framed(
+            connection, response, limit, deadline
+        ):
+            if trace is not None:
+                trace.bytes_received += len(chunk)
+            if decoder is not None:
+                chunk = decoder.feed(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+        if decoder is not None:
+            decoder.finish()
+
+    @staticmethod
+    async def _iter_framed(
+        connection: _Connection, response: _Response, limit: int, deadline: float
+    ) -> AsyncIterator[bytes]:
+        """Yield raw body chunks as framed on the wire, bounded in size and time."""
+
+        reader = connection.reader
+        if response.length is not None and response.length > limit:
+            raise ValueError(f"LLM response exceeds the {limit}-byte limit")
+        total = 0
+        if response.chunked:
+            while True:
+                line = await _within(reader.readuntil(b"\r\n"), deadline)
+                try:
+                    size = int(line.split(b";", 1)[0].strip(), 16)
+                except ValueError:
+                    raise ValueError("LLM response has an invalid chunk size") from None
+                if size == 0:
+                    # Skip optional trailers up to the terminating blank line.
+                    while await _within(reader.readuntil(b"\r\n"), deadline) != b"\r\n":
+                        pass
+                    break
+                total += size
+                if total > limit:
+                    raise ValueError(f"LLM response exceeds the {limit}-byte limit")
+                remaining = size
+                while remaining:
+                    chunk = await _within(
+                        reader.read(min(READ_CHUNK_BYTES, remaining)), deadline
+                    )
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+                await _within(reader.readexactly(2), deadline)
+        elif response.length is not None:
+            remaining = response.length
+            while remaining:
+                chunk = await _within(
+                    reader.read(min(READ_CHUNK_BYTES, remaining)), deadline
+                )
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await _within(reader.read(READ_CHUNK_BYTES), deadline)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > limit:
+                    raise ValueError(f"LLM response exceeds the {limit}-byte limit")
+                yield chunk
+        response.complete = True
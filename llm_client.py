@@ -2,38 +2,165 @@
 
 from __future__ import annotations
 
+import bisect
+import codecs
+import gzip
+import http.client
 import json
 import math
 import os
 import re
+import socket
+import ssl
+import threading
 import time
 import unicodedata
 import urllib.error
 import urllib.parse
 import urllib.request
-from collections.abc import Mapping
+import zlib
+from collections import Counter
+from collections.abc import Callable, Collection, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from copy import deepcopy
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import cached_property
 from types import MappingProxyType
 from typing import Any, Dict, List, Optional, Tuple
 
+from chunking import (
+    Chunk,
+    chunk_line_range,
+    merge_chunk_results,
+    offset_chunk,
+    plan_batches,
+    plan_chunks,
+    remap_diagnostic,
+    split_paragraphs,
+)
+from circuit_breaker import (
+    DEFAULT_FAILURE_PERCENT,
+    DEFAULT_MINIMUM_REQUESTS,
+    DEFAULT_OPEN_SECONDS,
+    DEFAULT_SLOW_PERCENT,
+    DEFAULT_SLOW_SECONDS,
+    DEFAULT_WINDOW_SECONDS,
+    MAX_OPEN_SECONDS,
+    CircuitBreakers,
+    CircuitPolicy,
+)
 from config_manager import ConfigManager
-from diagnostics import CompileResult, parse_diagnostics, render_diagnostics
+from diagnostics import (
+    MAX_DIAGNOSTICS,
+    CompileResult,
+    Diagnostic,
+    DiagnosticParser,
+    Rejection,
+    SourceIndex,
+    canonical_diagnostics,
+    parse_batch_diagnostics,
+    parse_diagnostics,
+    rejection_line,
+    render_diagnostics,
+)
+from hedging import (
+    DEFAULT_HEDGE_BUDGET_PERCENT,
+    DEFAULT_HEDGE_PERCENTILE,
+    HedgePolicy,
+    Hedger,
+)
+from http_pool import ConnectionPool
+from load_balancer import (
+    BALANCING_MODES,
+    DEFAULT_BALANCING,
+    MAX_ENDPOINTS,
+    MAX_WEIGHT,
+    LoadBalancer,
+)
+from prompt_cache import (
+    DEFAULT_PROMPT_LAYOUT,
+    PROMPT_LAYOUTS,
+    UsageStats,
+    usage_from,
+)
+from rate_limit import (
+    DEFAULT_MAX_CONCURRENCY,
+    MAX_CONCURRENCY,
+    MAX_PER_MINUTE,
+    RateLimiter,
+    RateLimitPolicy,
+    parse_retry_after,
+)
+from result_cache import ParagraphCache, ResultCache, paragraph_key, request_key
+from retry import (
+    FAILURE_KINDS,
+    MAX_DELAY_SECONDS,
+    MAX_RETRIES,
+    AttemptRecord,
+    RetryPolicy,
+    RetryStats,
+)
 from styles import StyleManager, render_guidance_template
+from telemetry import MetricsRegistry, RequestTrace
+from token_budget import (
+    DEFAULT_CONTEXT_TOKENS,
+    DEFAULT_DIAGNOSTICS_PER_1K_TOKENS,
+    DEFAULT_MAX_COMPLETION_TOKENS,
+    DEFAULT_TOKENS_PER_DIAGNOSTIC,
+    TokenBudget,
+    estimate_tokens,
+)
 
 MAX_RESPONSE_BYTES = 2 * 1024 * 1024
 MAX_ERROR_BYTES = 64 * 1024
 MAX_ANALYSIS_BYTES = 2 * 1024 * 1024
+MAX_DOCUMENT_BYTES = 16 * 1024 * 1024
+MAX_CHUNK_TOKENS = 500_000
+MAX_CHUNK_WORKERS = 32
+MAX_BATCH_DOCUMENTS = 100
+MAX_REPAIR_ITEMS = 100
 MAX_ERROR_DISPLAY_CHARS = 2_048
 MAX_TIMEOUT_SECONDS = 3_600
 READ_CHUNK_BYTES = 64 * 1024
+# Request bodies below this size are not worth a gzip round trip.
+DEFAULT_COMPRESSION_MIN_BYTES = 1_024
 TOKEN_PARAMETERS = frozenset({"max_tokens", "max_completion_tokens"})
 _HEADER_NAME = re.compile(r"^[!#$%&'*+.^_`|~0-9A-Za-z-]+$")
 _REDIRECT_CODES = {301, 302, 303, 307, 308}
+_RETRYABLE_STATUSES = {429: "throttled", 502: "server", 503: "server", 504: "server"}
+TRUNCATED_JSON_MESSAGE = "Invalid or truncated JSON response"
+LENGTH_TRUNCATED_MESSAGE = "LLM response was truncated"
+# Success responses that end like this broke off rather than being wrong.
+_TRUNCATED_MESSAGES = (
+    TRUNCATED_JSON_MESSAGE,
+    "Empty response body from LLM endpoint",
+    "LLM response is missing a completion finish reason",
+)
+# A retry must leave at least this much of the deadline for the attempt itself.
+MIN_ATTEMPT_SECONDS = 1.0
+_SSE_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+# Settings an entry of llm.endpoints may set; the rest is shared by all of them.
+ENDPOINT_SETTINGS = frozenset(
+    {
+        "base_url",
+        "model",
+        "api_key",
+        "auth",
+        "temperature",
+        "max_tokens",
+        "token_parameter",
+        "rate_limit",
+        "compression",
+        "weight",
+    }
+)
 _RESERVED_AUTH_HEADERS = frozenset(
     {
         "accept",
+        "accept-encoding",
         "connection",
+        "content-encoding",
         "content-length",
         "content-type",
         "expect",
@@ -65,15 +192,305 @@ class RequestSnapshot:
     body: bytes = field(repr=False)
     timeout: float
     sensitive_values: tuple[str, ...] = field(default=(), repr=False)
+    stream: bool = False
+    rate_limit: RateLimitPolicy | None = None
+    estimated_tokens: int = 0
+    retry: RetryPolicy | None = None
+    hedge: HedgePolicy | None = None
+    circuit: CircuitPolicy | None = None
+    # A probe is sent even through an open circuit, and its outcome counts.
+    probe: bool = False
+    weight: float = 1.0
+    balancing: str = DEFAULT_BALANCING
+    # Further endpoints that can serve the same request, each fully validated.
+    alternates: tuple[RequestSnapshot, ...] = field(default=(), repr=False)
+    # The body goes out gzip-compressed; the headers already say so.
+    compress: bool = False
+
+    @property
+    def endpoints(self) -> tuple[RequestSnapshot, ...]:
+        return (self, *self.alternates)
+
+    @cached_property
+    def wire_body(self) -> bytes:
+        """The bytes actually sent; ``body`` stays plain for keys and repacking."""
+
+        if not self.compress:
+            return self.body
+        return gzip.compress(self.body, compresslevel=6, mtime=0)
+
+
+@dataclass(frozen=True)
+class _Attempt:
+    """One wire exchange: the caller-facing outcome plus what the server sent."""
+
+    ok: bool
+    text: str
+    status: int | None = None
+    headers: Mapping[str, str] = field(default_factory=dict, repr=False)
+    failure: str | None = None
+
+
+def _error_failure(error: BaseException, status: int | None) -> str | None:
+    """Classify an exception raised by one exchange for the retry policy."""
+
+    if isinstance(error, (TimeoutError, ssl.SSLCertVerificationError)):
+        return None
+    if not isinstance(error, (OSError, EOFError, http.client.HTTPException)):
+        return None
+    # Nothing was received yet, or the body broke off after a success status.
+    if status is None:
+        return "connection"
+    return "truncated" if 200 <= status < 300 else None
+
+
+def _message_text(message: Mapping[str, Any]) -> str:
+    """Return the text of a chat message whose content is a string or parts."""
+
+    content = message.get("content", "")
+    if isinstance(content, list):
+        return "".join(str(part.get("text", "")) for part in content)
+    return str(content)
+
+
+def _endpoint_health(attempt: _Attempt) -> bool | None:
+    """Judge an endpoint by one outcome; None when it says nothing about health."""
+
+    if attempt.ok:
+        return True
+    if attempt.status is None or attempt.status >= 500:
+        return False
+    return False if attempt.failure == "truncated" else None
+
+
+def _outcome_failure(status: int | None, text: str) -> str | None:
+    """Classify a failed outcome that was read without an exception."""
+
+    if status in _RETRYABLE_STATUSES:
+        return _RETRYABLE_STATUSES[status]
+    if status is not None and 200 <= status < 300:
+        if text.startswith(_TRUNCATED_MESSAGES):
+            return "truncated"
+    return None
+
+
+class _ContentDecoder:
+    """Incrementally decode a gzip or deflate response body within a size cap.
+
+    Each chunk is inflated to at most one byte past the remaining allowance,
+    so a small compressed body that expands enormously is rejected once it
+    passes ``limit`` instead of being inflated into memory first.
+    """
+
+    def __init__(self, encoding: str, limit: int) -> None:
+        self.limit = limit
+        self._remaining = limit
+        self._pending = b""
+        self._decompressor = (
+            zlib.decompressobj(wbits=31) if encoding == "gzip" else None
+        )
+
+    @staticmethod
+    def for_headers(headers, limit: int) -> _ContentDecoder | None:
+        """Return a decoder for the response ``Content-Encoding``, if it has one."""
+
+        raw = str(headers.get("Content-Encoding") or "")
+        codings = [
+            coding
+            for coding in (part.strip().lower() for part in raw.split(","))
+            if coding and coding != "identity"
+        ]
+        if not codings:
+            return None
+        if len(codings) > 1 or codings[0] not in ("gzip", "x-gzip", "deflate"):
+            raise ValueError(f"Unsupported LLM response encoding: {raw[:64]}")
+        return _ContentDecoder("deflate" if codings[0] == "deflate" else "gzip", limit)
+
+    def feed(self, data: bytes) -> bytes:
+        if self._decompressor is None:
+            self._pending += data
+            if len(self._pending) < 2:
+                return b""
+            data, self._pending = self._pending, b""
+            # "deflate" means zlib-wrapped data, but some servers send it raw.
+            wrapped = data[0] & 0x0F == 8 and (data[0] << 8 | data[1]) % 31 == 0
+            self._decompressor = zlib.decompressobj(wbits=15 if wrapped else -15)
+        try:
+            output = self._decompressor.decompress(data, self._remaining + 1)
+        except zlib.error as error:
+            raise ValueError(
+                f"LLM response has invalid compressed data: {error}"
+            ) from None
+        self._remaining -= len(output)
+        if self._remaining < 0:
+            raise ValueError(f"LLM response exceeds the {self.limit}-byte limit")
+        if self._decompressor.unused_data:
+            raise ValueError("LLM response has data after its compressed body")
+        return output
+
+    def finish(self) -> None:
+        """Raise EOFError when the compressed body broke off before its end."""
+
+        if self._decompressor is None and not self._pending:
+            return
+        if self._decompressor is None or not self._decompressor.eof:
+            raise EOFError("Compressed LLM response ended early")
+
+
+class AnalysisCancelled(Exception):
+    """An analysis was cancelled before it produced an outcome."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation signal shared by every request of one analysis.
+
+    Callbacks registered while a request is in flight run once on cancellation;
+    the network layer registers one that shuts the socket down, so a blocked
+    read returns at once instead of waiting for the timeout.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._event = threading.Event()
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run ``callback`` on cancellation; return a function that unregisters it.
+
+        An already cancelled token runs the callback immediately.
+        """
+
+        with self._lock:
+            if not self._cancelled:
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+
+                def unregister() -> None:
+                    with self._lock:
+                        self._callbacks.pop(callback_id, None)
+
+                return unregister
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise AnalysisCancelled("Analysis was cancelled")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds; return early with True on cancellation."""
+
+        return self._event.wait(timeout)
+
+
+def _abort_socket(sock: socket.socket) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+@dataclass(frozen=True)
+class RecoveryPolicy:
+    """Keep the valid diagnostics of a response when others fail validation.
+
+    With ``repair``, up to ``max_repair_items`` rejected diagnostics go back to
+    the model in one follow-up request that carries only them, the reasons
+    they failed, and the source lines around them.
+    """
+
+    repair: bool = False
+    max_repair_items: int = 20
 
 
 @dataclass(frozen=True)
 class AnalysisRequest:
-    """Source context plus the immutable wire request captured by the UI thread."""
+    """Source context plus the immutable wire request captured by the UI thread.
+
+    Without a ``recovery`` policy, one invalid diagnostic fails the analysis.
+    """
 
     style_name: str
     source_text: str = field(repr=False)
     request_snapshot: RequestSnapshot = field(repr=False)
+    cacheable: bool = False
+    cancel_token: CancellationToken = field(
+        default_factory=CancellationToken, repr=False, compare=False
+    )
+    recovery: RecoveryPolicy | None = None
+
+
+@dataclass(frozen=True)
+class ChunkedAnalysisRequest:
+    """A document split into independently frozen chunk requests.
+
+    ``reused`` holds paragraph results taken from the paragraph cache, in
+    paragraph-relative coordinates; only ``parts`` are sent. ``pending`` lists
+    the paragraphs whose fresh results are stored under their keys afterwards.
+    """
+
+    style_name: str
+    source_text: str = field(repr=False)
+    parts: tuple[tuple[Chunk, AnalysisRequest], ...] = field(repr=False)
+    max_workers: int = 4
+    reused: tuple[tuple[Chunk, CompileResult], ...] = field(default=(), repr=False)
+    pending: tuple[tuple[Chunk, str], ...] = field(default=(), repr=False)
+    cancel_token: CancellationToken = field(
+        default_factory=CancellationToken, repr=False, compare=False
+    )
+
+
+@dataclass(frozen=True)
+class BatchPart:
+    """Documents sent together, keyed by the caller, with their own requests.
+
+    ``request_snapshot`` carries every document of the part in one request and
+    numbers them from ``"1"`` in order. A part without one holds a single
+    document that is sent as its ordinary request.
+    """
+
+    documents: tuple[tuple[str, AnalysisRequest | ChunkedAnalysisRequest], ...] = field(
+        repr=False
+    )
+    request_snapshot: RequestSnapshot | None = field(default=None, repr=False)
+
+
+@dataclass(frozen=True)
+class BatchAnalysisRequest:
+    """Many short documents packed into as few requests as the budget allows.
+
+    ``reused`` holds results already in the result cache; only ``parts`` are
+    sent.
+    """
+
+    style_name: str
+    parts: tuple[BatchPart, ...] = field(repr=False)
+    max_workers: int = 4
+    reused: tuple[tuple[str, CompileResult], ...] = field(default=(), repr=False)
+    cancel_token: CancellationToken = field(
+        default_factory=CancellationToken, repr=False, compare=False
+    )
 
 
 def _freeze(value: Any) -> Any:
@@ -109,10 +526,205 @@ def _reject_duplicate_keys(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
     return result
 
 
+class _SSEDecoder:
+    """Incremental text/event-stream decoder that yields each event's data."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._pending = ""
+        self._data: list[str] = []
+
+    def feed(self, chunk: bytes, *, final: bool = False) -> list[str]:
+        text = self._pending + self._decoder.decode(chunk, final)
+        carry = ""
+        if not final and text.endswith("\r"):
+            # The matching "\n" may arrive in the next chunk.
+            text, carry = text[:-1], "\r"
+        lines = _SSE_LINE_BREAK.split(text)
+        self._pending = ("" if final else lines.pop()) + carry
+        events: list[str] = []
+        for line in lines:
+            if not line:
+                if self._data:
+                    events.append("\n".join(self._data))
+                    self._data = []
+                continue
+            if line.startswith(":"):
+                continue
+            name, _colon, value = line.partition(":")
+            if name == "data":
+                self._data.append(value[1:] if value.startswith(" ") else value)
+        if final and self._data:
+            events.append("\n".join(self._data))
+            self._data = []
+        return events
+
+
+class _CompletionStream:
+    """Reassemble streamed chat-completion chunks into one message payload."""
+
+    def __init__(self) -> None:
+        self.content: list[str] = []
+        self.refusal: list[str] = []
+        self.finish_reason: Any = None
+        self.error: Any = None
+        self.invalid: str | None = None
+        self.usage: Any = None
+        self.done = False
+
+    def feed(self, data: str) -> str:
+        """Consume one event and return its new content text."""
+
+        if data.strip() == "[DONE]":
+            self.done = True
+            return ""
+        try:
+            chunk = json.loads(data, object_pairs_hook=_reject_duplicate_keys)
+        except ValueError as error:
+            detail = error.msg if isinstance(error, json.JSONDecodeError) else error
+            self.invalid = f"{TRUNCATED_JSON_MESSAGE}: {detail}"
+            self.done = True
+            return ""
+        if not isinstance(chunk, dict):
+            self.invalid = "LLM stream event must be a JSON object"
+            self.done = True
+            return ""
+        if "error" in chunk:
+            self.error = chunk["error"]
+            return ""
+        if isinstance(chunk.get("usage"), dict):
+            self.usage = chunk["usage"]
+        choices = chunk.get("choices")
+        if not isinstance(choices, list) or not choices:
+            # Providers may send usage-only or keep-alive chunks without choices.
+            return ""
+        choice = choices[0]
+        if not isinstance(choice, dict):
+            self.invalid = "LLM response contains an invalid choice"
+            self.done = True
+            return ""
+        if choice.get("finish_reason") is not None:
+            self.finish_reason = choice["finish_reason"]
+        delta = choice.get("delta")
+        if not isinstance(delta, dict):
+            return ""
+        refusal = delta.get("refusal")
+        if isinstance(refusal, str):
+            self.refusal.append(refusal)
+        content = delta.get("content")
+        if isinstance(content, str) and content:
+            self.content.append(content)
+            return content
+        return ""
+
+    def payload(self) -> dict[str, Any]:
+        if self.error is not None:
+            return {"error": self.error}
+        return {
+            "usage": self.usage,
+            "choices": [
+                {
+                    "finish_reason": self.finish_reason,
+                    "message": {
+                        "role": "assistant",
+                        "content": "".join(self.content),
+                        "refusal": "".join(self.refusal) or None,
+                    },
+                }
+            ],
+        }
+
+
+class _EventStreamReader:
+    """Turn raw event-stream bytes into content callbacks and a final outcome.
+
+    The last characters of the text so far are held back from ``on_content``
+    until the next delta or the end of the stream, so that a configured secret
+    split across deltas is seen whole before any of it is passed on. Once
+    the text contains a secret, nothing more is passed on; the final payload
+    check rejects such a response anyway.
+    """
+
+    def __init__(
+        self,
+        snapshot: RequestSnapshot,
+        on_content: Callable[[str], None] | None,
+        trace: RequestTrace | None = None,
+    ) -> None:
+        self.snapshot = snapshot
+        self.trace = trace
+        self._decoder = _SSEDecoder()
+        self._stream = _CompletionStream()
+        self._secrets = [value for value in snapshot.sensitive_values if value]
+        self._overlap = max((len(value) for value in self._secrets), default=1) - 1
+        # Text not passed on yet because a secret may start within it.
+        self._held = ""
+        self._on_content = on_content
+
+    def feed(self, chunk: bytes) -> None:
+        self._consume(self._decoder.feed(chunk))
+
+    def finish(self) -> Tuple[bool, str]:
+        try:
+            self._consume(self._decoder.feed(b"", final=True))
+        except UnicodeDecodeError as error:
+            return False, f"LLM response is not valid UTF-8: {error}"
+        if self._held and self._on_content is not None:
+            self._on_content(self._held)
+        self._held = ""
+        if self._stream.invalid is not None:
+            return False, self._stream.invalid
+        return LLMClient._parse_payload(
+            self._stream.payload(), self.snapshot, self.trace
+        )
+
+    def _consume(self, events: list[str]) -> None:
+        for data in events:
+            if self._stream.done:
+                return
+            text = self._stream.feed(data)
+            if not text or self._on_content is None:
+                continue
+            window = self._held + text
+            if any(value in window for value in self._secrets):
+                self._on_content = None
+                self._held = ""
+                continue
+            ready = len(window) - self._overlap
+            self._held = window[max(ready, 0) :]
+            if ready > 0:
+                self._on_content(window[:ready])
+
+
 class LLMClient:
-    def __init__(self, cfg: ConfigManager, style_manager: StyleManager) -> None:
+    def __init__(
+        self,
+        cfg: ConfigManager,
+        style_manager: StyleManager,
+        *,
+        pool: ConnectionPool | None = None,
+        cache: ResultCache | None = None,
+        paragraph_cache: ParagraphCache | None = None,
+        circuits: CircuitBreakers | None = None,
+    ) -> None:
         self.cfg = cfg
         self.styles = style_manager
+        self.cache = cache
+        self.paragraph_cache = paragraph_cache
+        self._pool = pool if pool is not None else ConnectionPool()
+        self._limiters: dict[tuple[str, RateLimitPolicy], RateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+        self.retry_stats = RetryStats()
+        self.usage_stats = UsageStats()
+        self.metrics = MetricsRegistry()
+        self._hedgers: dict[tuple[str, HedgePolicy], Hedger] = {}
+        self.balancer = LoadBalancer()
+        self.circuits = circuits if circuits is not None else CircuitBreakers()
+
+    def close(self) -> None:
+        """Release pooled keep-alive connections."""
+
+        self._pool.close()
 
     def _configuration_snapshot(
         self, overrides: Optional[Mapping[str, Any]] = None
@@ -212,7 +824,9 @@ class LLMClient:
 
     @staticmethod
     def _body_from(
-        snapshot: Mapping[str, Any], messages: List[Dict[str, str]]
+        snapshot: Mapping[str, Any],
+        messages: List[Dict[str, Any]],
+        completion_tokens: int | None = None,
     ) -> Dict[str, Any]:
         model = LLMClient._value(snapshot, "llm", "model", default="")
         if not isinstance(model, str) or not model.strip():
@@ -247,7 +861,7 @@ class LLMClient:
             allowed = ", ".join(sorted(TOKEN_PARAMETERS))
             raise ValueError(f"LLM token parameter must be one of: {allowed}")
 
-        clean_messages: List[Dict[str, str]] = []
+        clean_messages: List[Dict[str, Any]] = []
         for message in messages:
             if not isinstance(message, Mapping):
                 raise ValueError("Each LLM message must be a mapping")
@@ -255,7 +869,17 @@ class LLMClient:
             content = message.get("content")
             if not isinstance(role, str) or not role:
                 raise ValueError("Each LLM message requires a role")
-            if not isinstance(content, str):
+            if isinstance(content, list):
+                # Text parts, which may carry provider cache-control hints.
+                if not content or not all(
+                    isinstance(part, Mapping)
+                    and part.get("type") == "text"
+                    and isinstance(part.get("text"), str)
+                    for part in content
+                ):
+                    raise ValueError("Each LLM message requires text content")
+                content = [_thaw(part) for part in content]
+            elif not isinstance(content, str):
                 raise ValueError("Each LLM message requires text content")
             clean_messages.append({"role": role, "content": content})
         body = {
@@ -263,7 +887,13 @@ class LLMClient:
             "messages": clean_messages,
             "temperature": temperature,
         }
-        body[token_parameter] = max_tokens
+        # A predicted completion only ever raises the configured budget.
+        body[token_parameter] = max(max_tokens, completion_tokens or 0)
+        stream = LLMClient._value(snapshot, "llm", "stream", default=False)
+        if not isinstance(stream, bool):
+            raise ValueError("LLM stream setting must be true or false")
+        if stream:
+            body["stream"] = True
         return body
 
     @staticmethod
@@ -281,13 +911,435 @@ class LLMClient:
             )
         return timeout
 
+    @staticmethod
+    def _chunking_from(snapshot: Mapping[str, Any]) -> tuple[int, int]:
+        """Return the validated chunk token budget and worker count."""
+
+        values = []
+        for key, default, maximum in (
+            ("max_chunk_tokens", 2_000, MAX_CHUNK_TOKENS),
+            ("max_workers", 4, MAX_CHUNK_WORKERS),
+        ):
+            raw = LLMClient._value(snapshot, "llm", "chunking", key, default=default)
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, int)
+                or not 0 < raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM chunking {key} must be an integer from 1 to {maximum}"
+                )
+            values.append(raw)
+        return values[0], values[1]
+
+    @staticmethod
+    def _token_budget_from(snapshot: Mapping[str, Any]) -> TokenBudget | None:
+        """Return the pre-flight token budget, or None while it is disabled."""
+
+        enabled = LLMClient._value(
+            snapshot, "llm", "token_budget", "enabled", default=True
+        )
+        if not isinstance(enabled, bool):
+            raise ValueError("LLM token_budget enabled must be true or false")
+        values: list[int | float] = []
+        for key, default, minimum, maximum in (
+            ("context_tokens", DEFAULT_CONTEXT_TOKENS, 256, 10_000_000),
+            ("max_completion_tokens", DEFAULT_MAX_COMPLETION_TOKENS, 16, 1_000_000),
+        ):
+            raw = LLMClient._value(
+                snapshot, "llm", "token_budget", key, default=default
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, int)
+                or not minimum <= raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM token_budget {key} must be an integer from {minimum} "
+                    f"to {maximum}"
+                )
+            values.append(raw)
+        density = LLMClient._value(
+            snapshot,
+            "llm",
+            "token_budget",
+            "diagnostics_per_1k_tokens",
+            default=DEFAULT_DIAGNOSTICS_PER_1K_TOKENS,
+        )
+        if (
+            isinstance(density, bool)
+            or not isinstance(density, (int, float))
+            or not math.isfinite(density)
+            or not 0.1 <= density <= 1_000
+        ):
+            raise ValueError(
+                "LLM token_budget diagnostics_per_1k_tokens must be a number from "
+                "0.1 to 1000"
+            )
+        values.append(float(density))
+        per_diagnostic = LLMClient._value(
+            snapshot,
+            "llm",
+            "token_budget",
+            "tokens_per_diagnostic",
+            default=DEFAULT_TOKENS_PER_DIAGNOSTIC,
+        )
+        if (
+            isinstance(per_diagnostic, bool)
+            or not isinstance(per_diagnostic, int)
+            or not 1 <= per_diagnostic <= 10_000
+        ):
+            raise ValueError(
+                "LLM token_budget tokens_per_diagnostic must be an integer from 1 "
+                "to 10000"
+            )
+        values.append(per_diagnostic)
+        return TokenBudget(*values) if enabled else None
+
+    @staticmethod
+    def _batching_from(snapshot: Mapping[str, Any]) -> tuple[bool, int, int]:
+        """Return whether batching is on, its token budget, and its size cap."""
+
+        enabled = LLMClient._value(
+            snapshot, "llm", "batching", "enabled", default=False
+        )
+        if not isinstance(enabled, bool):
+            raise ValueError("LLM batching enabled must be true or false")
+        values = []
+        for key, default, maximum in (
+            ("max_batch_tokens", 2_000, MAX_CHUNK_TOKENS),
+            ("max_documents", 16, MAX_BATCH_DOCUMENTS),
+        ):
+            raw = LLMClient._value(snapshot, "llm", "batching", key, default=default)
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, int)
+                or not 0 < raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM batching {key} must be an integer from 1 to {maximum}"
+                )
+            values.append(raw)
+        return enabled, values[0], values[1]
+
+    @staticmethod
+    def _recovery_from(snapshot: Mapping[str, Any]) -> RecoveryPolicy | None:
+        """Return how to treat invalid diagnostics; None rejects the response."""
+
+        enabled = LLMClient._value(
+            snapshot, "llm", "recovery", "enabled", default=False
+        )
+        if not isinstance(enabled, bool):
+            raise ValueError("LLM recovery enabled must be true or false")
+        repair = LLMClient._value(snapshot, "llm", "recovery", "repair", default=False)
+        if not isinstance(repair, bool):
+            raise ValueError("LLM recovery repair must be true or false")
+        max_items = LLMClient._value(
+            snapshot, "llm", "recovery", "max_repair_items", default=20
+        )
+        if (
+            isinstance(max_items, bool)
+            or not isinstance(max_items, int)
+            or not 0 < max_items <= MAX_REPAIR_ITEMS
+        ):
+            raise ValueError(
+                "LLM recovery max_repair_items must be an integer from 1 to "
+                f"{MAX_REPAIR_ITEMS}"
+            )
+        return RecoveryPolicy(repair, max_items) if enabled else None
+
+    @staticmethod
+    def _prompt_cache_from(snapshot: Mapping[str, Any]) -> tuple[str, bool]:
+        """Return the prompt layout and whether to send cache-control hints."""
+
+        layout = LLMClient._value(
+            snapshot, "llm", "prompt_cache", "layout", default=DEFAULT_PROMPT_LAYOUT
+        )
+        if layout not in PROMPT_LAYOUTS:
+            raise ValueError(
+                f"LLM prompt_cache layout must be one of: {', '.join(PROMPT_LAYOUTS)}"
+            )
+        cache_control = LLMClient._value(
+            snapshot, "llm", "prompt_cache", "cache_control", default=False
+        )
+        if not isinstance(cache_control, bool):
+            raise ValueError("LLM prompt_cache cache_control must be true or false")
+        return layout, cache_control
+
+    @staticmethod
+    def _compression_from(snapshot: Mapping[str, Any]) -> tuple[bool, bool, int]:
+        """Return request gzip, response decoding, and the gzip size threshold."""
+
+        flags = []
+        for key in ("request", "response"):
+            raw = LLMClient._value(snapshot, "llm", "compression", key, default=False)
+            if not isinstance(raw, bool):
+                raise ValueError(f"LLM compression {key} must be true or false")
+            flags.append(raw)
+        minimum = LLMClient._value(
+            snapshot,
+            "llm",
+            "compression",
+            "min_request_bytes",
+            default=DEFAULT_COMPRESSION_MIN_BYTES,
+        )
+        if (
+            isinstance(minimum, bool)
+            or not isinstance(minimum, int)
+            or not 0 <= minimum <= MAX_ANALYSIS_BYTES
+        ):
+            raise ValueError(
+                "LLM compression min_request_bytes must be an integer from 0 to "
+                f"{MAX_ANALYSIS_BYTES}"
+            )
+        return flags[0], flags[1], minimum
+
+    @staticmethod
+    def _rate_limit_from(snapshot: Mapping[str, Any]) -> RateLimitPolicy:
+        """Return the validated client-side quota for the configured endpoint."""
+
+        values = []
+        for key, default, minimum, maximum in (
+            ("requests_per_minute", 0, 0, MAX_PER_MINUTE),
+            ("tokens_per_minute", 0, 0, MAX_PER_MINUTE),
+            ("max_concurrency", DEFAULT_MAX_CONCURRENCY, 1, MAX_CONCURRENCY),
+        ):
+            raw = LLMClient._value(snapshot, "llm", "rate_limit", key, default=default)
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, int)
+                or not minimum <= raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM rate_limit {key} must be an integer from {minimum} to {maximum}"
+                )
+            values.append(raw)
+        adaptive = LLMClient._value(
+            snapshot, "llm", "rate_limit", "adaptive", default=True
+        )
+        if not isinstance(adaptive, bool):
+            raise ValueError("LLM rate_limit adaptive must be true or false")
+        return RateLimitPolicy(*values, adaptive)
+
+    @staticmethod
+    def _retry_from(snapshot: Mapping[str, Any]) -> RetryPolicy:
+        """Return the validated retry policy; zero retries disable a class."""
+
+        defaults = RetryPolicy()
+        retries = []
+        for kind in FAILURE_KINDS:
+            raw = LLMClient._value(
+                snapshot, "llm", "retry", kind, default=getattr(defaults, kind)
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, int)
+                or not 0 <= raw <= MAX_RETRIES
+            ):
+                raise ValueError(
+                    f"LLM retry {kind} must be an integer from 0 to {MAX_RETRIES}"
+                )
+            retries.append(raw)
+        delays = []
+        for key, default in (
+            ("base_delay_seconds", defaults.base_delay),
+            ("max_delay_seconds", defaults.max_delay),
+        ):
+            raw = LLMClient._value(snapshot, "llm", "retry", key, default=default)
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or not math.isfinite(raw)
+                or not 0 < raw <= MAX_DELAY_SECONDS
+            ):
+                raise ValueError(
+                    f"LLM retry {key} must be a number above 0 and at most "
+                    f"{MAX_DELAY_SECONDS:g}"
+                )
+            delays.append(float(raw))
+        if delays[0] > delays[1]:
+            raise ValueError(
+                "LLM retry base_delay_seconds must not exceed max_delay_seconds"
+            )
+        return RetryPolicy(*retries, *delays)
+
+    @staticmethod
+    def _hedge_from(snapshot: Mapping[str, Any]) -> HedgePolicy | None:
+        """Return the hedging policy, or None while hedging is disabled."""
+
+        enabled = LLMClient._value(snapshot, "llm", "hedge", "enabled", default=False)
+        if not isinstance(enabled, bool):
+            raise ValueError("LLM hedge enabled must be true or false")
+        values = []
+        for key, default, minimum, maximum in (
+            ("percentile", DEFAULT_HEDGE_PERCENTILE, 50, 99.9),
+            ("budget_percent", DEFAULT_HEDGE_BUDGET_PERCENT, 0, 100),
+        ):
+            raw = LLMClient._value(snapshot, "llm", "hedge", key, default=default)
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or not math.isfinite(raw)
+                or not minimum <= raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM hedge {key} must be a number from {minimum} to {maximum}"
+                )
+            values.append(float(raw))
+        return HedgePolicy(*values) if enabled else None
+
+    @staticmethod
+    def _circuit_from(snapshot: Mapping[str, Any]) -> CircuitPolicy | None:
+        """Return the circuit breaker policy, or None while it is disabled."""
+
+        enabled = LLMClient._value(
+            snapshot, "llm", "circuit_breaker", "enabled", default=True
+        )
+        if not isinstance(enabled, bool):
+            raise ValueError("LLM circuit_breaker enabled must be true or false")
+        values = []
+        for key, default, minimum, maximum in (
+            ("failure_percent", DEFAULT_FAILURE_PERCENT, 1, 100),
+            ("slow_seconds", DEFAULT_SLOW_SECONDS, 0.1, MAX_TIMEOUT_SECONDS),
+            ("slow_percent", DEFAULT_SLOW_PERCENT, 1, 100),
+        ):
+            raw = LLMClient._value(
+                snapshot, "llm", "circuit_breaker", key, default=default
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or not math.isfinite(raw)
+                or not minimum <= raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM circuit_breaker {key} must be a number from {minimum} "
+                    f"to {maximum}"
+                )
+            values.append(float(raw))
+        minimum_requests = LLMClient._value(
+            snapshot,
+            "llm",
+            "circuit_breaker",
+            "minimum_requests",
+            default=DEFAULT_MINIMUM_REQUESTS,
+        )
+        if (
+            isinstance(minimum_requests, bool)
+            or not isinstance(minimum_requests, int)
+            or not 1 <= minimum_requests <= 10_000
+        ):
+            raise ValueError(
+                "LLM circuit_breaker minimum_requests must be an integer from 1 "
+                "to 10000"
+            )
+        values.append(minimum_requests)
+        for key, default, maximum in (
+            ("window_seconds", DEFAULT_WINDOW_SECONDS, MAX_TIMEOUT_SECONDS),
+            ("open_seconds", DEFAULT_OPEN_SECONDS, MAX_OPEN_SECONDS),
+        ):
+            raw = LLMClient._value(
+                snapshot, "llm", "circuit_breaker", key, default=default
+            )
+            if (
+                isinstance(raw, bool)
+                or not isinstance(raw, (int, float))
+                or not math.isfinite(raw)
+                or not 1 <= raw <= maximum
+            ):
+                raise ValueError(
+                    f"LLM circuit_breaker {key} must be a number from 1 to {maximum:g}"
+                )
+            values.append(float(raw))
+        return CircuitPolicy(*values) if enabled else None
+
+    @staticmethod
+    def _balancing_from(snapshot: Mapping[str, Any]) -> str:
+        mode = LLMClient._value(snapshot, "llm", "balancing", default=DEFAULT_BALANCING)
+        if mode not in BALANCING_MODES:
+            allowed = ", ".join(BALANCING_MODES)
+            raise ValueError(f"LLM balancing must be one of: {allowed}")
+        return mode
+
+    @staticmethod
+    def _endpoint_configs_from(
+        snapshot: Mapping[str, Any],
+    ) -> list[tuple[Mapping[str, Any], float]]:
+        """Return one full configuration and weight per extra endpoint.
+
+        Entries inherit every shared setting from ``llm`` but never its
+        credentials: a key meant for one host is not sent to another unless
+        the entry names it.
+        """
+
+        entries = LLMClient._value(snapshot, "llm", "endpoints", default=())
+        if not isinstance(entries, (list, tuple)):
+            raise ValueError("LLM endpoints must be a list")
+        if len(entries) >= MAX_ENDPOINTS:
+            raise ValueError(f"LLM endpoints allow at most {MAX_ENDPOINTS - 1} entries")
+        configs = []
+        for index, entry in enumerate(entries, start=1):
+            if not isinstance(entry, Mapping):
+                raise ValueError(f"LLM endpoint {index} must be a mapping")
+            unknown = sorted(set(entry) - ENDPOINT_SETTINGS)
+            if unknown:
+                raise ValueError(
+                    f"LLM endpoint {index} has an unsupported setting: {unknown[0]}"
+                )
+            weight = entry.get("weight", 1)
+            if (
+                isinstance(weight, bool)
+                or not isinstance(weight, (int, float))
+                or not math.isfinite(weight)
+                or not 0 <= weight <= MAX_WEIGHT
+            ):
+                raise ValueError(
+                    f"LLM endpoint {index} weight must be a number from 0 to "
+                    f"{MAX_WEIGHT}"
+                )
+            config = _thaw(snapshot)
+            llm = config["llm"]
+            llm.pop("endpoints", None)
+            llm["api_key"] = ""
+            llm["auth"] = {}
+            _deep_merge(
+                llm, {key: value for key, value in entry.items() if key != "weight"}
+            )
+            configs.append((_freeze(config), float(weight)))
+        return configs
+
     def _build_request_snapshot(
         self,
-        messages: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
         overrides: Optional[Mapping[str, Any]] = None,
+        *,
+        completion_tokens: int | None = None,
+        config_snapshot: Mapping[str, Any] | None = None,
     ) -> RequestSnapshot:
-        config_snapshot = self._configuration_snapshot(overrides)
-        body = self._body_from(config_snapshot, messages)
+        if config_snapshot is None:
+            config_snapshot = self._configuration_snapshot(overrides)
+        snapshot = self._endpoint_snapshot(config_snapshot, messages, completion_tokens)
+        balancing = self._balancing_from(config_snapshot)
+        alternates = []
+        for index, (config, weight) in enumerate(
+            self._endpoint_configs_from(config_snapshot), start=1
+        ):
+            try:
+                alternate = self._endpoint_snapshot(config, messages, completion_tokens)
+            except ValueError as error:
+                raise ValueError(f"LLM endpoint {index}: {error}") from error
+            alternates.append(replace(alternate, weight=weight))
+        if not alternates:
+            return snapshot
+        return replace(snapshot, balancing=balancing, alternates=tuple(alternates))
+
+    def _endpoint_snapshot(
+        self,
+        config_snapshot: Mapping[str, Any],
+        messages: List[Dict[str, Any]],
+        completion_tokens: int | None = None,
+    ) -> RequestSnapshot:
+        body = self._body_from(config_snapshot, messages, completion_tokens)
         encoded = json.dumps(
             body,
             ensure_ascii=False,
@@ -295,14 +1347,61 @@ class LLMClient:
             separators=(",", ":"),
         ).encode("utf-8")
         headers, sensitive_values = self._headers_and_sensitive_from(config_snapshot)
+        stream = body.get("stream") is True
+        if stream:
+            headers["Accept"] = "text/event-stream, application/json"
+        compress_request, accept_compressed, min_compressed = self._compression_from(
+            config_snapshot
+        )
+        if accept_compressed:
+            headers["Accept-Encoding"] = "gzip, deflate"
+        compress = compress_request and len(encoded) >= min_compressed
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        # Providers count the prompt plus the completion budget against quotas.
+        completion_tokens = next(
+            (
+                body[name]
+                for name in TOKEN_PARAMETERS
+                if isinstance(body.get(name), int)
+            ),
+            0,
+        )
+        prompt_tokens = sum(
+            estimate_tokens(_message_text(message)) for message in messages
+        )
         return RequestSnapshot(
             endpoint=self._endpoint_from(config_snapshot),
             headers=MappingProxyType(headers),
             body=encoded,
             timeout=self._timeout_from(config_snapshot),
             sensitive_values=sensitive_values,
+            stream=stream,
+            rate_limit=self._rate_limit_from(config_snapshot),
+            estimated_tokens=prompt_tokens + completion_tokens,
+            retry=self._retry_from(config_snapshot),
+            hedge=self._hedge_from(config_snapshot),
+            circuit=self._circuit_from(config_snapshot),
+            compress=compress,
         )
 
+    def circuit_states(self) -> list[tuple[str, float]]:
+        """Return the circuit state and seconds until the next probe per endpoint.
+
+        Only the endpoints in the current configuration are reported, in the
+        order they are configured, starting with the main one.
+        """
+
+        try:
+            snapshot = self._build_request_snapshot([])
+        except ValueError:
+            return []
+        if snapshot.circuit is None:
+            return []
+        return [
+            self.circuits.state(endpoint.endpoint) for endpoint in snapshot.endpoints
+        ]
+
     def validate_overrides(self, overrides: Mapping[str, Any]) -> None:
         """Validate settings using the same path as a real request, without IO."""
         self._build_request_snapshot([], overrides=overrides)
@@ -315,7 +1414,7 @@ class LLMClient:
 
     def _body(
         self,
-        messages: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
         overrides: Optional[Mapping[str, Any]] = None,
     ) -> Dict[str, Any]:
         return self._body_from(self._configuration_snapshot(overrides), messages)
@@ -350,7 +1449,10 @@ class LLMClient:
             {"role": "system", "content": "Reply with a single word: pong"},
             {"role": "user", "content": "ping"},
         ]
-        return self._build_request_snapshot(messages, overrides=overrides)
+        snapshot = self._build_request_snapshot(messages, overrides=overrides)
+        # A connection test should report the endpoint's state, not wait it out,
+        # and it is how a user checks an endpoint whose circuit is open.
+        return replace(snapshot, retry=None, hedge=None, probe=True, alternates=())
 
     def run_connectivity(self, snapshot: RequestSnapshot) -> Tuple[bool, str]:
         if not isinstance(snapshot, RequestSnapshot):
@@ -363,7 +1465,13 @@ class LLMClient:
         except Exception as error:
             return False, str(error)
 
-    def prepare_analysis(self, style_name: str, input_text: str) -> AnalysisRequest:
+    def prepare_analysis(
+        self,
+        style_name: str,
+        input_text: str,
+        *,
+        cancel_token: CancellationToken | None = None,
+    ) -> AnalysisRequest:
         """Validate and freeze one structured analysis before background IO."""
 
         if not isinstance(input_text, str) or not input_text.strip():
@@ -376,14 +1484,81 @@ class LLMClient:
             raise ValueError(
                 f"Input text exceeds the {MAX_ANALYSIS_BYTES}-byte analysis limit"
             )
+        config_snapshot = self._configuration_snapshot()
+        completion_tokens = self._completion_budget(
+            config_snapshot,
+            self._prompt_overhead(config_snapshot, style_name),
+            estimate_tokens(input_text),
+        )
+        snapshot = self._build_request_snapshot(
+            self._analysis_messages(config_snapshot, style_name, input_text),
+            completion_tokens=completion_tokens,
+            config_snapshot=config_snapshot,
+        )
+        cacheable = self.cfg.get_nested("cache", "enabled", default=True) is True
+        return AnalysisRequest(
+            style_name,
+            input_text,
+            snapshot,
+            cacheable,
+            cancel_token or CancellationToken(),
+            self._recovery_from(config_snapshot),
+        )
+
+    def _prompt_overhead(
+        self,
+        config_snapshot: Mapping[str, Any],
+        style_name: str,
+        *,
+        batch: bool = False,
+    ) -> int:
+        """Estimate the prompt tokens a request spends besides the checked text."""
+
+        if batch:
+            messages = self._batch_messages(config_snapshot, style_name, [])
+        else:
+            messages = self._analysis_messages(config_snapshot, style_name, "")
+        return sum(estimate_tokens(_message_text(message)) for message in messages)
+
+    def _completion_budget(
+        self,
+        config_snapshot: Mapping[str, Any],
+        overhead_tokens: int,
+        input_tokens: int,
+        documents: int = 1,
+    ) -> int | None:
+        """Predict the completion tokens a request needs; None without a budget.
+
+        A request that cannot fit the model's output limit or context window
+        raises ValueError here, before it is sent only to come back truncated.
+        """
+
+        budget = self._token_budget_from(config_snapshot)
+        if budget is None:
+            return None
+        completion = budget.completion_tokens(input_tokens, documents)
+        if not budget.fits(overhead_tokens + input_tokens, completion):
+            raise ValueError(
+                f"Input text would need about {overhead_tokens + input_tokens} "
+                f"prompt and {completion} completion tokens in one request, more "
+                "than the LLM token_budget allows"
+            )
+        return completion
+
+    def _guidance(self, style_name: str) -> str:
         guidance = self.styles.get(style_name)
         if not guidance:
             raise ValueError(f"No analysis profile named {style_name!r}")
-        guidance = render_guidance_template(
+        return render_guidance_template(
             guidance,
             input_text="[supplied separately]",
             style_name=style_name,
         )
+
+    def _analysis_messages(
+        self, config_snapshot: Mapping[str, Any], style_name: str, input_text: str
+    ) -> list[dict[str, Any]]:
+        guidance = self._guidance(style_name)
         system_prompt = (
             "Analyze natural-language text in whatever language it uses. Return ONLY "
             "one JSON object with keys 'language' and 'diagnostics'. 'language' is a "
@@ -395,27 +1570,790 @@ class LLMClient:
             "issue exists. Do not use markdown. Preserve the input language in messages "
             "and replacements."
         )
-        user_prompt = json.dumps(
-            {"review_guidance": guidance, "input_text": input_text},
-            ensure_ascii=False,
-            allow_nan=False,
+        return self._prompt_messages(
+            config_snapshot, system_prompt, guidance, {"input_text": input_text}
         )
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        snapshot = self._build_request_snapshot(messages)
-        return AnalysisRequest(style_name, input_text, snapshot)
 
-    def run_analysis(self, request: AnalysisRequest) -> CompileResult:
-        """Execute a previously frozen request and validate its source coordinates."""
+    def _batch_messages(
+        self,
+        config_snapshot: Mapping[str, Any],
+        style_name: str,
+        documents: list[dict[str, str]],
+    ) -> list[dict[str, Any]]:
+        """Ask for one result per ``{"id", "text"}`` document in one response."""
 
-        if not isinstance(request, AnalysisRequest):
-            raise TypeError("request must be an AnalysisRequest")
-        ok, text = self._send_snapshot(request.request_snapshot)
-        if not ok:
-            raise RuntimeError(text)
-        return parse_diagnostics(text, request.source_text)
+        guidance = self._guidance(style_name)
+        system_prompt = (
+            "Analyze several independent natural-language documents, each in "
+            "whatever language it uses. Return ONLY one JSON object with key "
+            "'documents', an array with one object per input document in input "
+            "order. Each object has the document's 'id' string copied exactly, "
+            "'language', and 'diagnostics'. 'language' is a BCP-47 language tag. "
+            "'diagnostics' is an array; each item has integer line, start_column, "
+            "end_column (1-based, end-exclusive, counted within that document's "
+            "own text), and string category, severity, message, original, "
+            "replacement, explanation. severity must be error, warning, info, or "
+            "hint. Every location must point inside its own document. Use an empty "
+            "diagnostics array for a document without a clear issue. Do not use "
+            "markdown. Preserve each document's language in messages and "
+            "replacements."
+        )
+        return self._prompt_messages(
+            config_snapshot, system_prompt, guidance, {"documents": documents}
+        )
+
+    def _prompt_messages(
+        self,
+        config_snapshot: Mapping[str, Any],
+        system_prompt: str,
+        guidance: str,
+        request: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Lay out the messages so that everything but ``request`` can be cached.
+
+        The ``prefix`` layout moves the guidance out of the user message into
+        its own message right after the system prompt, so that both stay
+        byte-identical across requests with the same profile. Cache hints mark
+        the end of that prefix with an Anthropic-style ``cache_control`` block.
+        """
+
+        layout, cache_control = self._prompt_cache_from(config_snapshot)
+        if layout == "prefix":
+            prefix = [
+                {"role": "system", "content": system_prompt},
+                {
+                    "role": "system",
+                    "content": json.dumps(
+                        {"review_guidance": guidance},
+                        ensure_ascii=False,
+                        allow_nan=False,
+                    ),
+                },
+            ]
+        else:
+            prefix = [{"role": "system", "content": system_prompt}]
+            request = {"review_guidance": guidance, **request}
+        if cache_control:
+            prefix[-1]["content"] = [
+                {
+                    "type": "text",
+                    "text": prefix[-1]["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        user_prompt = json.dumps(request, ensure_ascii=False, allow_nan=False)
+        return [*prefix, {"role": "user", "content": user_prompt}]
+
+    def prepare_document_analysis(
+        self,
+        style_name: str,
+        input_text: str,
+        *,
+        cancel_token: CancellationToken | None = None,
+    ) -> AnalysisRequest | ChunkedAnalysisRequest:
+        """Freeze an analysis, splitting text that exceeds one chunk budget.
+
+        Short text yields an ordinary :class:`AnalysisRequest`. Longer documents,
+        up to ``MAX_DOCUMENT_BYTES``, are cut at paragraph or sentence boundaries
+        so that each request stays within the configured token budget. With a
+        paragraph cache, only paragraphs without a cached result are sent.
+        """
+
+        if not isinstance(input_text, str) or not input_text.strip():
+            raise ValueError("Input text cannot be empty")
+        try:
+            input_bytes = len(input_text.encode("utf-8"))
+        except UnicodeEncodeError as error:
+            raise ValueError("Input text contains invalid Unicode") from error
+        if input_bytes > MAX_DOCUMENT_BYTES:
+            raise ValueError(
+                f"Input text exceeds the {MAX_DOCUMENT_BYTES}-byte document limit"
+            )
+        config_snapshot = self._configuration_snapshot()
+        max_chunk_tokens, max_workers = self._chunking_from(config_snapshot)
+        budget = self._token_budget_from(config_snapshot)
+        if budget is not None:
+            # Chunk up front whatever would not fit the model in one request.
+            fitting = budget.max_input_tokens(
+                self._prompt_overhead(config_snapshot, style_name)
+            )
+            if fitting <= 0:
+                raise ValueError("The LLM token_budget leaves no room for input text")
+            max_chunk_tokens = min(max_chunk_tokens, fitting)
+        # Every part shares one token, so cancelling the document aborts them all.
+        token = cancel_token or CancellationToken()
+        if self._paragraph_cache_enabled():
+            return self._prepare_incremental_analysis(
+                style_name, input_text, max_chunk_tokens, max_workers, token
+            )
+        chunks = plan_chunks(input_text, max_chunk_tokens)
+        if len(chunks) <= 1:
+            return self.prepare_analysis(style_name, input_text, cancel_token=token)
+        parts = tuple(
+            (chunk, self.prepare_analysis(style_name, chunk.text, cancel_token=token))
+            for chunk in chunks
+            if chunk.text.strip()
+        )
+        return ChunkedAnalysisRequest(
+            style_name, input_text, parts, max_workers, cancel_token=token
+        )
+
+    def prepare_batch_analysis(
+        self, style_name: str, documents: Mapping[str, str]
+    ) -> BatchAnalysisRequest:
+        """Freeze many documents, packing short ones into shared requests.
+
+        With batching enabled, documents within the batch token budget are
+        packed up to ``max_documents`` per request, so the system prompt and
+        guidance are sent once per batch rather than once per document.
+        Longer documents are prepared with :meth:`prepare_document_analysis`,
+        and documents with a cached result are not sent at all.
+        """
+
+        if not isinstance(documents, Mapping):
+            raise ValueError("Documents must map keys to text")
+        config_snapshot = self._configuration_snapshot()
+        enabled, max_batch_tokens, max_documents = self._batching_from(config_snapshot)
+        _max_chunk_tokens, max_workers = self._chunking_from(config_snapshot)
+        token = CancellationToken()
+        parts: list[BatchPart] = []
+        reused: list[tuple[str, CompileResult]] = []
+        packable: list[tuple[str, AnalysisRequest]] = []
+        for key, text in documents.items():
+            if not isinstance(key, str):
+                raise ValueError("Document keys must be strings")
+            try:
+                request = self.prepare_document_analysis(
+                    style_name, text, cancel_token=token
+                )
+            except ValueError as error:
+                raise ValueError(f"{key}: {error}") from error
+            cached = self.cached_result(request)
+            if cached is not None:
+                reused.append((key, cached))
+            elif (
+                enabled
+                and isinstance(request, AnalysisRequest)
+                and estimate_tokens(text) <= max_batch_tokens
+            ):
+                packable.append((key, request))
+            else:
+                parts.append(BatchPart(((key, request),)))
+        sizes = [estimate_tokens(request.source_text) for _key, request in packable]
+        overhead = (
+            self._prompt_overhead(config_snapshot, style_name, batch=True)
+            if packable
+            else 0
+        )
+        for group in plan_batches(sizes, max_batch_tokens, max_documents):
+            members = tuple(packable[index] for index in group)
+            if len(members) == 1:
+                parts.append(BatchPart(members))
+                continue
+            try:
+                completion_tokens = self._completion_budget(
+                    config_snapshot,
+                    overhead,
+                    sum(sizes[index] for index in group),
+                    len(members),
+                )
+            except ValueError:
+                # Too much for one response; each document alone was checked.
+                parts.extend(BatchPart((member,)) for member in members)
+                continue
+            messages = self._batch_messages(
+                config_snapshot,
+                style_name,
+                [
+                    {"id": str(number), "text": request.source_text}
+                    for number, (_key, request) in enumerate(members, start=1)
+                ],
+            )
+            parts.append(
+                BatchPart(
+                    members,
+                    self._build_request_snapshot(
+                        messages,
+                        completion_tokens=completion_tokens,
+                        config_snapshot=config_snapshot,
+                    ),
+                )
+            )
+        return BatchAnalysisRequest(
+            style_name, tuple(parts), max_workers, tuple(reused), token
+        )
+
+    def _paragraph_cache_enabled(self) -> bool:
+        return (
+            self.paragraph_cache is not None
+            and self.cfg.get_nested("cache", "paragraphs", default=True) is True
+        )
+
+    def _paragraph_context(self, style_name: str) -> str:
+        """Fingerprint everything but the input text: endpoint, model, guidance."""
+
+        config_snapshot = self._configuration_snapshot()
+        snapshot = self._build_request_snapshot(
+            self._analysis_messages(config_snapshot, style_name, ""),
+            config_snapshot=config_snapshot,
+        )
+        return request_key(snapshot.endpoint, snapshot.body)
+
+    def _prepare_incremental_analysis(
+        self,
+        style_name: str,
+        input_text: str,
+        max_chunk_tokens: int,
+        max_workers: int,
+        cancel_token: CancellationToken,
+    ) -> ChunkedAnalysisRequest:
+        """Reuse cached paragraphs and send runs of changed ones as chunks."""
+
+        context = self._paragraph_context(style_name)
+        reused: list[tuple[Chunk, CompileResult]] = []
+        pending: list[tuple[Chunk, str]] = []
+        runs: list[list[Chunk]] = []
+        extend_run = False
+        for paragraph in split_paragraphs(input_text):
+            if not paragraph.text.strip():
+                extend_run = False
+                continue
+            key = paragraph_key(context, paragraph.text)
+            cached = self.paragraph_cache.get(key)
+            if cached is not None:
+                reused.append((paragraph, cached))
+                extend_run = False
+                continue
+            pending.append((paragraph, key))
+            if extend_run:
+                runs[-1].append(paragraph)
+            else:
+                runs.append([paragraph])
+            extend_run = True
+        parts = []
+        for run in runs:
+            # Adjacent changed paragraphs are contiguous, so they can share chunks.
+            outer = Chunk("".join(item.text for item in run), run[0].line_offset, 0)
+            for inner in plan_chunks(outer.text, max_chunk_tokens):
+                if inner.text.strip():
+                    chunk = offset_chunk(inner, outer)
+                    part = self.prepare_analysis(
+                        style_name, chunk.text, cancel_token=cancel_token
+                    )
+                    parts.append((chunk, part))
+        return ChunkedAnalysisRequest(
+            style_name,
+            input_text,
+            tuple(parts),
+            max_workers,
+            tuple(reused),
+            tuple(pending),
+            cancel_token,
+        )
+
+    def _store_paragraphs(
+        self, pending: tuple[tuple[Chunk, str], ...], fresh: CompileResult
+    ) -> None:
+        """Split a validated document-coordinate result back into paragraphs."""
+
+        if self.paragraph_cache is None:
+            return
+        diagnostics = fresh.diagnostics
+        for paragraph, key in pending:
+            first, last = chunk_line_range(paragraph)
+            start = bisect.bisect_left(diagnostics, first, key=lambda item: item.line)
+            stop = bisect.bisect_right(diagnostics, last, key=lambda item: item.line)
+            local = tuple(
+                replace(item, line=item.line - paragraph.line_offset)
+                for item in diagnostics[start:stop]
+            )
+            self.paragraph_cache.put(key, CompileResult(fresh.language, local))
+
+    def run_analysis(
+        self,
+        request: AnalysisRequest | ChunkedAnalysisRequest,
+        *,
+        on_diagnostic: Callable[[Diagnostic], None] | None = None,
+    ) -> CompileResult:
+        """Execute a previously frozen request and validate its source coordinates.
+
+        For streaming requests, ``on_diagnostic`` receives each diagnostic as soon
+        as its JSON object is complete. The returned result is still validated as
+        a whole and is the authoritative outcome. Cancelling the request's
+        ``cancel_token`` aborts its connection and raises
+        :class:`AnalysisCancelled`.
+
+        Under a recovery policy, invalid diagnostics are left out and listed
+        in ``CompileResult.rejected``. If the policy asks for a repair, they
+        are sent back once to be corrected; a repair that fails leaves the
+        result as it was.
+        """
+
+        if isinstance(request, ChunkedAnalysisRequest):
+            request.cancel_token.raise_if_cancelled()
+            return self._run_chunked_analysis(request, on_diagnostic=on_diagnostic)
+        if not isinstance(request, AnalysisRequest):
+            raise TypeError("request must be an AnalysisRequest")
+        request.cancel_token.raise_if_cancelled()
+        key = self._cache_key(request)
+        if key is not None:
+            cached = self.cache.get(key, request.source_text)
+            if cached is not None:
+                return cached
+        parser = self._stream_parser(request, on_diagnostic)
+        ok, text = self._send_snapshot(
+            request.request_snapshot,
+            on_content=self._diagnostic_feed(parser, on_diagnostic),
+            cancel_token=request.cancel_token,
+        )
+        if not ok:
+            raise RuntimeError(text)
+        result = self._parsed_result(parser, text, request)
+        repair = self._repair_request(request, result)
+        if repair is not None:
+            snapshot, unsent = repair
+            ok, text = self._send_snapshot(snapshot, cancel_token=request.cancel_token)
+            result = self._repaired_result(
+                request, result, unsent, text if ok else None
+            )
+        # A partial result is not kept, so the next run may get a complete one.
+        if key is not None and not result.rejected:
+            self.cache.put(key, result)
+        return result
+
+    @staticmethod
+    def _stream_parser(
+        request: AnalysisRequest,
+        on_diagnostic: Callable[[Diagnostic], None] | None,
+    ) -> DiagnosticParser | None:
+        """Return a parser for streamed content when someone awaits diagnostics.
+
+        Without a callback the content is parsed once it is complete, which
+        keeps a stream that broke off eligible for a replay.
+        """
+
+        if on_diagnostic is None or not request.request_snapshot.stream:
+            return None
+        return DiagnosticParser(
+            request.source_text, lenient=request.recovery is not None
+        )
+
+    @staticmethod
+    def _diagnostic_feed(
+        parser: DiagnosticParser | None,
+        on_diagnostic: Callable[[Diagnostic], None] | None,
+    ) -> Callable[[str], None] | None:
+        """Parse streamed content as it arrives and report each diagnostic."""
+
+        if parser is None or on_diagnostic is None:
+            return None
+
+        def on_content(text: str) -> None:
+            try:
+                diagnostics = parser.feed(text)
+            except ValueError:
+                # The parser raises it again from finish() once the stream ends.
+                return
+            for diagnostic in diagnostics:
+                on_diagnostic(diagnostic)
+
+        return on_content
+
+    @staticmethod
+    def _parsed_result(
+        parser: DiagnosticParser | None, text: str, request: AnalysisRequest
+    ) -> CompileResult:
+        """Finish ``parser`` if it saw all of ``text``, or else parse ``text``.
+
+        The parser misses content that was withheld from callbacks, and a
+        streaming request may still be answered with ordinary JSON.
+        """
+
+        if parser is not None and parser.consumed == len(text):
+            return parser.finish(text)
+        return parse_diagnostics(
+            text, request.source_text, lenient=request.recovery is not None
+        )
+
+    @staticmethod
+    def _repair_request(
+        request: AnalysisRequest, result: CompileResult
+    ) -> tuple[RequestSnapshot, tuple[Rejection, ...]] | None:
+        """Return the follow-up request that repairs ``result.rejected``.
+
+        Only diagnostics that can be placed on a source line are sent: by
+        their own line number, or else by where their ``original`` text
+        occurs. The rest, and those over the policy's limit, are returned as
+        unsent. None means there is nothing to repair.
+        """
+
+        recovery = request.recovery
+        if recovery is None or not recovery.repair or not result.rejected:
+            return None
+        source = SourceIndex.of(request.source_text)
+        lines: set[int] = set()
+        sent: list[dict[str, str]] = []
+        unsent: list[Rejection] = []
+        for rejection in result.rejected:
+            line = None
+            # Diagnostics over the response limit would be rejected again.
+            if (
+                rejection.index < MAX_DIAGNOSTICS
+                and len(sent) < recovery.max_repair_items
+            ):
+                line = rejection_line(rejection, source)
+            if line is None:
+                unsent.append(rejection)
+                continue
+            lines.update(
+                number
+                for number in (line - 1, line, line + 1)
+                if 1 <= number <= source.line_count
+            )
+            sent.append({"diagnostic": rejection.text, "reason": rejection.reason})
+        if not sent:
+            return None
+        system_prompt = (
+            "Correct diagnostics that failed validation against the text they "
+            "describe. Each input item holds a diagnostic's JSON text and the "
+            "reason it was rejected. Return ONLY one JSON object with key "
+            "'diagnostics', an array with one corrected diagnostic per item that "
+            "can be fixed. Each has integer line, start_column, end_column "
+            "(1-based, end-exclusive, within the numbered line), and string "
+            "category, severity, message, original, replacement, explanation. "
+            "severity must be error, warning, info, or hint. Locate each issue in "
+            "the supplied source lines and leave out an item that does not match "
+            "them. Do not use markdown. Keep the language of messages and "
+            "replacements."
+        )
+        prompt = {
+            "source_lines": [
+                {"line": number, "text": source.line(number)}
+                for number in sorted(lines)
+            ],
+            "rejected": sent,
+        }
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user",
+                "content": json.dumps(prompt, ensure_ascii=False, allow_nan=False),
+            },
+        ]
+        return LLMClient._rebodied(request.request_snapshot, messages), tuple(unsent)
+
+    @staticmethod
+    def _rebodied(
+        snapshot: RequestSnapshot, messages: list[dict[str, Any]]
+    ) -> RequestSnapshot:
+        """Return ``snapshot`` with its messages replaced by ``messages``.
+
+        Model, sampling, and completion settings stay as they were frozen.
+        """
+
+        prompt_tokens = sum(estimate_tokens(_message_text(item)) for item in messages)
+
+        def rebodied(endpoint: RequestSnapshot) -> RequestSnapshot:
+            body = json.loads(endpoint.body)
+            previous = sum(
+                estimate_tokens(_message_text(item)) for item in body["messages"]
+            )
+            body["messages"] = messages
+            encoded = json.dumps(
+                body, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
+            return replace(
+                endpoint,
+                body=encoded,
+                estimated_tokens=max(
+                    0, endpoint.estimated_tokens - previous + prompt_tokens
+                ),
+            )
+
+        return replace(
+            rebodied(snapshot),
+            alternates=tuple(rebodied(item) for item in snapshot.alternates),
+        )
+
+    @staticmethod
+    def _repaired_result(
+        request: AnalysisRequest,
+        result: CompileResult,
+        unsent: tuple[Rejection, ...],
+        text: str | None,
+    ) -> CompileResult:
+        """Merge the diagnostics a repair response fixed into ``result``.
+
+        What the repair response rejects in turn stays rejected, next to the
+        diagnostics that were never sent. ``text`` is None when the repair
+        request failed.
+        """
+
+        if text is None:
+            return result
+        try:
+            repaired = parse_diagnostics(text, request.source_text, lenient=True)
+        except ValueError:
+            return result
+        return CompileResult(
+            result.language,
+            canonical_diagnostics((*result.diagnostics, *repaired.diagnostics)),
+            f"{result.raw_response}\n{text}",
+            (*unsent, *repaired.rejected),
+        )
+
+    @staticmethod
+    def _chunk_callback(
+        chunk: Chunk, on_diagnostic: Callable[[Diagnostic], None] | None
+    ) -> Callable[[Diagnostic], None] | None:
+        if on_diagnostic is None:
+            return None
+
+        def callback(diagnostic: Diagnostic) -> None:
+            on_diagnostic(remap_diagnostic(diagnostic, chunk))
+
+        return callback
+
+    @staticmethod
+    def _chunk_failure(chunk: Chunk, error: Exception) -> RuntimeError:
+        first, last = chunk_line_range(chunk)
+        return RuntimeError(f"Lines {first}-{last}: {error}")
+
+    def _finish_chunked_analysis(
+        self,
+        request: ChunkedAnalysisRequest,
+        results: list[CompileResult | None],
+    ) -> CompileResult:
+        """Store fresh paragraphs and merge every part in document order."""
+
+        fresh = [
+            (chunk, result)
+            for (chunk, _part), result in zip(request.parts, results)
+            if result is not None
+        ]
+        # Paragraphs are not cached from results that left diagnostics out.
+        if request.pending and not any(result.rejected for _chunk, result in fresh):
+            self._store_paragraphs(request.pending, merge_chunk_results(fresh))
+        return merge_chunk_results([*request.reused, *fresh])
+
+    def _cache_key(self, request: AnalysisRequest) -> str | None:
+        if self.cache is None or not request.cacheable:
+            return None
+        snapshot = request.request_snapshot
+        return request_key(snapshot.endpoint, snapshot.body)
+
+    def cached_result(
+        self, request: AnalysisRequest | ChunkedAnalysisRequest
+    ) -> CompileResult | None:
+        """Return a complete result from the cache without any network IO."""
+
+        if isinstance(request, ChunkedAnalysisRequest):
+            results = []
+            for chunk, part in request.parts:
+                result = self.cached_result(part)
+                if result is None:
+                    return None
+                results.append((chunk, result))
+            if not results and not request.reused:
+                return None
+            if request.pending:
+                self._store_paragraphs(request.pending, merge_chunk_results(results))
+            return merge_chunk_results([*request.reused, *results])
+        key = self._cache_key(request)
+        if key is None:
+            return None
+        return self.cache.get(key, request.source_text)
+
+    def _run_chunked_analysis(
+        self,
+        request: ChunkedAnalysisRequest,
+        *,
+        on_diagnostic: Callable[[Diagnostic], None] | None = None,
+    ) -> CompileResult:
+        """Run chunk requests on a bounded pool and merge them in document order."""
+
+        results: list[CompileResult | None] = [None] * len(request.parts)
+        workers = max(1, min(request.max_workers, len(request.parts)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="typocompiler-chunk"
+        ) as executor:
+            futures = {}
+            for index, (chunk, part) in enumerate(request.parts):
+                future = executor.submit(
+                    self.run_analysis,
+                    part,
+                    on_diagnostic=self._chunk_callback(chunk, on_diagnostic),
+                )
+                futures[future] = index
+            try:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except AnalysisCancelled:
+                        raise
+                    except Exception as error:
+                        chunk = request.parts[index][0]
+                        raise self._chunk_failure(chunk, error) from error
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return self._finish_chunked_analysis(request, results)
+
+    def run_batch_analysis(
+        self, request: BatchAnalysisRequest
+    ) -> dict[str, CompileResult | Exception]:
+        """Run every part of a batch; map each key to its result or its error.
+
+        A packed response is validated per document, and each valid result is
+        cached as if its document had been sent alone. Documents that the
+        response left out or got wrong are sent again in two halves, down to
+        single requests, so one bad document cannot fail the others.
+        """
+
+        if not isinstance(request, BatchAnalysisRequest):
+            raise TypeError("request must be a BatchAnalysisRequest")
+        request.cancel_token.raise_if_cancelled()
+        outcomes: dict[str, CompileResult | Exception] = dict(request.reused)
+        if not request.parts:
+            return outcomes
+        workers = max(1, min(request.max_workers, len(request.parts)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="typocompiler-batch"
+        ) as executor:
+            futures = [
+                executor.submit(self._run_batch_part, part, request.cancel_token)
+                for part in request.parts
+            ]
+            try:
+                for future in as_completed(futures):
+                    outcomes.update(future.result())
+            except BaseException:
+                request.cancel_token.cancel()
+                for future in futures:
+                    future.cancel()
+                raise
+        return outcomes
+
+    def _run_batch_part(
+        self, part: BatchPart, cancel_token: CancellationToken
+    ) -> dict[str, CompileResult | Exception]:
+        if part.request_snapshot is None:
+            return self._run_single_document(*part.documents[0])
+        members = [
+            (str(number), key, document)
+            for number, (key, document) in enumerate(part.documents, start=1)
+        ]
+        return self._run_packed(part.request_snapshot, members, cancel_token)
+
+    def _run_single_document(
+        self, key: str, request: AnalysisRequest | ChunkedAnalysisRequest
+    ) -> dict[str, CompileResult | Exception]:
+        try:
+            return {key: self.run_analysis(request)}
+        except AnalysisCancelled:
+            raise
+        except Exception as error:
+            return {key: error}
+
+    def _run_packed(
+        self,
+        snapshot: RequestSnapshot,
+        members: list[tuple[str, str, AnalysisRequest]],
+        cancel_token: CancellationToken,
+    ) -> dict[str, CompileResult | Exception]:
+        """Send one packed request; retry what it missed in smaller batches."""
+
+        ok, text = self._send_snapshot(snapshot, cancel_token=cancel_token)
+        if not ok and not text.startswith(LENGTH_TRUNCATED_MESSAGE):
+            error = RuntimeError(text)
+            return {key: error for _number, key, _document in members}
+        found, missing = self._packed_results(members, text if ok else None)
+        outcomes: dict[str, CompileResult | Exception] = {}
+        for key, document, result in found:
+            outcomes[key] = result
+            cache_key = self._cache_key(document)
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+        for half in self._halves(missing):
+            if len(half) == 1:
+                _number, key, document = half[0]
+                outcomes.update(self._run_single_document(key, document))
+            else:
+                repacked = self._repacked(snapshot, {number for number, *_ in half})
+                outcomes.update(self._run_packed(repacked, half, cancel_token))
+        return outcomes
+
+    @staticmethod
+    def _packed_results(
+        members: list[tuple[str, str, AnalysisRequest]], text: str | None
+    ) -> tuple[
+        list[tuple[str, AnalysisRequest, CompileResult]],
+        list[tuple[str, str, AnalysisRequest]],
+    ]:
+        """Split a packed response into validated results and missing members."""
+
+        parsed: dict[str, CompileResult] = {}
+        if text is not None:
+            sources = {
+                number: document.source_text for number, _key, document in members
+            }
+            try:
+                parsed = parse_batch_diagnostics(text, sources)
+            except ValueError:
+                parsed = {}
+        found = []
+        missing = []
+        for number, key, document in members:
+            result = parsed.get(number)
+            if result is None:
+                missing.append((number, key, document))
+            else:
+                found.append((key, document, result))
+        return found, missing
+
+    @staticmethod
+    def _halves(members: list) -> list[list]:
+        middle = (len(members) + 1) // 2
+        return [half for half in (members[:middle], members[middle:]) if half]
+
+    @staticmethod
+    def _repacked(
+        snapshot: RequestSnapshot, numbers: Collection[str]
+    ) -> RequestSnapshot:
+        """Return the packed request narrowed to the documents in ``numbers``.
+
+        The frozen bodies are edited rather than rebuilt, so the retry uses the
+        same settings and guidance as the original batch.
+        """
+
+        def narrowed(endpoint: RequestSnapshot) -> RequestSnapshot:
+            body = json.loads(endpoint.body)
+            prompt = json.loads(body["messages"][-1]["content"])
+            texts = [item for item in prompt["documents"] if item["id"] in numbers]
+            removed = sum(
+                estimate_tokens(item["text"])
+                for item in prompt["documents"]
+                if item["id"] not in numbers
+            )
+            prompt["documents"] = texts
+            body["messages"][-1]["content"] = json.dumps(
+                prompt, ensure_ascii=False, allow_nan=False
+            )
+            encoded = json.dumps(
+                body, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
+            return replace(
+                endpoint,
+                body=encoded,
+                estimated_tokens=max(0, endpoint.estimated_tokens - removed),
+            )
+
+        return replace(
+            narrowed(snapshot),
+            alternates=tuple(narrowed(item) for item in snapshot.alternates),
+        )
 
     def analyze(self, style_name: str, input_text: str) -> CompileResult:
         return self.run_analysis(self.prepare_analysis(style_name, input_text))
@@ -427,17 +2365,57 @@ class LLMClient:
         return render_diagnostics(style_name, result, input_text)
 
     @staticmethod
-    def _set_response_timeout(response, timeout: float) -> None:
-        """Best-effort update of urllib's underlying socket timeout."""
+    def _response_socket(response) -> socket.socket | None:
+        """Best-effort lookup of the socket under a urllib or http.client response."""
 
         file_pointer = getattr(response, "fp", None)
         raw = getattr(file_pointer, "raw", None)
         sock = getattr(raw, "_sock", None) or getattr(file_pointer, "_sock", None)
-        if sock is not None and hasattr(sock, "settimeout"):
+        return sock if isinstance(sock, socket.socket) else None
+
+    @staticmethod
+    def _set_response_timeout(response, timeout: float) -> None:
+        """Best-effort update of urllib's underlying socket timeout."""
+
+        sock = LLMClient._response_socket(response)
+        if sock is not None:
             sock.settimeout(max(0.001, timeout))
 
     @staticmethod
-    def _read_limited(response, limit: int, *, deadline: float | None = None) -> bytes:
+    def _read_limited(
+        response,
+        limit: int,
+        *,
+        deadline: float | None = None,
+        cancel_token: CancellationToken | None = None,
+        trace: RequestTrace | None = None,
+    ) -> bytes:
+        return b"".join(
+            LLMClient._iter_limited(
+                response,
+                limit,
+                deadline=deadline,
+                cancel_token=cancel_token,
+                trace=trace,
+            )
+        )
+
+    @staticmethod
+    def _iter_limited(
+        response,
+        limit: int,
+        *,
+        deadline: float | None = None,
+        cancel_token: CancellationToken | None = None,
+        trace: RequestTrace | None = None,
+    ) -> Iterator[bytes]:
+        """Yield response chunks as they arrive, bounded in size, time, and cancel.
+
+        A gzip or deflate body is decoded on the fly; ``limit`` then bounds
+        both the bytes received and the bytes it inflates to.
+        """
+
+        decoder = _ContentDecoder.for_headers(response.headers, limit)
         content_length = response.headers.get("Content-Length")
         if content_length:
             try:
@@ -447,9 +2425,10 @@ class LLMClient:
                 if "exceeds" in str(error):
                     raise
                 # A malformed Content-Length cannot bypass the actual bounded read.
-        chunks: list[bytes] = []
         total = 0
         while total <= limit:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
             if deadline is not None:
                 remaining = deadline - time.monotonic()
                 if remaining <= 0:
@@ -464,11 +2443,20 @@ class LLMClient:
             )
             if not chunk:
                 break
-            chunks.append(chunk)
             total += len(chunk)
+            if trace is not None:
+                trace.bytes_received += len(chunk)
+            if total > limit:
+                break
+            if decoder is not None:
+                chunk = decoder.feed(chunk)
+                if not chunk:
+                    continue
+            yield chunk
         if total > limit:
             raise ValueError(f"LLM response exceeds the {limit}-byte limit")
-        return b"".join(chunks)
+        if decoder is not None:
+            decoder.finish()
 
     @staticmethod
     def _safe_error_detail(detail: str, snapshot: RequestSnapshot | None = None) -> str:
@@ -491,7 +2479,9 @@ class LLMClient:
 
     @staticmethod
     def _parse_response(
-        raw: bytes, snapshot: RequestSnapshot | None = None
+        raw: bytes,
+        snapshot: RequestSnapshot | None = None,
+        trace: RequestTrace | None = None,
     ) -> Tuple[bool, str]:
         if not raw or not raw.strip():
             return False, "Empty response body from LLM endpoint"
@@ -506,9 +2496,20 @@ class LLMClient:
                 detail = error.msg
             else:
                 detail = str(error)
-            return False, f"Invalid or truncated JSON response: {detail}"
+            return False, f"{TRUNCATED_JSON_MESSAGE}: {detail}"
+        return LLMClient._parse_payload(payload, snapshot, trace)
+
+    @staticmethod
+    def _parse_payload(
+        payload: Any,
+        snapshot: RequestSnapshot | None = None,
+        trace: RequestTrace | None = None,
+    ) -> Tuple[bool, str]:
         if not isinstance(payload, dict):
             return False, "LLM response must be a JSON object"
+        if trace is not None:
+            # Tokens are billed even when the response itself is unusable.
+            trace.usage = usage_from(payload)
         if "error" in payload:
             detail = LLMClient._safe_error_detail(str(payload["error"]), snapshot)
             return False, f"LLM error: {detail}"
@@ -524,7 +2525,7 @@ class LLMClient:
         if finish_reason is None:
             return False, "LLM response is missing a completion finish reason"
         if finish_reason != "stop":
-            return False, f"LLM response was truncated (finish_reason={finish_reason})"
+            return False, f"{LENGTH_TRUNCATED_MESSAGE} (finish_reason={finish_reason})"
         message = choice.get("message")
         if not isinstance(message, dict):
             return False, "LLM response choice is missing a message"
@@ -546,7 +2547,7 @@ class LLMClient:
 
     def _request(
         self,
-        messages: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
         overrides: Optional[Mapping[str, Any]] = None,
     ) -> Tuple[bool, str]:
         try:
@@ -555,45 +2556,614 @@ class LLMClient:
             return False, str(error)
         return self._send_snapshot(snapshot)
 
-    def _send_snapshot(self, snapshot: RequestSnapshot) -> Tuple[bool, str]:
-        """Send an immutable request with redirect, size, and total-time bounds."""
+    @staticmethod
+    def _uses_proxy(endpoint: str) -> bool:
+        parts = urllib.parse.urlsplit(endpoint)
+        proxies = urllib.request.getproxies()
+        if parts.scheme.lower() not in proxies:
+            return False
+        return not urllib.request.proxy_bypass(parts.hostname or "")
 
-        deadline = time.monotonic() + snapshot.timeout
-        try:
-            request = urllib.request.Request(
+    @contextmanager
+    def _open_response(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_socket: Callable[[socket.socket], None] | None = None,
+        trace: RequestTrace | None = None,
+    ) -> Iterator:
+        """Yield the endpoint response for any status without following redirects."""
+
+        if not self._uses_proxy(snapshot.endpoint):
+            with self._pool.request(
+                "POST",
                 snapshot.endpoint,
-                data=snapshot.body,
-                headers=dict(snapshot.headers),
-                method="POST",
-            )
-            opener = urllib.request.build_opener(_NoRedirectHandler())
-            with opener.open(request, timeout=snapshot.timeout) as response:
-                raw = self._read_limited(
-                    response, MAX_RESPONSE_BYTES, deadline=deadline
-                )
-            return self._parse_response(raw, snapshot)
+                body=snapshot.wire_body,
+                headers=snapshot.headers,
+                deadline=deadline,
+                on_socket=on_socket,
+                trace=trace,
+            ) as response:
+                yield response
+            return
+        # Proxied endpoints keep urllib's proxy handling and one connection each.
+        request = urllib.request.Request(
+            snapshot.endpoint,
+            data=snapshot.wire_body,
+            headers=dict(snapshot.headers),
+            method="POST",
+        )
+        opener = urllib.request.build_opener(_NoRedirectHandler())
+        sent = time.monotonic()
+        try:
+            response = opener.open(request, timeout=snapshot.timeout)
         except urllib.error.HTTPError as error:
-            if error.code in _REDIRECT_CODES:
-                return (
-                    False,
-                    f"HTTP {error.code}: redirects are disabled for LLM requests",
-                )
+            response = error
+        if trace is not None:
+            # Through a proxy, connecting is part of the wait for the head.
+            trace.ttfb = time.monotonic() - sent
+            trace.bytes_sent = len(snapshot.wire_body)
+        with response:
+            # urllib connects internally; the socket is only reachable from here.
+            sock = self._response_socket(response)
+            if on_socket is not None and sock is not None:
+                on_socket(sock)
+            yield response
+
+    def _read_event_stream(
+        self,
+        response,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        cancel_token: CancellationToken | None = None,
+        trace: RequestTrace | None = None,
+    ) -> Tuple[bool, str]:
+        """Consume a server-sent event stream under the normal response bounds."""
+
+        reader = _EventStreamReader(snapshot, on_content, trace)
+        try:
+            # Keep reading after [DONE] so a keep-alive connection can be reused.
+            for chunk in self._iter_limited(
+                response,
+                MAX_RESPONSE_BYTES,
+                deadline=deadline,
+                cancel_token=cancel_token,
+                trace=trace,
+            ):
+                reader.feed(chunk)
+        except UnicodeDecodeError as error:
+            return False, f"LLM response is not valid UTF-8: {error}"
+        return reader.finish()
+
+    @staticmethod
+    def _http_error(
+        status: int, raw_error: bytes | None, reason: str, snapshot: RequestSnapshot
+    ) -> Tuple[bool, str]:
+        """Describe a redirect or non-2xx status with a bounded, redacted detail."""
+
+        if status in _REDIRECT_CODES:
+            return False, f"HTTP {status}: redirects are disabled for LLM requests"
+        if raw_error is not None:
+            detail = LLMClient._safe_error_detail(
+                raw_error.decode("utf-8", errors="replace"), snapshot
+            )
+        else:
+            detail = LLMClient._safe_error_detail(reason or str(status), snapshot)
+        suffix = f": {detail}" if detail else ""
+        return False, f"HTTP {status}{suffix}"
+
+    def _send_snapshot(
+        self,
+        snapshot: RequestSnapshot,
+        *,
+        on_content: Callable[[str], None] | None = None,
+        cancel_token: CancellationToken | None = None,
+    ) -> Tuple[bool, str]:
+        """Send an immutable request with redirect, size, and total-time bounds.
+
+        ``on_content`` receives message text incrementally when the endpoint
+        answers a streaming request with ``text/event-stream``. Cancelling
+        ``cancel_token`` shuts the socket down and raises
+        :class:`AnalysisCancelled` instead of returning an outcome. Requests
+        wait for the endpoint's rate limiter before any IO starts.
+
+        Transient failures are replayed from the same snapshot as its retry
+        policy allows. Every attempt and backoff shares ``snapshot.timeout``,
+        and a stream that already delivered content is never replayed. With
+        alternate endpoints, each attempt goes where the load balancer
+        routes it, and a failed attempt first fails over to an endpoint this
+        request has not tried yet, without backoff. Endpoints whose circuit
+        is open are skipped, and when none is left the request fails at once.
+        """
+
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        deadline = time.monotonic() + snapshot.timeout
+        delivered = False
+
+        def forward(text: str) -> None:
+            nonlocal delivered
+            delivered = True
+            on_content(text)
+
+        retried: Counter[str] = Counter()
+        tried: set[int] = set()
+        delay = 0.0
+        number = 0
+        while True:
+            index = self._admit_endpoint(snapshot, tried)
+            if index is None:
+                self._finish_request(number, False)
+                return False, self._circuit_open_message(snapshot)
+            number += 1
+            tried.add(index)
+            target = snapshot.endpoints[index]
+            limiter = self._limiter_for(target)
             try:
-                raw_error = self._read_limited(
-                    error, MAX_ERROR_BYTES, deadline=deadline
+                started = self._acquire_rate_limit(limiter, target, cancel_token)
+            except AnalysisCancelled:
+                self._record_circuit(target, 0.0, None)
+                raise
+            attempt = _Attempt(False, "Request was not sent")
+            try:
+                if snapshot.hedge is not None and on_content is None:
+                    attempt = self._hedged_exchange(
+                        snapshot, index, deadline, cancel_token
+                    )
+                else:
+                    attempt = self._watched_exchange(
+                        target,
+                        deadline,
+                        forward if on_content is not None else None,
+                        cancel_token,
+                    )
+            finally:
+                if limiter is not None:
+                    limiter.release(
+                        started, status=attempt.status, headers=attempt.headers
+                    )
+            failover = self._should_fail_over(
+                snapshot, attempt, tried, deadline, delivered
+            )
+            retry_delay = (
+                0.0
+                if failover
+                else self._retry_delay(
+                    snapshot, attempt, retried, delay, deadline, delivered
                 )
-                detail = self._safe_error_detail(
-                    raw_error.decode("utf-8", errors="replace"),
-                    snapshot,
+            )
+            self.retry_stats.record(
+                AttemptRecord(
+                    number,
+                    attempt.status,
+                    attempt.failure,
+                    time.monotonic() - started,
+                    retry_delay,
+                    target.endpoint,
                 )
-            except Exception:
-                detail = self._safe_error_detail(
-                    str(error.reason or error),
-                    snapshot,
+            )
+            if retry_delay is None:
+                self._finish_request(number, attempt.ok)
+                return attempt.ok, attempt.text
+            if failover:
+                continue
+            retried[attempt.failure] += 1
+            delay = retry_delay
+            if cancel_token is None:
+                time.sleep(delay)
+            elif cancel_token.wait(delay):
+                raise AnalysisCancelled("Analysis was cancelled")
+
+    def _finish_request(self, attempts: int, ok: bool) -> None:
+        self.retry_stats.finish(attempts, ok)
+        self.metrics.observe_request(attempts, ok)
+
+    @staticmethod
+    def _acquire_rate_limit(
+        limiter: RateLimiter | None,
+        snapshot: RequestSnapshot,
+        cancel_token: CancellationToken | None,
+    ) -> float:
+        """Wait for a rate-limit permit; return when the attempt started."""
+
+        if limiter is None:
+            return time.monotonic()
+
+        def cancelled() -> bool:
+            return cancel_token is not None and cancel_token.cancelled
+
+        try:
+            return limiter.acquire(snapshot.estimated_tokens, cancelled=cancelled)
+        except InterruptedError:
+            raise AnalysisCancelled("Analysis was cancelled") from None
+
+    def _choose_endpoint(
+        self, snapshot: RequestSnapshot, exclude: Collection[int]
+    ) -> int:
+        endpoints = snapshot.endpoints
+        if len(endpoints) == 1:
+            return 0
+        return self.balancer.choose(
+            [endpoint.endpoint for endpoint in endpoints],
+            [endpoint.weight for endpoint in endpoints],
+            snapshot.balancing,
+            exclude,
+        )
+
+    def _admit_endpoint(
+        self, snapshot: RequestSnapshot, tried: Collection[int]
+    ) -> int | None:
+        """Choose an endpoint whose circuit admits a request, or None if none does.
+
+        Untried endpoints are preferred; once every endpoint was tried, any of
+        them may serve a retry.
+        """
+
+        endpoints = snapshot.endpoints
+        rejected: set[int] = set()
+        while len(rejected) < len(endpoints):
+            exclude = rejected | set(tried)
+            if len(exclude) >= len(endpoints):
+                exclude = rejected
+            index = self._choose_endpoint(snapshot, exclude)
+            target = endpoints[index]
+            if (
+                target.circuit is None
+                or snapshot.probe
+                or self.circuits.allow(target.endpoint)
+            ):
+                return index
+            rejected.add(index)
+        return None
+
+    def _record_circuit(
+        self, snapshot: RequestSnapshot, elapsed: float, healthy: bool | None
+    ) -> None:
+        if snapshot.circuit is not None:
+            self.circuits.record(
+                snapshot.endpoint, snapshot.circuit, elapsed, healthy=healthy
+            )
+
+    def _circuit_open_message(self, snapshot: RequestSnapshot) -> str:
+        wait = min(
+            self.circuits.state(endpoint.endpoint)[1] for endpoint in snapshot.endpoints
+        )
+        if wait > 0:
+            return (
+                "LLM endpoint is failing; requests are paused for "
+                f"{math.ceil(wait)} s before it is tried again"
+            )
+        return "LLM endpoint is failing; a trial request is checking whether it is back"
+
+    @staticmethod
+    def _should_fail_over(
+        snapshot: RequestSnapshot,
+        attempt: _Attempt,
+        tried: Collection[int],
+        deadline: float,
+        delivered: bool,
+    ) -> bool:
+        """Whether a transient failure should move straight to another endpoint."""
+
+        if attempt.ok or delivered or attempt.failure is None:
+            return False
+        if len(tried) >= len(snapshot.endpoints):
+            return False
+        return time.monotonic() + MIN_ATTEMPT_SECONDS <= deadline
+
+    @staticmethod
+    def _retry_delay(
+        snapshot: RequestSnapshot,
+        attempt: _Attempt,
+        retried: Mapping[str, int],
+        previous: float,
+        deadline: float,
+        delivered: bool,
+    ) -> float | None:
+        """Return the backoff before replaying ``snapshot``, or None to stop."""
+
+        policy = snapshot.retry
+        if policy is None or attempt.ok or delivered:
+            return None
+        if not policy.allows(attempt.failure, retried):
+            return None
+        delay = policy.next_delay(previous)
+        if attempt.failure == "throttled":
+            headers = {name.lower(): value for name, value in attempt.headers.items()}
+            retry_after = parse_retry_after(headers.get("retry-after", ""))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        # Retries spend the request's own deadline; never start one that
+        # could not finish.
+        if time.monotonic() + delay + MIN_ATTEMPT_SECONDS > deadline:
+            return None
+        return delay
+
+    def _watched_exchange(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        cancel_token: CancellationToken | None,
+    ) -> _Attempt:
+        started = self.balancer.begin(snapshot.endpoint)
+        healthy: bool | None = None
+        try:
+            attempt = self._cancellable_exchange(
+                snapshot, deadline, on_content, cancel_token
+            )
+            healthy = _endpoint_health(attempt)
+            return attempt
+        finally:
+            self.balancer.end(snapshot.endpoint, started, healthy=healthy)
+            self._record_circuit(snapshot, time.monotonic() - started, healthy)
+
+    def _cancellable_exchange(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        cancel_token: CancellationToken | None,
+    ) -> _Attempt:
+        if cancel_token is None:
+            return self._exchange(snapshot, deadline, on_content, None, None)
+        unregister: list[Callable[[], None]] = []
+
+        def on_socket(sock: socket.socket) -> None:
+            unregister.append(cancel_token.register(lambda: _abort_socket(sock)))
+
+        try:
+            attempt = self._exchange(
+                snapshot, deadline, on_content, on_socket, cancel_token
+            )
+        finally:
+            for callback in unregister:
+                callback()
+        # An aborted socket usually surfaces as a truncated read or a reset;
+        # either way, the cancellation is the outcome to report.
+        cancel_token.raise_if_cancelled()
+        return attempt
+
+    def _hedged_exchange(
+        self,
+        request: RequestSnapshot,
+        index: int,
+        deadline: float,
+        cancel_token: CancellationToken | None,
+    ) -> _Attempt:
+        """Run one attempt, duplicating it if it outlives the hedge delay.
+
+        The first successful response wins and the other request's socket is
+        shut down. Hedges only go out while the limiter has a free permit and
+        the hedger's budget allows, so a uniformly slow endpoint is not
+        flooded with duplicates. With alternate endpoints, the duplicate goes
+        to another one when the balancer has any to offer.
+        """
+
+        snapshot = request.endpoints[index]
+        hedger = self._hedger_for(snapshot)
+        hedge_delay = hedger.delay()
+        started = time.monotonic()
+        if hedge_delay is None:
+            attempt = self._watched_exchange(snapshot, deadline, None, cancel_token)
+            if attempt.ok:
+                hedger.observe(time.monotonic() - started)
+            return attempt
+
+        primary_token = CancellationToken()
+        hedge_token = CancellationToken()
+        unlink: list[Callable[[], None]] = []
+        if cancel_token is not None:
+            unlink.append(cancel_token.register(primary_token.cancel))
+            unlink.append(cancel_token.register(hedge_token.cancel))
+        lock = threading.Lock()
+        state = {"hedge": "waiting"}
+        hedge_attempts: list[_Attempt] = []
+        hedge_finished = threading.Event()
+
+        def run_hedge() -> None:
+            with lock:
+                if state["hedge"] != "waiting":
+                    return
+                state["hedge"] = "running"
+            try:
+                if hedge_token.cancelled or not hedger.allow():
+                    return
+                hedge_index = self._admit_endpoint(request, {index})
+                if hedge_index is None:
+                    return
+                target = request.endpoints[hedge_index]
+                limiter = self._limiter_for(target)
+                if (
+                    limiter is not None
+                    and limiter.try_acquire(target.estimated_tokens) > 0
+                ):
+                    self._record_circuit(target, 0.0, None)
+                    return
+                hedge_started = time.monotonic()
+                attempt = _Attempt(False, "Request was not sent")
+                try:
+                    attempt = self._watched_exchange(
+                        target, deadline, None, hedge_token
+                    )
+                except AnalysisCancelled:
+                    return
+                finally:
+                    if limiter is not None:
+                        limiter.release(
+                            hedge_started,
+                            status=attempt.status,
+                            headers=attempt.headers,
+                        )
+                hedge_attempts.append(attempt)
+                if attempt.ok:
+                    hedger.observe(time.monotonic() - hedge_started, hedge_won=True)
+                    primary_token.cancel()
+            finally:
+                hedge_finished.set()
+
+        timer = threading.Timer(hedge_delay, run_hedge)
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                attempt: _Attempt | None = self._watched_exchange(
+                    snapshot, deadline, None, primary_token
+                )
+            except AnalysisCancelled:
+                # Either the caller cancelled, or the hedge won and aborted us.
+                attempt = None
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            timer.cancel()
+            with lock:
+                hedge_running = state["hedge"] == "running"
+                state["hedge"] = "closed"
+            if attempt is not None and attempt.ok:
+                hedge_token.cancel()
+                hedger.observe(time.monotonic() - started)
+                return attempt
+            if attempt is None:
+                # The primary was at least this slow; keep the tail in view.
+                hedger.observe(time.monotonic() - started)
+            if hedge_running:
+                hedge_finished.wait(max(0.0, deadline - time.monotonic()))
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if hedge_attempts and (attempt is None or hedge_attempts[0].ok):
+                return hedge_attempts[0]
+            if attempt is None:
+                return _Attempt(False, "LLM response exceeded the total timeout")
+            return attempt
+        finally:
+            timer.cancel()
+            hedge_token.cancel()
+            for callback in unlink:
+                callback()
+
+    def _hedger_for(self, snapshot: RequestSnapshot) -> Hedger:
+        key = (snapshot.endpoint, snapshot.hedge)
+        with self._limiters_lock:
+            hedger = self._hedgers.get(key)
+            if hedger is None:
+                hedger = self._hedgers[key] = Hedger(snapshot.hedge)
+            return hedger
+
+    def _limiter_for(self, snapshot: RequestSnapshot) -> RateLimiter | None:
+        if snapshot.rate_limit is None:
+            return None
+        key = (snapshot.endpoint, snapshot.rate_limit)
+        with self._limiters_lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = RateLimiter(snapshot.rate_limit)
+            return limiter
+
+    def _exchange(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        on_socket: Callable[[socket.socket], None] | None,
+        cancel_token: CancellationToken | None,
+    ) -> _Attempt:
+        trace = RequestTrace()
+        started = time.monotonic()
+        attempt: _Attempt | None = None
+        try:
+            attempt = self._traced_exchange(
+                snapshot, deadline, on_content, on_socket, cancel_token, trace
+            )
+            return attempt
+        finally:
+            self._record_trace(snapshot, trace, started, attempt)
+
+    def _record_trace(
+        self,
+        snapshot: RequestSnapshot,
+        trace: RequestTrace,
+        started: float,
+        attempt: _Attempt | None,
+    ) -> None:
+        """Count one exchange in the usage totals and metrics registry."""
+
+        if trace.usage is not None:
+            self.usage_stats.record(trace.usage)
+        if attempt is None:
+            outcome = "cancelled"
+        elif attempt.ok:
+            outcome = "ok"
+        else:
+            outcome = attempt.failure or "error"
+        self.metrics.observe_attempt(
+            snapshot.endpoint, trace, time.monotonic() - started, outcome
+        )
+
+    def _traced_exchange(
+        self,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        on_socket: Callable[[socket.socket], None] | None,
+        cancel_token: CancellationToken | None,
+        trace: RequestTrace,
+    ) -> _Attempt:
+        status: int | None = None
+        headers: dict[str, str] = {}
+        try:
+            with self._open_response(snapshot, deadline, on_socket, trace) as response:
+                status = response.status
+                headers = dict(response.headers.items())
+                ok, text = self._read_outcome(
+                    response, snapshot, deadline, on_content, cancel_token, trace
                 )
-            suffix = f": {detail}" if detail else ""
-            return False, f"HTTP {error.code}{suffix}"
+        except AnalysisCancelled:
+            raise
         except TimeoutError:
-            return False, "LLM response exceeded the total timeout"
+            return _Attempt(False, "LLM response exceeded the total timeout", status)
         except Exception as error:
-            return False, self._safe_error_detail(str(error), snapshot)
+            detail = self._safe_error_detail(str(error), snapshot)
+            failure = _error_failure(error, status)
+            return _Attempt(False, detail, status, headers, failure)
+        failure = None if ok else _outcome_failure(status, text)
+        return _Attempt(ok, text, status, headers, failure)
+
+    def _read_outcome(
+        self,
+        response,
+        snapshot: RequestSnapshot,
+        deadline: float,
+        on_content: Callable[[str], None] | None,
+        cancel_token: CancellationToken | None,
+        trace: RequestTrace | None = None,
+    ) -> Tuple[bool, str]:
+        status = response.status
+        if status in _REDIRECT_CODES:
+            return self._http_error(status, None, "", snapshot)
+        if not 200 <= status < 300:
+            try:
+                raw_error = self._read_limited(
+                    response,
+                    MAX_ERROR_BYTES,
+                    deadline=deadline,
+                    cancel_token=cancel_token,
+                    trace=trace,
+                )
+            except Exception:
+                raw_error = None
+            reason = str(getattr(response, "reason", "") or "")
+            return self._http_error(status, raw_error, reason, snapshot)
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() == "text/event-stream":
+            return self._read_event_stream(
+                response, snapshot, deadline, on_content, cancel_token, trace
+            )
+        raw = self._read_limited(
+            response,
+            MAX_RESPONSE_BYTES,
+            deadline=deadline,
+            cancel_token=cancel_token,
+            trace=trace,
+        )
+        return self._parse_response(raw, snapshot, trace)
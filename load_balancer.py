@@ -0,0 +1,150 @@
+"""Weighted endpoint selection with passive health checks and ejection."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Collection, Sequence
+
+BALANCING_MODES = ("least_outstanding", "latency")
+DEFAULT_BALANCING = "least_outstanding"
+MAX_ENDPOINTS = 16
+MAX_WEIGHT = 1_000
+# Consecutive failures before an endpoint is ejected, and how long it stays out.
+EJECTION_THRESHOLD = 3
+BASE_EJECTION_SECONDS = 10.0
+MAX_EJECTION_SECONDS = 300.0
+_LATENCY_SMOOTHING = 0.3
+
+
+class _EndpointState:
+    __slots__ = (
+        "outstanding",
+        "latency",
+        "failures",
+        "ejections",
+        "ejected_until",
+        "requests",
+    )
+
+    def __init__(self) -> None:
+        self.outstanding = 0
+        self.latency: float | None = None
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+
+
+class LoadBalancer:
+    """Route requests across endpoints by load or latency and skip sick ones.
+
+    ``least_outstanding`` picks the endpoint with the fewest in-flight
+    requests per unit of weight; ``latency`` also multiplies by each
+    endpoint's latency EWMA, so a slow replica gets fewer requests before it
+    queues up. Health is checked passively: consecutive transport errors or
+    5xx responses eject an endpoint for an exponentially growing period,
+    and the first success after it returns restores it. Weight 0 marks a
+    standby that only serves when no weighted endpoint is available.
+    """
+
+    def __init__(self, *, rng: random.Random | None = None) -> None:
+        self._lock = threading.Lock()
+        self._states: dict[str, _EndpointState] = {}
+        self._random = rng or random.Random()
+
+    def _state_locked(self, key: str) -> _EndpointState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _EndpointState()
+        return state
+
+    def choose(
+        self,
+        keys: Sequence[str],
+        weights: Sequence[float],
+        mode: str = DEFAULT_BALANCING,
+        exclude: Collection[int] = (),
+    ) -> int:
+        """Return the index of the endpoint that should serve the next request."""
+
+        if not keys:
+            raise ValueError("At least one endpoint is required")
+        if len(keys) == 1:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            states = [self._state_locked(key) for key in keys]
+            allowed = [index for index in range(len(keys)) if index not in exclude]
+            if not allowed:
+                allowed = list(range(len(keys)))
+            healthy = [i for i in allowed if states[i].ejected_until <= now]
+            if not healthy:
+                # Everything is ejected: try whichever comes back first.
+                return min(allowed, key=lambda i: states[i].ejected_until)
+            weighted = [i for i in healthy if weights[i] > 0]
+            candidates = weighted or healthy
+            # Unmeasured endpoints count as the fastest known one, so they are
+            # probed without attracting every request of a burst.
+            measured = [states[i].latency for i in candidates if states[i].latency]
+            fastest = min(measured, default=1.0)
+
+            def cost(index: int) -> float:
+                state = states[index]
+                load = (state.outstanding + 1) / (weights[index] or 1)
+                if mode == "latency":
+                    load *= state.latency or fastest
+                return load
+
+            best = min(cost(index) for index in candidates)
+            tied = [index for index in candidates if cost(index) <= best]
+            return self._random.choice(tied)
+
+    def begin(self, key: str) -> float:
+        with self._lock:
+            state = self._state_locked(key)
+            state.outstanding += 1
+            state.requests += 1
+        return time.monotonic()
+
+    def end(self, key: str, started: float, *, healthy: bool | None) -> None:
+        """Finish a request; ``healthy`` None means it was abandoned, not judged."""
+
+        now = time.monotonic()
+        with self._lock:
+            state = self._state_locked(key)
+            state.outstanding = max(0, state.outstanding - 1)
+            if healthy is None:
+                return
+            if healthy:
+                elapsed = now - started
+                state.latency = (
+                    elapsed
+                    if state.latency is None
+                    else (1 - _LATENCY_SMOOTHING) * state.latency
+                    + _LATENCY_SMOOTHING * elapsed
+                )
+                state.failures = 0
+                state.ejections = 0
+                return
+            state.failures += 1
+            if state.failures >= EJECTION_THRESHOLD and state.ejected_until <= now:
+                state.ejections += 1
+                period = BASE_EJECTION_SECONDS * 2 ** min(state.ejections - 1, 16)
+                state.ejected_until = now + min(period, MAX_EJECTION_SECONDS)
+                # Returning endpoints get one probe before they are ejected again.
+                state.failures = EJECTION_THRESHOLD - 1
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {
+                    "outstanding": state.outstanding,
+                    "requests": state.requests,
+                    "latency": state.latency or 0.0,
+                    "ejected_for": max(0.0, state.ejected_until - now),
+                }
+                for key, state in self._states.items()
+            }
@@ -0,0 +1,87 @@
+"""Prompt layouts that keep a cacheable prefix, and cached-token accounting."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+# "combined" sends guidance and input together in one user message; "prefix"
+# sends the guidance in its own message ahead of the input, so the system
+# prompt and guidance form a byte-identical prefix across requests.
+PROMPT_LAYOUTS = ("combined", "prefix")
+DEFAULT_PROMPT_LAYOUT = "combined"
+
+
+@dataclass(frozen=True, slots=True)
+class TokenUsage:
+    """Token counts a provider reported for one response."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+def _count(mapping: Any, key: str) -> int:
+    if not isinstance(mapping, Mapping):
+        return 0
+    value = mapping.get(key)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return 0
+    return value
+
+
+def usage_from(payload: Any) -> TokenUsage | None:
+    """Read the ``usage`` of a completion payload, if it reports any.
+
+    Providers name cache hits differently: OpenAI-compatible servers report
+    ``prompt_tokens_details.cached_tokens``, DeepSeek ``prompt_cache_hit_tokens``,
+    and Anthropic-style gateways ``cache_read_input_tokens``.
+    """
+
+    usage = payload.get("usage") if isinstance(payload, Mapping) else None
+    if not isinstance(usage, Mapping):
+        return None
+    cached = max(
+        _count(usage.get("prompt_tokens_details"), "cached_tokens"),
+        _count(usage, "prompt_cache_hit_tokens"),
+        _count(usage, "cache_read_input_tokens"),
+    )
+    return TokenUsage(
+        prompt_tokens=_count(usage, "prompt_tokens"),
+        completion_tokens=_count(usage, "completion_tokens"),
+        cached_tokens=cached,
+        cache_write_tokens=_count(usage, "cache_creation_input_tokens"),
+    )
+
+
+class UsageStats:
+    """Thread-safe totals of the token usage reported by responses."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cache_write_tokens = 0
+
+    def record(self, usage: TokenUsage) -> None:
+        with self._lock:
+            self.responses += 1
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+            self.cached_tokens += usage.cached_tokens
+            self.cache_write_tokens += usage.cache_write_tokens
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cache_write_tokens": self.cache_write_tokens,
+            }
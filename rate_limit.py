@@ -0,0 +1,280 @@
+"""Client-side request and token quotas with adaptive concurrency per endpoint."""
+
+from __future__ import annotations
+
+import email.utils
+import math
+import re
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+DEFAULT_MAX_CONCURRENCY = 64
+MAX_CONCURRENCY = 256
+MAX_PER_MINUTE = 100_000_000
+# Buckets hold at most this many seconds of quota, so an idle client cannot
+# save up a whole minute and spend it in one burst.
+BURST_SECONDS = 10.0
+DEFAULT_THROTTLE_SECONDS = 1.0
+MAX_THROTTLE_SECONDS = 300.0
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitPolicy:
+    """Quota settings for one endpoint; zero per-minute values mean unlimited."""
+
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    adaptive: bool = True
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse ``x-ratelimit-reset-*`` values such as ``"1s"``, ``"6m0s"``, ``"20ms"``."""
+
+    text = value.strip().lower()
+    if not text:
+        return None
+    try:
+        seconds = float(text)
+    except ValueError:
+        pass
+    else:
+        return seconds if math.isfinite(seconds) and seconds >= 0 else None
+    total = 0.0
+    position = 0
+    for match in _DURATION_PART.finditer(text):
+        if match.start() != position:
+            return None
+        amount = float(match.group(1))
+        total += amount * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+        position = match.end()
+    return total if position == len(text) else None
+
+
+def parse_retry_after(value: str, now: float | None = None) -> float | None:
+    """Return the delay in seconds requested by a ``Retry-After`` header."""
+
+    text = value.strip()
+    if not text:
+        return None
+    if text.isdigit():
+        return float(text)
+    try:
+        moment = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if moment is None or moment.tzinfo is None:
+        return None
+    wall = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - wall)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        return None
+    return number if number >= 0 else None
+
+
+class _Bucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: float, now: float) -> None:
+        self.per_minute = per_minute
+        self.level = self.capacity
+        self.updated = now
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.per_minute * BURST_SECONDS / 60)
+
+    def refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.level = min(self.capacity, self.level + elapsed * self.per_minute / 60)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until ``amount`` may be taken; larger requests run into debt."""
+
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60 / self.per_minute
+
+
+class RateLimiter:
+    """Pace requests to one endpoint under request, token, and concurrency limits.
+
+    Requests wait for a request-bucket token, their estimated prompt and
+    completion tokens, and a concurrency slot. Responses feed back through
+    :meth:`release`: ``429`` and ``Retry-After`` pause every caller, the
+    ``x-ratelimit-*`` headers resynchronize the buckets with the provider's
+    view, and with ``adaptive`` the concurrency limit grows additively while
+    latency stays near its baseline and halves on throttling (AIMD).
+    """
+
+    def __init__(self, policy: RateLimitPolicy) -> None:
+        self.policy = policy
+        now = time.monotonic()
+        self._condition = threading.Condition()
+        self._requests = (
+            _Bucket(policy.requests_per_minute, now)
+            if policy.requests_per_minute
+            else None
+        )
+        self._tokens = (
+            _Bucket(policy.tokens_per_minute, now) if policy.tokens_per_minute else None
+        )
+        self._limit = float(policy.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency: float | None = None
+        self._baseline: float | None = None
+        self.throttled = 0
+        self.completed = 0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(1, int(self._limit))
+
+    def _try_acquire_locked(self, tokens: int, now: float) -> float:
+        """Take a permit and return 0, or return how long to wait before retrying."""
+
+        waits = [self._paused_until - now]
+        for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                waits.append(bucket.wait_for(amount))
+        wait = max(waits)
+        if wait > 0:
+            return wait
+        if self._in_flight >= self.concurrency_limit:
+            # A slot frees on release, which notifies; poll only as a fallback.
+            return 0.25
+        if self._requests is not None:
+            self._requests.level -= 1
+        if self._tokens is not None:
+            self._tokens.level -= tokens
+        self._in_flight += 1
+        return 0.0
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """Non-blocking :meth:`acquire`: 0 means a permit was taken."""
+
+        with self._condition:
+            return self._try_acquire_locked(max(0, tokens), time.monotonic())
+
+    def acquire(
+        self, tokens: int = 0, *, cancelled: Callable[[], bool] | None = None
+    ) -> float:
+        """Block until a permit is available; return its start time.
+
+        ``cancelled`` is polled while waiting so that a cancelled analysis does
+        not sit in the queue.
+        """
+
+        with self._condition:
+            while True:
+                if cancelled is not None and cancelled():
+                    raise InterruptedError("Cancelled while waiting for the rate limit")
+                now = time.monotonic()
+                wait = self._try_acquire_locked(max(0, tokens), now)
+                if wait <= 0:
+                    return now
+                self._condition.wait(min(wait, 0.25))
+
+    def release(
+        self,
+        started: float,
+        *,
+        status: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        """Return a permit and learn from the response status and headers."""
+
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self.completed += 1
+            self._observe_headers_locked(headers, now)
+            if status == 429:
+                self.throttled += 1
+                delay = parse_retry_after(headers.get("retry-after", ""))
+                if delay is None:
+                    delay = DEFAULT_THROTTLE_SECONDS
+                self._pause_locked(now + min(delay, MAX_THROTTLE_SECONDS))
+                self._decrease_locked(now, 0.5)
+            elif status is not None and 200 <= status < 300:
+                self._observe_latency_locked(now - started, now)
+            self._condition.notify_all()
+
+    def _pause_locked(self, until: float) -> None:
+        self._paused_until = max(self._paused_until, until)
+
+    def _decrease_locked(self, now: float, factor: float) -> None:
+        if not self.policy.adaptive:
+            return
+        # React once per window; a burst of 429s is one congestion signal.
+        window = max(DEFAULT_THROTTLE_SECONDS, self._baseline or 0.0)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self._limit = max(1.0, self._limit * factor)
+
+    def _observe_latency_locked(self, latency: float, now: float) -> None:
+        self._latency = (
+            latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        )
+        if self._baseline is None or self._latency < self._baseline:
+            self._baseline = self._latency
+        else:
+            # Let the baseline drift up slowly so a faster past does not pin it.
+            self._baseline *= 1.001
+        if not self.policy.adaptive:
+            return
+        if self._latency > 2 * self._baseline:
+            # Queueing at the provider: back off gently before it starts to 429.
+            self._decrease_locked(now, 0.9)
+        else:
+            self._limit = min(
+                float(self.policy.max_concurrency), self._limit + 1 / self._limit
+            )
+
+    def _observe_headers_locked(self, headers: Mapping[str, str], now: float) -> None:
+        for kind, bucket in (("requests", self._requests), ("tokens", self._tokens)):
+            remaining = _header_int(headers, f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            if bucket is None:
+                # Without a configured quota, adopt the one the provider reports.
+                limit = _header_int(headers, f"x-ratelimit-limit-{kind}")
+                if not limit:
+                    continue
+                bucket = _Bucket(min(limit, MAX_PER_MINUTE), now)
+                if kind == "requests":
+                    self._requests = bucket
+                else:
+                    self._tokens = bucket
+            bucket.refill(now)
+            if remaining is not None:
+                bucket.level = min(bucket.level, float(remaining))
+            if remaining == 0 and reset:
+                self._pause_locked(now + min(reset, MAX_THROTTLE_SECONDS))
+
+    def stats(self) -> dict[str, float]:
+        with self._condition:
+            return {
+                "concurrency_limit": self.concurrency_limit,
+                "in_flight": self._in_flight,
+                "throttled": self.throttled,
+                "completed": self.completed,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+            }
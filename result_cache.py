@@ -0,0 +1,245 @@
+"""Content-addressed, size-bounded on-disk cache of validated analysis results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, replace
+
+from config_manager import APP_DIR
+from diagnostics import CompileResult, parse_diagnostics
+from file_ops import _atomic_write
+
+CACHE_DIR = os.path.join(APP_DIR, "cache", "results")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_PARAGRAPH_ENTRIES = 10_000
+MAX_ENTRY_BYTES = 8 * 1024 * 1024
+_FORMAT_VERSION = 1
+
+
+def request_key(endpoint: str, body: bytes) -> str:
+    """Hash the exact wire request: model, sampling, guidance, and input text."""
+
+    digest = hashlib.sha256()
+    digest.update(endpoint.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def paragraph_key(context: str, paragraph: str) -> str:
+    """Hash one paragraph together with the request context it is analyzed in."""
+
+    digest = hashlib.sha256()
+    digest.update(context.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(paragraph.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ParagraphCache:
+    """Bounded in-memory results for single paragraphs of an editing session.
+
+    Results are stored in paragraph-relative coordinates: line 1 is the
+    paragraph's first line. Keys already cover the paragraph text, so a hit
+    can be shifted to wherever the paragraph now sits without revalidation.
+    """
+
+    def __init__(self, *, max_entries: int = DEFAULT_PARAGRAPH_ENTRIES) -> None:
+        if isinstance(max_entries, bool) or not isinstance(max_entries, int):
+            raise ValueError("max_entries must be a positive integer")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CompileResult] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> CompileResult | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: CompileResult) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+
+class ResultCache:
+    """Persist validated results keyed by the request that produced them.
+
+    Entries are written atomically, one file per key, and evicted least recently
+    used first once the directory exceeds ``max_bytes``. A stored result is
+    validated again against the caller's source text before it is returned, so
+    a corrupt or foreign entry is a miss, never a wrong diagnostic.
+    """
+
+    def __init__(
+        self, directory: str | None = None, *, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        if isinstance(max_bytes, bool) or not isinstance(max_bytes, int):
+            raise ValueError("max_bytes must be a positive integer")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+        self.directory = os.path.abspath(os.fspath(directory or CACHE_DIR))
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] | None = None
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_index_locked(self) -> OrderedDict[str, int]:
+        if self._index is not None:
+            return self._index
+        entries: list[tuple[float, str, int]] = []
+        try:
+            buckets = os.listdir(self.directory)
+        except OSError:
+            buckets = []
+        for bucket in buckets:
+            try:
+                names = os.listdir(os.path.join(self.directory, bucket))
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    info = os.stat(os.path.join(self.directory, bucket, name))
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, name[:-5], info.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _mtime, key, size in entries)
+        self._total = sum(self._index.values())
+        return self._index
+
+    def _forget_locked(self, key: str) -> None:
+        index = self._load_index_locked()
+        size = index.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def get(self, key: str, source_text: str) -> CompileResult | None:
+        """Return a revalidated cached result, counting the lookup."""
+
+        path = self._path(key)
+        result = None
+        try:
+            with open(path, "rb") as entry:
+                raw = entry.read(MAX_ENTRY_BYTES + 1)
+            if len(raw) <= MAX_ENTRY_BYTES:
+                result = self._decode(raw, source_text)
+        except (OSError, UnicodeError, ValueError, TypeError):
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            index = self._load_index_locked()
+            if key in index:
+                index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    @staticmethod
+    def _decode(raw: bytes, source_text: str) -> CompileResult:
+        data = json.loads(raw.decode("utf-8"))
+        if not isinstance(data, dict) or data.get("version") != _FORMAT_VERSION:
+            raise ValueError("Unsupported cache entry")
+        raw_response = data.get("raw_response", "")
+        if not isinstance(raw_response, str):
+            raise ValueError("Invalid cached raw response")
+        result = parse_diagnostics(
+            {"language": data.get("language"), "diagnostics": data.get("diagnostics")},
+            source_text,
+        )
+        return replace(result, raw_response=raw_response)
+
+    def put(self, key: str, result: CompileResult) -> None:
+        """Store a validated result; cache failures never fail an analysis."""
+
+        payload = json.dumps(
+            {
+                "version": _FORMAT_VERSION,
+                "language": result.language,
+                "diagnostics": [asdict(item) for item in result.diagnostics],
+                "raw_response": result.raw_response,
+            },
+            ensure_ascii=False,
+            allow_nan=False,
+        ).encode("utf-8")
+        if len(payload) > min(MAX_ENTRY_BYTES, self.max_bytes):
+            return
+        # Concurrent stores write their files in parallel; the atomic rename
+        # means a reader sees a whole entry or none. An entry evicted while its
+        # file is rewritten reads as a miss later, never as a wrong result.
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            _atomic_write(self._path(key), payload)
+        except OSError:
+            return
+        with self._lock:
+            self._forget_locked(key)
+            index = self._load_index_locked()
+            index[key] = len(payload)
+            self._total += len(payload)
+            self.stores += 1
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        index = self._load_index_locked()
+        while self._total > self.max_bytes and index:
+            key, size = index.popitem(last=False)
+            self._total -= size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            self._load_index_locked()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": len(self._index or ()),
+                "bytes": self._total,
+            }
@@ -0,0 +1,112 @@
+"""Retry policy for transient request failures and per-attempt metrics."""
+
+from __future__ import annotations
+
+import random
+import threading
+from collections import Counter, deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+# Failure classes a policy can retry. Anything else (4xx, refusals, invalid
+# content, timeouts against the shared deadline) is final on the first attempt.
+FAILURE_KINDS = ("connection", "server", "throttled", "truncated")
+MAX_RETRIES = 10
+DEFAULT_BASE_DELAY_SECONDS = 0.5
+DEFAULT_MAX_DELAY_SECONDS = 20.0
+MAX_DELAY_SECONDS = 300.0
+RECENT_ATTEMPTS = 256
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How often each failure class is retried and how long to back off.
+
+    ``connection`` covers failures before any response arrived, ``server``
+    502/503/504, ``throttled`` 429, and ``truncated`` a success response whose
+    body broke off or is not complete JSON.
+    """
+
+    connection: int = 3
+    server: int = 3
+    throttled: int = 4
+    truncated: int = 2
+    base_delay: float = DEFAULT_BASE_DELAY_SECONDS
+    max_delay: float = DEFAULT_MAX_DELAY_SECONDS
+
+    def allows(self, kind: str | None, retried: Mapping[str, int]) -> bool:
+        """Whether another retry of ``kind`` fits after ``retried`` earlier ones."""
+
+        if kind not in FAILURE_KINDS:
+            return False
+        return retried.get(kind, 0) < getattr(self, kind)
+
+    def next_delay(self, previous: float, rng: random.Random | None = None) -> float:
+        """Decorrelated jitter: uniform from the base to three times ``previous``.
+
+        Unlike plain exponential backoff, callers that failed together spread
+        out instead of retrying in lockstep.
+        """
+
+        upper = max(self.base_delay, previous) * 3
+        draw = (rng or random).uniform(self.base_delay, upper)
+        return min(self.max_delay, draw)
+
+
+@dataclass(frozen=True, slots=True)
+class AttemptRecord:
+    """One wire attempt: its number within the request and how it ended."""
+
+    attempt: int
+    status: int | None
+    failure: str | None
+    elapsed: float
+    retry_delay: float | None = None
+    endpoint: str = ""
+
+
+class RetryStats:
+    """Thread-safe attempt counters plus a bounded log of recent attempts."""
+
+    def __init__(self, *, recent_limit: int = RECENT_ATTEMPTS) -> None:
+        self._lock = threading.Lock()
+        self._recent: deque[AttemptRecord] = deque(maxlen=recent_limit)
+        self._failures: Counter[str] = Counter()
+        self.attempts = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+
+    def record(self, record: AttemptRecord) -> None:
+        with self._lock:
+            self.attempts += 1
+            self._recent.append(record)
+            if record.failure is not None:
+                self._failures[record.failure] += 1
+            if record.retry_delay is not None:
+                self.retries += 1
+
+    def finish(self, attempts: int, ok: bool) -> None:
+        """Count a request that needed retries as recovered or exhausted."""
+
+        if attempts <= 1:
+            return
+        with self._lock:
+            if ok:
+                self.recovered += 1
+            else:
+                self.exhausted += 1
+
+    def recent(self) -> tuple[AttemptRecord, ...]:
+        with self._lock:
+            return tuple(self._recent)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "recovered": self.recovered,
+                "exhausted": self.exhausted,
+                **{f"failed_{kind}": self._failures[kind] for kind in FAILURE_KINDS},
+            }
@@ -0,0 +1,254 @@
+"""Per-call LLM telemetry: phase timings, sizes, tokens, and their export."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import threading
+import urllib.parse
+from dataclasses import dataclass
+
+from prompt_cache import TokenUsage
+
+# Upper bounds in seconds, from a warm keep-alive round trip to a long completion.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+PHASES = ("dns", "connect", "tls", "ttfb", "total")
+_PREFIX = "typocompiler_llm_"
+_METRICS = {
+    "phase_seconds": (
+        "histogram",
+        "Duration of each phase of an LLM call attempt.",
+    ),
+    "attempts_total": ("counter", "LLM call attempts by outcome."),
+    "connections_total": (
+        "counter",
+        "LLM call attempts by whether they opened a new connection.",
+    ),
+    "bytes_total": ("counter", "Body bytes sent to and received from LLM endpoints."),
+    "tokens_total": ("counter", "Tokens reported in LLM response usage."),
+    "requests_total": ("counter", "LLM requests after retries and failover."),
+    "retries_total": ("counter", "Attempts that replayed an earlier failed one."),
+}
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass(slots=True)
+class RequestTrace:
+    """What one wire exchange cost, filled in by each layer it passes through.
+
+    Phase durations stay None when the phase did not happen, like DNS, TCP,
+    and TLS on a reused keep-alive connection. Byte counts cover request and
+    response bodies as they crossed the wire, before any decompression.
+    """
+
+    dns: float | None = None
+    connect: float | None = None
+    tls: float | None = None
+    ttfb: float | None = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    reused: bool = False
+    usage: TokenUsage | None = None
+
+
+def endpoint_label(url: str) -> str:
+    """Drop the query and any user info, which may carry credentials."""
+
+    parts = urllib.parse.urlsplit(url)
+    host = parts.hostname or ""
+    if ":" in host:
+        host = f"[{host}]"
+    if parts.port is not None:
+        host += f":{parts.port}"
+    return f"{parts.scheme}://{host}{parts.path}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + inner + "}"
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms describing every LLM call.
+
+    Each attempt on the wire records its phase durations, body sizes, token
+    usage, and outcome per endpoint; each request records whether it
+    finally succeeded. The registry renders as Prometheus text exposition
+    or as one JSON object per series.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        if not buckets or list(buckets) != sorted(set(buckets)):
+            raise ValueError("Histogram buckets must be distinct and increasing")
+        self.buckets = tuple(float(bound) for bound in buckets)
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, _Labels], float] = {}
+        self._histograms: dict[tuple[str, _Labels], _Histogram] = {}
+
+    def _add_locked(self, name: str, labels: _Labels, amount: float) -> None:
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def _observe_locked(self, name: str, labels: _Labels, seconds: float) -> None:
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = _Histogram(len(self.buckets) + 1)
+        seconds = max(0.0, seconds)
+        histogram.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram.sum += seconds
+        histogram.count += 1
+
+    def observe_attempt(
+        self, endpoint: str, trace: RequestTrace, elapsed: float, outcome: str
+    ) -> None:
+        """Record one wire attempt that ended in ``outcome`` after ``elapsed``."""
+
+        label = ("endpoint", endpoint_label(endpoint))
+        with self._lock:
+            for phase in PHASES:
+                seconds = elapsed if phase == "total" else getattr(trace, phase)
+                if seconds is not None:
+                    self._observe_locked(
+                        "phase_seconds", (label, ("phase", phase)), seconds
+                    )
+            self._add_locked("attempts_total", (label, ("outcome", outcome)), 1)
+            state = "reused" if trace.reused else "new"
+            self._add_locked("connections_total", (label, ("state", state)), 1)
+            for direction, amount in (
+                ("sent", trace.bytes_sent),
+                ("received", trace.bytes_received),
+            ):
+                self._add_locked(
+                    "bytes_total", (label, ("direction", direction)), amount
+                )
+            if trace.usage is not None:
+                for kind, amount in (
+                    ("prompt", trace.usage.prompt_tokens),
+                    ("completion", trace.usage.completion_tokens),
+                    ("cached", trace.usage.cached_tokens),
+                ):
+                    self._add_locked("tokens_total", (label, ("kind", kind)), amount)
+
+    def observe_request(self, attempts: int, ok: bool) -> None:
+        """Record a request that ended after ``attempts`` wire attempts."""
+
+        with self._lock:
+            outcome = "ok" if ok else "failed"
+            self._add_locked("requests_total", (("outcome", outcome),), 1)
+            if attempts > 1:
+                self._add_locked("retries_total", (), attempts - 1)
+
+    def _series(self) -> list[tuple[str, _Labels, float | _Histogram]]:
+        with self._lock:
+            series: list[tuple[str, _Labels, float | _Histogram]] = [
+                (name, labels, value)
+                for (name, labels), value in self._counters.items()
+            ]
+            for (name, labels), histogram in self._histograms.items():
+                copy = _Histogram(len(histogram.counts))
+                copy.counts = list(histogram.counts)
+                copy.sum = histogram.sum
+                copy.count = histogram.count
+                series.append((name, labels, copy))
+        series.sort(key=lambda item: (item[0], item[1]))
+        return series
+
+    def _cumulative(self, histogram: _Histogram) -> list[tuple[float, int]]:
+        running = 0
+        bounds = (*self.buckets, math.inf)
+        cumulative = []
+        for bound, count in zip(bounds, histogram.counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative
+
+    def prometheus_text(self) -> str:
+        """Render every series in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        described: set[str] = set()
+        for name, labels, value in self._series():
+            full_name = _PREFIX + name
+            kind, help_text = _METRICS[name]
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+            if isinstance(value, _Histogram):
+                for bound, count in self._cumulative(value):
+                    bucket_labels = (*labels, ("le", _format_number(bound)))
+                    lines.append(
+                        f"{full_name}_bucket{_format_labels(bucket_labels)} {count}"
+                    )
+                lines.append(
+                    f"{full_name}_sum{_format_labels(labels)} "
+                    f"{_format_number(value.sum)}"
+                )
+                lines.append(f"{full_name}_count{_format_labels(labels)} {value.count}")
+            else:
+                lines.append(
+                    f"{full_name}{_format_labels(labels)} {_format_number(value)}"
+                )
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def json_lines(self) -> str:
+        """Render every series as one JSON object per line."""
+
+        lines = []
+        for name, labels, value in self._series():
+            record: dict[str, object] = {
+                "metric": _PREFIX + name,
+                "type": _METRICS[name][0],
+                "labels": dict(labels),
+            }
+            if isinstance(value, _Histogram):
+                record["buckets"] = {
+                    _format_number(bound): count
+                    for bound, count in self._cumulative(value)
+                }
+                record["sum"] = value.sum
+                record["count"] = value.count
+            else:
+                record["value"] = value
+            lines.append(json.dumps(record, ensure_ascii=False, allow_nan=False))
+        return "".join(f"{line}\n" for line in lines)
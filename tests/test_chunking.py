@@ -0,0 +1,157 @@
+import random
+
+import pytest
+
+from chunking import (
+    Chunk,
+    chunk_line_range,
+    merge_chunk_results,
+    offset_chunk,
+    plan_chunks,
+    remap_diagnostic,
+    split_paragraphs,
+)
+from diagnostics import CompileResult, Diagnostic, Rejection
+from token_budget import estimate_tokens
+
+_PIECES = ["word", "é", "漢字", "한", "😀", " ", "\t", "\n", "\n\n", ". ", "。", "!"]
+
+
+def _random_texts(count: int) -> list[str]:
+    rng = random.Random(2024)
+    return [
+        "".join(rng.choice(_PIECES) for _piece in range(rng.randrange(1, 120)))
+        for _text in range(count)
+    ]
+
+
+def _start(text: str, chunk: Chunk) -> int:
+    """Return the offset in ``text`` that ``chunk``'s coordinates point at."""
+
+    offset = 0
+    for _line in range(chunk.line_offset):
+        offset = text.index("\n", offset) + 1
+    return offset + chunk.column_offset
+
+
+def _position(text: str, offset: int) -> tuple[int, int]:
+    line = text.count("\n", 0, offset) + 1
+    return line, offset - (text.rfind("\n", 0, offset) + 1) + 1
+
+
+@pytest.mark.parametrize("budget", [1, 2, 5, 17, 1000])
+def test_chunks_round_trip_within_the_budget(budget: int) -> None:
+    for text in _random_texts(200):
+        chunks = plan_chunks(text, budget)
+        assert "".join(chunk.text for chunk in chunks) == text
+        offset = 0
+        for chunk in chunks:
+            assert chunk.text
+            assert _start(text, chunk) == offset
+            assert estimate_tokens(chunk.text) <= budget or len(chunk.text) == 1
+            first, last = chunk_line_range(chunk)
+            assert first == text.count("\n", 0, offset) + 1
+            assert last == text.count("\n", 0, offset + len(chunk.text) - 1) + 1
+            offset += len(chunk.text)
+
+
+def test_chunks_prefer_paragraph_then_sentence_boundaries() -> None:
+    paragraph = "One two three. Four five six.\n"
+    text = paragraph + "\n" + paragraph
+    budget = estimate_tokens(paragraph + "\n")
+    assert [chunk.text for chunk in plan_chunks(text, budget)] == [
+        paragraph + "\n",
+        paragraph,
+    ]
+    sentences = plan_chunks(paragraph, estimate_tokens("One two three. "))
+    assert [chunk.text for chunk in sentences] == [
+        "One two three. ",
+        "Four five six.\n",
+    ]
+    assert sentences[1] == Chunk("Four five six.\n", 0, 15)
+    assert plan_chunks("", 10) == ()
+
+
+@pytest.mark.parametrize("budget", [0, -1, True, 1.5])
+def test_chunk_budget_must_be_a_positive_integer(budget) -> None:
+    with pytest.raises(ValueError):
+        plan_chunks("text", budget)
+
+
+def test_remapped_diagnostics_point_at_the_same_text() -> None:
+    rng = random.Random(7)
+    for text in _random_texts(200):
+        for chunk in plan_chunks(text, rng.choice([1, 3, 8])):
+            start = rng.randrange(len(chunk.text))
+            end = rng.randrange(start, len(chunk.text)) + 1
+            if "\n" in chunk.text[start:end]:
+                end = start + chunk.text[start:end].index("\n")
+            line, column = _position(chunk.text, start)
+            diagnostic = Diagnostic(
+                line, column, column + end - start, "spelling", "error", "Typo"
+            )
+            mapped = remap_diagnostic(diagnostic, chunk)
+            offset = _start(text, chunk) + start
+            assert (mapped.line, mapped.start_column) == _position(text, offset)
+            assert mapped.end_column - mapped.start_column == end - start
+
+
+def test_paragraphs_round_trip_and_start_at_column_zero() -> None:
+    for text in _random_texts(200):
+        paragraphs = split_paragraphs(text)
+        assert "".join(paragraph.text for paragraph in paragraphs) == text
+        offset = 0
+        for paragraph in paragraphs:
+            assert paragraph.column_offset == 0
+            assert _start(text, paragraph) == offset
+            offset += len(paragraph.text)
+            first, last = chunk_line_range(paragraph)
+            assert first == paragraph.line_offset + 1
+            assert last - first == paragraph.text.count("\n") - (
+                paragraph.text.endswith("\n")
+            )
+
+
+def test_chunks_of_a_paragraph_offset_into_the_document() -> None:
+    for text in _random_texts(100):
+        offset = 0
+        for paragraph in split_paragraphs(text):
+            inner_offset = offset
+            for inner in plan_chunks(paragraph.text, 2):
+                chunk = offset_chunk(inner, paragraph)
+                assert _start(text, chunk) == inner_offset
+                inner_offset += len(inner.text)
+            offset += len(paragraph.text)
+
+
+def test_indented_paragraph_after_a_blank_line_keeps_its_indentation() -> None:
+    text = "First.\n\n  Indented teh.\n\n\tTabbed.\n"
+    assert split_paragraphs(text) == (
+        Chunk("First.\n\n", 0, 0),
+        Chunk("  Indented teh.\n\n", 2, 0),
+        Chunk("\tTabbed.\n", 4, 0),
+    )
+    typo = Diagnostic(1, 12, 15, "spelling", "error", "Typo")
+    mapped = remap_diagnostic(typo, split_paragraphs(text)[1])
+    assert text.splitlines()[mapped.line - 1][mapped.start_column - 1 :][:3] == "teh"
+
+
+def test_merged_result_is_in_document_coordinates() -> None:
+    first = Chunk("Teh cat.\n", 0, 0)
+    second = Chunk("Der Hund. Teh dog.", 1, 0)
+    typo = Diagnostic(1, 1, 4, "spelling", "error", "Typo")
+    rejection = Rejection(0, '{"line": 1}', "Missing message")
+    merged = merge_chunk_results(
+        [
+            (second, CompileResult("de", (typo,), "second", (rejection,))),
+            (first, CompileResult("en", (typo, typo), "first")),
+        ]
+    )
+    assert merged.language == "de"
+    assert [(item.line, item.start_column) for item in merged.diagnostics] == [
+        (1, 1),
+        (2, 1),
+    ]
+    assert merged.raw_response == "second\nfirst"
+    assert merged.rejected == (rejection,)
+    assert merge_chunk_results([]).language == "und"
@@ -0,0 +1,183 @@
+import json
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import (
+    MAX_OPEN_SECONDS,
+    MAX_STATE_BYTES,
+    STALE_SECONDS,
+    CircuitBreakers,
+    CircuitPolicy,
+)
+
+ENDPOINT = "https://llm.example/v1/chat/completions"
+POLICY = CircuitPolicy(
+    failure_percent=50.0,
+    slow_seconds=5.0,
+    slow_percent=100.0,
+    minimum_requests=4,
+    window_seconds=60.0,
+    open_seconds=10.0,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.wall
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+        self.wall += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    fake = _Clock()
+    monkeypatch.setattr(circuit_breaker, "time", fake)
+    return fake
+
+
+def _record(breakers, healthy, *, elapsed: float = 0.1, times: int = 1) -> None:
+    for _request in range(times):
+        assert breakers.allow(ENDPOINT)
+        breakers.record(ENDPOINT, POLICY, elapsed, healthy=healthy)
+
+
+def _trip(breakers) -> None:
+    _record(breakers, True, times=2)
+    _record(breakers, False, times=2)
+
+
+def test_circuit_stays_closed_below_the_minimum_requests(clock) -> None:
+    breakers = CircuitBreakers()
+    _record(breakers, False, times=3)
+    assert breakers.state(ENDPOINT) == ("closed", 0.0)
+
+
+def test_failure_rate_opens_the_circuit_and_fails_fast(clock) -> None:
+    breakers = CircuitBreakers()
+    _trip(breakers)
+    assert breakers.state(ENDPOINT) == ("open", 10.0)
+    assert not breakers.allow(ENDPOINT)
+    assert breakers.rejected == 1
+
+
+def test_slow_calls_open_the_circuit(clock) -> None:
+    breakers = CircuitBreakers()
+    _record(breakers, True, elapsed=6.0, times=4)
+    assert breakers.state(ENDPOINT)[0] == "open"
+
+
+def test_outcomes_outside_the_window_are_forgotten(clock) -> None:
+    breakers = CircuitBreakers()
+    _record(breakers, False, times=3)
+    clock.advance(61.0)
+    _record(breakers, False)
+    assert breakers.state(ENDPOINT)[0] == "closed"
+
+
+def test_half_open_admits_one_probe_and_success_closes(clock) -> None:
+    breakers = CircuitBreakers()
+    _trip(breakers)
+    clock.advance(10.0)
+    assert breakers.state(ENDPOINT) == ("half_open", 0.0)
+    assert breakers.allow(ENDPOINT)
+    assert not breakers.allow(ENDPOINT)
+    breakers.record(ENDPOINT, POLICY, 0.1, healthy=True)
+    assert breakers.state(ENDPOINT) == ("closed", 0.0)
+    assert breakers.stats()[ENDPOINT]["trips"] == 0
+
+
+def test_probe_without_a_verdict_frees_the_probe_slot(clock) -> None:
+    breakers = CircuitBreakers()
+    _trip(breakers)
+    clock.advance(10.0)
+    assert breakers.allow(ENDPOINT)
+    breakers.record(ENDPOINT, POLICY, 0.1, healthy=None)
+    assert breakers.allow(ENDPOINT)
+
+
+def test_failed_probes_double_the_open_period_up_to_the_cap(clock) -> None:
+    breakers = CircuitBreakers()
+    _trip(breakers)
+    periods = []
+    for _probe in range(10):
+        periods.append(breakers.state(ENDPOINT)[1])
+        clock.advance(periods[-1])
+        assert breakers.allow(ENDPOINT)
+        breakers.record(ENDPOINT, POLICY, 0.1, healthy=False)
+    assert periods[:5] == [10.0, 20.0, 40.0, 80.0, 160.0]
+    assert periods[-1] == MAX_OPEN_SECONDS
+    assert max(periods) == MAX_OPEN_SECONDS
+
+
+def test_open_circuits_survive_a_restart(clock, tmp_path) -> None:
+    path = tmp_path / "circuits.json"
+    breakers = CircuitBreakers(str(path))
+    _trip(breakers)
+    clock.advance(4.0)
+    restored = CircuitBreakers(str(path))
+    assert restored.state(ENDPOINT) == ("open", 6.0)
+    assert restored.stats()[ENDPOINT]["trips"] == 1
+
+    clock.advance(6.0)
+    assert breakers.allow(ENDPOINT)
+    breakers.record(ENDPOINT, POLICY, 0.1, healthy=True)
+    assert json.loads(path.read_text())["circuits"] == {}
+    assert CircuitBreakers(str(path)).state(ENDPOINT) == ("closed", 0.0)
+
+
+def _saved(path, circuits, version: int = 1) -> None:
+    path.write_text(json.dumps({"version": version, "circuits": circuits}))
+
+
+def test_restore_caps_an_open_period_from_a_skewed_clock(clock, tmp_path) -> None:
+    path = tmp_path / "circuits.json"
+    _saved(path, {ENDPOINT: {"open_until": clock.wall + 1e9, "trips": 3}})
+    assert CircuitBreakers(str(path)).state(ENDPOINT) == ("open", MAX_OPEN_SECONDS)
+
+
+def test_restore_drops_stale_and_malformed_entries(clock, tmp_path) -> None:
+    path = tmp_path / "circuits.json"
+    future = clock.wall + 30.0
+    entries = {
+        "stale": {"open_until": clock.wall - STALE_SECONDS - 1, "trips": 1},
+        "expired": {"open_until": clock.wall - 5.0, "trips": 1},
+        "bool_trips": {"open_until": future, "trips": True},
+        "no_trips": {"open_until": future, "trips": 0},
+        "text_time": {"open_until": "soon", "trips": 1},
+        "not_finite": {"open_until": float("inf"), "trips": 1},
+        "not_an_object": [future, 1],
+        "kept": {"open_until": future, "trips": 2},
+    }
+    _saved(path, entries)
+    stats = CircuitBreakers(str(path)).stats()
+    assert set(stats) == {"expired", "kept"}
+    assert stats["kept"]["open_for"] == 30.0
+    assert stats["expired"]["state"] == "half_open"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "not json",
+        json.dumps({"version": 2, "circuits": {ENDPOINT: {"open_until": 0}}}),
+        json.dumps({"version": 1, "circuits": []}),
+        json.dumps([1, 2, 3]),
+        " " * (MAX_STATE_BYTES + 1),
+    ],
+)
+def test_restore_ignores_an_unreadable_state_file(clock, tmp_path, content) -> None:
+    path = tmp_path / "circuits.json"
+    path.write_text(content)
+    breakers = CircuitBreakers(str(path))
+    assert breakers.stats() == {}
+    assert breakers.allow(ENDPOINT)
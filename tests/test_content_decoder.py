@@ -0,0 +1,96 @@
+import gzip
+import zlib
+
+import pytest
+
+from llm_client import _ContentDecoder
+
+TEXT = b'{"choices": [{"message": {"content": "ok"}}]}' * 200
+
+
+def _decode(decoder: _ContentDecoder, body: bytes, step: int) -> bytes:
+    output = b"".join(
+        decoder.feed(body[start : start + step]) for start in range(0, len(body), step)
+    )
+    decoder.finish()
+    return output
+
+
+def _raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-15)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize("step", [1, 7, 4096])
+def test_gzip_body_is_inflated_in_pieces(step: int) -> None:
+    decoder = _ContentDecoder("gzip", len(TEXT))
+    assert _decode(decoder, gzip.compress(TEXT), step) == TEXT
+
+
+@pytest.mark.parametrize("step", [1, 4096])
+def test_gzip_body_that_inflates_past_the_limit_is_rejected(step: int) -> None:
+    bomb = gzip.compress(b"\0" * (8 * 1024 * 1024))
+    assert len(bomb) < 16 * 1024
+    decoder = _ContentDecoder("gzip", 1024 * 1024)
+    with pytest.raises(ValueError, match="exceeds the 1048576-byte limit"):
+        _decode(decoder, bomb, step)
+
+
+def test_body_exactly_at_the_limit_is_accepted() -> None:
+    decoder = _ContentDecoder("gzip", len(TEXT))
+    assert _decode(decoder, gzip.compress(TEXT), 4096) == TEXT
+    decoder = _ContentDecoder("gzip", len(TEXT) - 1)
+    with pytest.raises(ValueError, match="exceeds"):
+        _decode(decoder, gzip.compress(TEXT), 4096)
+
+
+@pytest.mark.parametrize("compress", [zlib.compress, _raw_deflate])
+@pytest.mark.parametrize("step", [1, 2, 4096])
+def test_deflate_is_accepted_zlib_wrapped_and_raw(compress, step: int) -> None:
+    decoder = _ContentDecoder("deflate", len(TEXT))
+    assert _decode(decoder, compress(TEXT), step) == TEXT
+
+
+@pytest.mark.parametrize(
+    ("encoding", "compress"),
+    [("gzip", gzip.compress), ("deflate", zlib.compress), ("deflate", _raw_deflate)],
+)
+def test_trailing_data_after_the_compressed_body_raises(encoding, compress) -> None:
+    decoder = _ContentDecoder(encoding, len(TEXT))
+    with pytest.raises(ValueError, match="data after its compressed body"):
+        _decode(decoder, compress(TEXT) + b"trailing", 4096)
+
+
+@pytest.mark.parametrize(
+    ("encoding", "compress"),
+    [("gzip", gzip.compress), ("deflate", zlib.compress), ("deflate", _raw_deflate)],
+)
+def test_body_cut_off_early_raises_eof_error_from_finish(encoding, compress) -> None:
+    body = compress(TEXT)
+    decoder = _ContentDecoder(encoding, len(TEXT))
+    decoder.feed(body[: len(body) // 2])
+    with pytest.raises(EOFError):
+        decoder.finish()
+
+
+def test_deflate_body_of_one_byte_raises_eof_error_from_finish() -> None:
+    decoder = _ContentDecoder("deflate", len(TEXT))
+    assert decoder.feed(zlib.compress(TEXT)[:1]) == b""
+    with pytest.raises(EOFError):
+        decoder.finish()
+
+
+def test_invalid_compressed_data_raises() -> None:
+    decoder = _ContentDecoder("gzip", len(TEXT))
+    with pytest.raises(ValueError, match="invalid compressed data"):
+        decoder.feed(b"not gzip at all")
+
+
+def test_decoder_follows_the_content_encoding_header() -> None:
+    assert _ContentDecoder.for_headers({}, 10) is None
+    assert _ContentDecoder.for_headers({"Content-Encoding": "identity"}, 10) is None
+    decoder = _ContentDecoder.for_headers({"Content-Encoding": "X-Gzip"}, 10)
+    assert decoder is not None and decoder.limit == 10
+    for unsupported in ("br", "gzip, deflate"):
+        with pytest.raises(ValueError, match="Unsupported LLM response encoding"):
+            _ContentDecoder.for_headers({"Content-Encoding": unsupported}, 10)
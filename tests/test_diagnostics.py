@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from diagnostics import MAX_DIAGNOSTICS, DiagnosticParser, parse_diagnostics
+
+SOURCE = "We recieve teh report.\nIt is 0.5 percent.\n"
+
+
+def _diagnostic(line: int, start: int, end: int, message: str) -> dict[str, object]:
+    return {
+        "line": line,
+        "start_column": start,
+        "end_column": end,
+        "category": "spelling",
+        "severity": "error",
+        "message": message,
+    }
+
+
+def _payload(diagnostics: list[dict[str, object]], **extra: object) -> str:
+    return json.dumps({"language": "en", **extra, "diagnostics": diagnostics})
+
+
+def _one_shot(payload: str, **options: object):
+    try:
+        return parse_diagnostics(payload, SOURCE, **options)
+    except ValueError as error:
+        return str(error)
+
+
+def _split(payload: str, cut: int, **options: object):
+    parser = DiagnosticParser(SOURCE, **options)
+    try:
+        parser.feed(payload[:cut])
+        parser.feed(payload[cut:])
+        return parser.finish(payload)
+    except ValueError as error:
+        return str(error)
+
+
+def _assert_every_split_agrees(payload: str, **options: object) -> None:
+    expected = _one_shot(payload, **options)
+    for cut in range(len(payload) + 1):
+        assert _split(payload, cut, **options) == expected, cut
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        _payload(
+            [_diagnostic(1, 4, 11, "Misspelled word"), _diagnostic(1, 12, 15, "Typo")],
+            confidence=0.85,
+        ),
+        _payload([], confidence=1.5e-3, weight=-12, scale=2e10),
+        '```json\n{"language": "en", "diagnostics": [{"line": 2, '
+        '"start_column": 7, "end_column": 10, "category": "style", '
+        '"severity": "hint", "message": "Spell \\u00e9 \\ud83d\\ude00"}]}\n```',
+    ],
+)
+def test_incremental_parse_matches_one_shot_at_every_split(payload: str) -> None:
+    assert not isinstance(_one_shot(payload), str)
+    _assert_every_split_agrees(payload)
+
+
+def test_number_split_after_decimal_point_or_exponent_marker() -> None:
+    head = '{"language":"en","confidence":'
+    for number in ("0.85", "1e-2", "1E+2", "-3.5e4"):
+        payload = head + number + ',"diagnostics":[]}'
+        expected = parse_diagnostics(payload, SOURCE)
+        for cut in range(len(head), len(head) + len(number) + 1):
+            assert _split(payload, cut) == expected, (number, cut)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        '{"language": "en", "language": "de", "diagnostics": []}',
+        '{"language": "en", "diagnostics": [{"line": 1, "line": 1, '
+        '"start_column": 1, "end_column": 3, "category": "spelling", '
+        '"severity": "error", "message": "Duplicate"}]}',
+        '{"language": "en", "confidence": NaN, "diagnostics": []}',
+        '{"language": "en", "confidence": Infinity, "diagnostics": []}',
+        '{"language": "en", "confidence": -Infinity, "diagnostics": []}',
+    ],
+)
+def test_duplicate_keys_and_non_finite_numbers_fail_at_every_split(
+    payload: str,
+) -> None:
+    assert isinstance(_one_shot(payload), str)
+    _assert_every_split_agrees(payload)
+
+
+def test_too_many_diagnostics_fail_as_soon_as_one_too_many_closes() -> None:
+    items = [_diagnostic(1, 4, 11, f"Issue {index}") for index in range(101)]
+    payload = _payload(items)
+    assert MAX_DIAGNOSTICS == 100
+    expected = _one_shot(payload)
+    assert "more than 100 diagnostics" in expected
+
+    parser = DiagnosticParser(SOURCE)
+    with pytest.raises(ValueError, match="more than 100 diagnostics"):
+        # The array is still open; the last item alone is one too many.
+        parser.feed(payload[: payload.rindex("]")])
+    with pytest.raises(ValueError, match="more than 100 diagnostics"):
+        parser.finish(payload)
+    for cut in range(0, len(payload) + 1, 97):
+        assert _split(payload, cut) == expected, cut
+
+
+def test_lenient_parse_rejects_the_items_beyond_the_limit_at_every_split() -> None:
+    items = [_diagnostic(1, 4, 11, f"Issue {index}") for index in range(101)]
+    payload = _payload(items)
+    expected = _one_shot(payload, lenient=True)
+    assert len(expected.diagnostics) == MAX_DIAGNOSTICS
+    assert [rejection.index for rejection in expected.rejected] == [100]
+    for cut in range(0, len(payload) + 1, 97):
+        assert _split(payload, cut, lenient=True) == expected, cut
+
+
+def test_oversize_input_fails_before_the_response_is_complete() -> None:
+    payload = _payload([_diagnostic(1, 4, 11, "x" * 200)])
+    parser = DiagnosticParser(SOURCE, max_chars=100)
+    with pytest.raises(ValueError, match="exceeds 100 characters"):
+        parser.feed(payload[:150])
+    with pytest.raises(ValueError, match="exceeds 100 characters"):
+        parser.feed(payload[150:])
+    with pytest.raises(ValueError, match="exceeds 100 characters"):
+        parser.finish(payload)
+    for cut in range(len(payload) + 1):
+        assert _split(payload, cut, max_chars=100) == (
+            "The model response exceeds 100 characters"
+        ), cut
+
+
+def test_oversize_input_fails_in_one_shot() -> None:
+    payload = _payload([]) + " " * (2 * 1024 * 1024)
+    with pytest.raises(ValueError, match="exceeds"):
+        parse_diagnostics(payload, SOURCE)
@@ -0,0 +1,27 @@
+from load_balancer import EJECTION_THRESHOLD, MAX_EJECTION_SECONDS, LoadBalancer
+
+ENDPOINT = "https://standby.example/v1/chat/completions"
+
+
+def _fail(balancer: LoadBalancer) -> None:
+    balancer.end(ENDPOINT, balancer.begin(ENDPOINT), healthy=False)
+
+
+def test_repeated_failures_eject_the_endpoint() -> None:
+    balancer = LoadBalancer()
+    for _failure in range(EJECTION_THRESHOLD):
+        _fail(balancer)
+    assert 0 < balancer.stats()[ENDPOINT]["ejected_for"] <= 10.0
+
+
+def test_endpoint_that_never_recovers_stays_ejected_for_the_cap() -> None:
+    balancer = LoadBalancer()
+    for _failure in range(EJECTION_THRESHOLD):
+        _fail(balancer)
+    with balancer._lock:
+        state = balancer._states[ENDPOINT]
+        state.ejections = 1100
+        state.ejected_until = 0.0
+    _fail(balancer)
+    ejected_for = balancer.stats()[ENDPOINT]["ejected_for"]
+    assert MAX_EJECTION_SECONDS - 1.0 < ejected_for <= MAX_EJECTION_SECONDS
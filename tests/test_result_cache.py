@@ -0,0 +1,124 @@
+import json
+import os
+
+import pytest
+
+from diagnostics import CompileResult, Diagnostic
+from result_cache import ParagraphCache, ResultCache, paragraph_key, request_key
+
+SOURCE = "We recieve teh report.\nIt is fine.\n"
+RESULT = CompileResult(
+    "en",
+    (
+        Diagnostic(1, 4, 11, "spelling", "error", "Misspelled", original="recieve"),
+        Diagnostic(2, 7, 11, "style", "hint", "Vague"),
+    ),
+    '{"raw": true}',
+)
+KEY = request_key("https://llm.example/v1/chat/completions", b'{"input": 1}')
+
+
+def _entry(cache: ResultCache, key: str = KEY) -> str:
+    return os.path.join(cache.directory, key[:2], f"{key}.json")
+
+
+def test_stored_result_is_returned_for_its_source(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    cache.put(KEY, RESULT)
+    assert cache.get(KEY, SOURCE) == RESULT
+    restarted = ResultCache(str(tmp_path))
+    assert restarted.get(KEY, SOURCE) == RESULT
+    assert restarted.stats()["entries"] == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["stores"] == 1
+
+
+def test_keys_cover_the_endpoint_and_the_exact_body() -> None:
+    assert KEY != request_key("https://other.example/v1", b'{"input": 1}')
+    assert KEY != request_key("https://llm.example/v1/chat/completions", b'{"input":1}')
+    assert paragraph_key("style", "Text.") != paragraph_key("style2", "Text.")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"not json",
+        b"\xff\xfe",
+        b"[1, 2]",
+        json.dumps({"version": 2, "language": "en", "diagnostics": []}).encode(),
+        json.dumps(
+            {"version": 1, "language": "en", "diagnostics": [], "raw_response": 3}
+        ).encode(),
+        json.dumps(
+            {"version": 1, "language": "en", "diagnostics": [{"line": 1}]}
+        ).encode(),
+    ],
+)
+def test_corrupt_entry_is_a_miss(tmp_path, content: bytes) -> None:
+    cache = ResultCache(str(tmp_path))
+    cache.put(KEY, RESULT)
+    with open(_entry(cache), "wb") as entry:
+        entry.write(content)
+    assert cache.get(KEY, SOURCE) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_entry_stored_for_a_different_source_is_a_miss(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path))
+    cache.put(KEY, RESULT)
+    assert cache.get(KEY, "We recieve teh report.") is None
+    assert cache.get(KEY, "Short.\nIt.\n") is None
+    assert cache.get("0" * 64, SOURCE) is None
+    assert cache.stats()["misses"] == 3
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_limit(
+    tmp_path,
+) -> None:
+    keys = [request_key("endpoint", str(index).encode()) for index in range(3)]
+    cache = ResultCache(str(tmp_path))
+    cache.put(keys[0], RESULT)
+    size = cache.stats()["bytes"]
+    cache = ResultCache(str(tmp_path), max_bytes=2 * size)
+    cache.put(keys[1], RESULT)
+    assert cache.get(keys[0], SOURCE) == RESULT
+    cache.put(keys[2], RESULT)
+    assert not os.path.exists(_entry(cache, keys[1]))
+    assert cache.get(keys[1], SOURCE) is None
+    assert cache.get(keys[0], SOURCE) == RESULT
+    assert cache.get(keys[2], SOURCE) == RESULT
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2 and stats["bytes"] == 2 * size
+
+
+def test_entry_larger_than_the_cache_is_not_stored(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path), max_bytes=64)
+    cache.put(KEY, RESULT)
+    assert not os.path.exists(_entry(cache))
+    assert cache.stats()["stores"] == 0
+
+
+@pytest.mark.parametrize("cache_type", [ResultCache, ParagraphCache])
+@pytest.mark.parametrize("limit", [0, -1, True, 1.5])
+def test_cache_limits_must_be_positive_integers(cache_type, limit) -> None:
+    name = "max_bytes" if cache_type is ResultCache else "max_entries"
+    with pytest.raises(ValueError, match=name):
+        cache_type(**{name: limit})
+
+
+def test_paragraph_cache_keeps_the_most_recently_used_entries() -> None:
+    cache = ParagraphCache(max_entries=2)
+    first, second, third = (
+        CompileResult(language, ()) for language in ("en", "de", "fr")
+    )
+    cache.put("first", first)
+    cache.put("second", second)
+    assert cache.get("first") is first
+    cache.put("third", third)
+    assert cache.get("second") is None
+    assert cache.get("first") is first and cache.get("third") is third
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+    cache.clear()
+    assert cache.get("first") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config_manager import ConfigManager
+from llm_async import AsyncLLMClient
+from llm_client import AnalysisCancelled, CancellationToken, LLMClient
+from retry import FAILURE_KINDS, RetryPolicy
+from styles import StyleManager
+
+_REPLY = json.dumps(
+    {
+        "choices": [
+            {
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": json.dumps({"language": "en", "diagnostics": []}),
+                },
+            }
+        ]
+    }
+).encode("utf-8")
+
+
+class _ScriptedEndpoint(ThreadingHTTPServer):
+    """Answer each request with the next status of a script, then with 200."""
+
+    daemon_threads = True
+
+    def __init__(self, statuses: list[int]) -> None:
+        super().__init__(("127.0.0.1", 0), _ScriptedHandler)
+        self.statuses = list(statuses)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            status = server.statuses.pop(0) if server.statuses else 200
+        body = _REPLY if status == 200 else b'{"error": {"message": "busy"}}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    servers: list[_ScriptedEndpoint] = []
+
+    def start(statuses: list[int]) -> _ScriptedEndpoint:
+        server = _ScriptedEndpoint(statuses)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _config(tmp_path, base_url: str, **retry: object) -> ConfigManager:
+    cfg = ConfigManager(str(tmp_path / "config.json"))
+    llm = cfg.get("llm")
+    cfg.update(
+        {
+            "cache": {**cfg.get("cache"), "enabled": False, "paragraphs": False},
+            "llm": {**llm, "base_url": base_url, "api_key": "test", "retry": retry},
+        }
+    )
+    return cfg
+
+
+def test_allows_counts_each_failure_kind_against_its_own_limit() -> None:
+    policy = RetryPolicy(connection=2, server=1, throttled=0, truncated=3)
+    assert policy.allows("connection", Counter(connection=1, server=5))
+    assert not policy.allows("connection", Counter(connection=2))
+    assert policy.allows("server", Counter(connection=2))
+    assert not policy.allows("server", Counter(server=1))
+    assert not policy.allows("throttled", Counter())
+    assert policy.allows("truncated", {"truncated": 2})
+    assert not policy.allows(None, Counter())
+    assert not policy.allows("refused", Counter())
+    assert set(FAILURE_KINDS) == {"connection", "server", "throttled", "truncated"}
+
+
+def test_next_delay_stays_within_its_bounds() -> None:
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    rng = random.Random(7)
+    previous = 0.0
+    for _attempt in range(200):
+        delay = policy.next_delay(previous, rng)
+        assert policy.base_delay <= delay <= policy.max_delay
+        assert delay <= max(policy.base_delay, previous) * 3
+        previous = delay
+    assert max(policy.next_delay(100.0, rng) for _draw in range(50)) == 4.0
+
+
+def test_sync_retry_recovers_within_the_limit(tmp_path, endpoint) -> None:
+    server = endpoint([503, 502])
+    cfg = _config(tmp_path, server.base_url, server=2, base_delay_seconds=0.01)
+    client = LLMClient(cfg, StyleManager(cfg))
+    try:
+        result = client.run_analysis(client.prepare_analysis("Python", "Text."))
+    finally:
+        client.close()
+    assert result.language == "en"
+    assert server.requests == 3
+    assert client.retry_stats.stats()["recovered"] == 1
+
+
+def test_sync_retry_stops_at_the_limit(tmp_path, endpoint) -> None:
+    server = endpoint([503, 503, 503])
+    cfg = _config(tmp_path, server.base_url, server=1, base_delay_seconds=0.01)
+    client = LLMClient(cfg, StyleManager(cfg))
+    try:
+        with pytest.raises(RuntimeError):
+            client.run_analysis(client.prepare_analysis("Python", "Text."))
+    finally:
+        client.close()
+    assert server.requests == 2
+    assert client.retry_stats.stats()["exhausted"] == 1
+
+
+def test_async_retry_recovers_within_the_limit(tmp_path, endpoint) -> None:
+    server = endpoint([503, 504])
+    cfg = _config(tmp_path, server.base_url, server=2, base_delay_seconds=0.01)
+
+    async def run():
+        async with AsyncLLMClient(cfg, StyleManager(cfg)) as client:
+            request = client.prepare_analysis("Python", "Text.")
+            return client.client, await client.run_analysis(request)
+
+    client, result = asyncio.run(run())
+    assert result.language == "en"
+    assert server.requests == 3
+    assert client.retry_stats.stats()["recovered"] == 1
+
+
+def test_async_retry_stops_at_the_limit(tmp_path, endpoint) -> None:
+    server = endpoint([503, 503, 503])
+    cfg = _config(tmp_path, server.base_url, server=1, base_delay_seconds=0.01)
+
+    async def run() -> None:
+        async with AsyncLLMClient(cfg, StyleManager(cfg)) as client:
+            await client.run_analysis(client.prepare_analysis("Python", "Text."))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert server.requests == 2
+
+
+def test_sync_backoff_is_cut_short_by_cancellation(tmp_path, endpoint) -> None:
+    server = endpoint([503])
+    cfg = _config(
+        tmp_path,
+        server.base_url,
+        server=1,
+        base_delay_seconds=10.0,
+        max_delay_seconds=10.0,
+    )
+    client = LLMClient(cfg, StyleManager(cfg))
+    token = CancellationToken()
+    request = client.prepare_analysis("Python", "Text.", cancel_token=token)
+    timer = threading.Timer(0.2, token.cancel)
+    timer.start()
+    started = time.monotonic()
+    try:
+        with pytest.raises(AnalysisCancelled):
+            client.run_analysis(request)
+    finally:
+        timer.cancel()
+        client.close()
+    assert time.monotonic() - started < 5.0
+    assert server.requests == 1
+
+
+def test_async_backoff_sleeps_out_its_delay_with_a_cancel_token() -> None:
+    started = time.monotonic()
+    asyncio.run(AsyncLLMClient._backoff(0.05, CancellationToken()))
+    assert time.monotonic() - started >= 0.04
+
+
+def test_async_backoff_is_cut_short_by_cancellation() -> None:
+    token = CancellationToken()
+    timer = threading.Timer(0.1, token.cancel)
+    timer.start()
+    started = time.monotonic()
+    try:
+        with pytest.raises(AnalysisCancelled):
+            asyncio.run(AsyncLLMClient._backoff(10.0, token))
+    finally:
+        timer.cancel()
+    assert time.monotonic() - started < 5.0
@@ -0,0 +1,106 @@
+"""Tokenizer-free token estimates and completion budgets for analyses."""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+
+# Average tokens per character by script, rounded up from the BPE tokenizers in
+# common use so that estimates err on the side of smaller requests. English
+# prose runs about four characters per token; code and markup run denser.
+_ASCII_TOKENS = 0.3
+_CJK_TOKENS = 1.3
+_HANGUL_TOKENS = 1.5
+# Cyrillic, Greek, accented Latin, Arabic, Indic, Thai, and the like.
+_OTHER_TOKENS = 0.75
+# Emoji and other characters outside the Basic Multilingual Plane.
+_ASTRAL_TOKENS = 2.0
+_CJK = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]+"
+)
+_HANGUL = re.compile(r"[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]+")
+_ASTRAL = re.compile(r"[\U00010000-\U0010ffff]+")
+
+DEFAULT_CONTEXT_TOKENS = 32_768
+DEFAULT_MAX_COMPLETION_TOKENS = 4_096
+DEFAULT_DIAGNOSTICS_PER_1K_TOKENS = 10.0
+DEFAULT_TOKENS_PER_DIAGNOSTIC = 70
+# The JSON object around one document's diagnostics: language, keys, brackets.
+RESULT_ENVELOPE_TOKENS = 30
+
+
+def _run_length(pattern: re.Pattern[str], text: str) -> int:
+    return sum(map(len, pattern.findall(text)))
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservatively estimate prompt tokens without a tokenizer.
+
+    Characters are weighted by script, since one token covers several Latin
+    letters but usually at most one Han character or Hangul syllable.
+    """
+
+    if not text:
+        return 0
+    if text.isascii():
+        return math.ceil(len(text) * _ASCII_TOKENS)
+    ascii_count = len(text.encode("ascii", "ignore"))
+    cjk = _run_length(_CJK, text)
+    hangul = _run_length(_HANGUL, text)
+    astral = _run_length(_ASTRAL, text)
+    other = len(text) - ascii_count - cjk - hangul - astral
+    return math.ceil(
+        ascii_count * _ASCII_TOKENS
+        + cjk * _CJK_TOKENS
+        + hangul * _HANGUL_TOKENS
+        + other * _OTHER_TOKENS
+        + astral * _ASTRAL_TOKENS
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class TokenBudget:
+    """What one request may hold and how long its response is expected to be.
+
+    Text is expected to yield ``diagnostics_per_1k_tokens`` findings per
+    thousand input tokens at ``tokens_per_diagnostic`` each. A request must
+    fit the model's ``max_completion_tokens`` output limit and, prompt
+    included, its ``context_tokens`` window.
+    """
+
+    context_tokens: int = DEFAULT_CONTEXT_TOKENS
+    max_completion_tokens: int = DEFAULT_MAX_COMPLETION_TOKENS
+    diagnostics_per_1k_tokens: float = DEFAULT_DIAGNOSTICS_PER_1K_TOKENS
+    tokens_per_diagnostic: int = DEFAULT_TOKENS_PER_DIAGNOSTIC
+
+    def completion_tokens(self, input_tokens: int, documents: int = 1) -> int:
+        """Predict the completion tokens for ``input_tokens`` of checked text."""
+
+        expected = math.ceil(input_tokens * self.diagnostics_per_1k_tokens / 1000)
+        return (
+            RESULT_ENVELOPE_TOKENS * max(1, documents)
+            + expected * self.tokens_per_diagnostic
+        )
+
+    def fits(self, prompt_tokens: int, completion_tokens: int) -> bool:
+        return (
+            completion_tokens <= self.max_completion_tokens
+            and prompt_tokens + completion_tokens <= self.context_tokens
+        )
+
+    def max_input_tokens(self, overhead_tokens: int) -> int:
+        """Return the most text one request can carry next to its instructions.
+
+        ``overhead_tokens`` counts the system prompt and guidance. The result
+        is 0 when not even a short text would fit.
+        """
+
+        per_token = self.diagnostics_per_1k_tokens * self.tokens_per_diagnostic / 1000
+        # One extra diagnostic absorbs the rounding up in completion_tokens().
+        reserved = RESULT_ENVELOPE_TOKENS + self.tokens_per_diagnostic
+        by_output = (self.max_completion_tokens - reserved) / per_token
+        by_context = (self.context_tokens - overhead_tokens - reserved) / (
+            1 + per_token
+        )
+        return max(0, math.floor(min(by_output, by_context)))
@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import difflib
 import os
 import queue
 import threading
+import time
 import tkinter as tk
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from tkinter import filedialog, messagebox, ttk
 from typing import Optional
 
+from chunking import Chunk, remap_diagnostic
+from circuit_breaker import CIRCUIT_PATH, CircuitBreakers
 from config_manager import ConfigManager
-from diagnostics import CompileResult, Diagnostic, render_diagnostics
+from diagnostics import (
+    CompileResult,
+    Diagnostic,
+    Rejection,
+    SourceIndex,
+    canonical_diagnostics,
+    rejection_line,
+    render_diagnostics,
+)
 from file_ops import TextDocument, read_document, write_document, write_text_utf8
 from i18n import (
     get_language,
@@ -21,11 +33,27 @@ from i18n import (
     t,
     unregister_listener,
 )
-from llm_client import AnalysisRequest, LLMClient, RequestSnapshot
+from llm_client import (
+    AnalysisCancelled,
+    AnalysisRequest,
+    CancellationToken,
+    ChunkedAnalysisRequest,
+    LLMClient,
+    RequestSnapshot,
+)
+from result_cache import ParagraphCache, ResultCache
 from styles import BUILTIN_STYLES, StyleManager
 
 APP_NAME = "TypoCompiler"
 WORKER_POLL_MS = 40
+# Re-render the compiler output once typing pauses for this long.
+OUTPUT_REFRESH_MS = 300
+# Separate edited line ranges remembered for checking as you type; one more
+# folds them all into a single range spanning them.
+AUTO_CHECK_MAX_RANGES = 64
+# Lines searched in each direction for the blank line that ends a paragraph.
+AUTO_CHECK_MAX_LINES = 200
+CIRCUIT_POLL_SECONDS = 1.0
 
 
 @dataclass(frozen=True, slots=True)
@@ -72,7 +100,14 @@ class TypoCompilerApp(tk.Tk):
                 pass
 
         self.styles = StyleManager(self.cfg)
-        self.llm = LLMClient(self.cfg, self.styles)
+        cache_megabytes = self.cfg.get_nested("cache", "max_megabytes", default=64)
+        self.llm = LLMClient(
+            self.cfg,
+            self.styles,
+            cache=ResultCache(max_bytes=cache_megabytes * 1024 * 1024),
+            paragraph_cache=ParagraphCache(),
+            circuits=CircuitBreakers(CIRCUIT_PATH),
+        )
         self.current_file: Optional[str] = None
         self.current_document = TextDocument("")
         self.font_size = self._normalize_font_size(self.cfg.get("font_size", 12))
@@ -89,15 +124,41 @@ class TypoCompilerApp(tk.Tk):
         self.default_style_var = tk.StringVar(value=default_style)
         self.status_var = tk.StringVar()
         self.position_var = tk.StringVar()
+        self.circuit_var = tk.StringVar()
+        self._circuit_checked = 0.0
         self._generation = 0
+        self._active_request: AnalysisRequest | ChunkedAnalysisRequest | None = None
         self._test_generation = 0
         self._running = False
         self._closing = False
         self._worker_results: queue.Queue[_WorkerEvent] = queue.Queue()
         self._worker_poll_id: str | None = None
         self._last_result: CompileResult | None = None
-        self._last_source = ""
+        self._last_source = SourceIndex("")
         self._result_stale = False
+        self._streamed: list[Diagnostic] = []
+        self._edited_during_run = False
+        # Text each diagnostic of the last result covered when it was analyzed,
+        # and where it is now, for those whose span has not been edited since.
+        self._anchors: dict[int, str] = {}
+        self._live: dict[int, Diagnostic] = {}
+        self._source_outdated = False
+        self._track_id: str | None = None
+        self._output_refresh_id: str | None = None
+        # Checking as you type: marks at the first and last line of each range
+        # edited since its paragraphs were last checked, the pending pause, and
+        # the check under way.
+        self.auto_check_var = tk.BooleanVar(
+            value=self.cfg.get_nested("auto_check", "enabled", default=False) is True
+        )
+        self._dirty_ranges: list[tuple[str, str]] = []
+        self._mark_serial = 0
+        # Rejections of the last full analysis and of each paragraph checked
+        # since, each on a mark at the line it names, if any.
+        self._rejected: list[tuple[str | None, Rejection]] = []
+        self._auto_generation = 0
+        self._auto_check_id: str | None = None
+        self._auto_token: CancellationToken | None = None
 
         self.create_widgets()
         self.bind_shortcuts()
@@ -176,6 +237,7 @@ class TypoCompilerApp(tk.Tk):
             tabs=("4c",),
             takefocus=True,
         )
+        self._watch_edits()
         input_y = ttk.Scrollbar(
             self.input_frame, orient="vertical", command=self.text.yview
         )
@@ -215,6 +277,7 @@ class TypoCompilerApp(tk.Tk):
         issues_scroll.grid(row=0, column=1, sticky="ns")
         self.issues.bind("<Double-1>", self.jump_to_selected_diagnostic)
         self.issues.bind("<Return>", self.jump_to_selected_diagnostic)
+        self.issues.tag_configure("edited", foreground="#8a8a8a")
         results.add(self.issues_frame, weight=2)
 
         self.output_frame = ttk.LabelFrame(
@@ -251,6 +314,8 @@ class TypoCompilerApp(tk.Tk):
         ttk.Separator(status, orient="vertical").pack(side="left", fill="y", padx=8)
         self.position = ttk.Label(status, textvariable=self.position_var, anchor="e")
         self.position.pack(side="right")
+        self.circuit = ttk.Label(status, textvariable=self.circuit_var, anchor="e")
+        self.circuit.pack(side="right", padx=(0, 12))
 
         for name, colors in {
             "diagnostic_error": ("#7f1d1d", "#ffffff"),
@@ -372,6 +437,11 @@ class TypoCompilerApp(tk.Tk):
         run_menu.add_command(
             label=t("run.cancel"), accelerator="Esc", command=self.cancel_analysis
         )
+        run_menu.add_checkbutton(
+            label=t("run.auto_check"),
+            variable=self.auto_check_var,
+            command=self.toggle_auto_check,
+        )
         run_menu.add_separator()
         run_menu.add_command(
             label=t("run.copy"),
@@ -502,6 +572,7 @@ class TypoCompilerApp(tk.Tk):
             return
         if self._last_result is not None:
             self._render_last_result()
+        self._schedule_auto_check()
 
     def on_styles_changed(self) -> None:
         self.styles.reload()
@@ -530,8 +601,25 @@ class TypoCompilerApp(tk.Tk):
         if self._closing:
             return
         self._drain_worker_results()
+        if time.monotonic() - self._circuit_checked >= CIRCUIT_POLL_SECONDS:
+            self._refresh_circuit_status()
         self._schedule_worker_poll()
 
+    def _refresh_circuit_status(self) -> None:
+        self._circuit_checked = time.monotonic()
+        states = self.llm.circuit_states()
+        paused = [wait for state, wait in states if state == "open"]
+        if states and len(paused) == len(states):
+            text = t("status.circuit_open", seconds=max(1, round(min(paused))))
+        elif any(state == "half_open" for state, _wait in states):
+            text = t("status.circuit_probing")
+        elif paused:
+            text = t("status.circuit_partial", count=len(paused), total=len(states))
+        else:
+            text = ""
+        if self.circuit_var.get() != text:
+            self.circuit_var.set(text)
+
     def _drain_worker_results(self) -> None:
         for _item in range(100):
             try:
@@ -549,6 +637,18 @@ class TypoCompilerApp(tk.Tk):
             ok, message = event.payload
             self._finish_test_llm(bool(ok), str(message))
             return
+        if event.kind == "auto_check":
+            if event.generation != self._auto_generation or self._running:
+                return
+            first_line, text, result = event.payload
+            self._merge_auto_check(first_line, text, result)
+            return
+        if event.kind == "diagnostic":
+            if event.generation != self._generation or not self._running:
+                return
+            (diagnostic,) = event.payload
+            self._show_streamed_diagnostic(diagnostic)
+            return
         if event.kind == "analysis":
             if event.generation != self._generation:
                 return
@@ -640,12 +740,440 @@ class TypoCompilerApp(tk.Tk):
         self.dirty = True
         self.update_title()
         self.text.edit_modified(False)
+        if self._running:
+            self._edited_during_run = True
         if self._last_result is not None and not self._result_stale:
-            self._result_stale = True
-            self._clear_highlights()
-            self.status_var.set(t("status.results_stale"))
+            self._source_outdated = True
+            if self._track_id is None:
+                self._track_id = self.after_idle(self._track_diagnostics)
+        if self.auto_check_var.get():
+            self._schedule_auto_check()
         self.update_cursor_status()
 
+    def _track_diagnostics(self) -> None:
+        """Follow the last result through edits, dropping diagnostics edited away.
+
+        Marks carry each span along with inserts and deletes elsewhere; a span
+        whose text differs from what was analyzed has been edited itself.
+        """
+
+        self._track_id = None
+        if self._closing or self._last_result is None or self._result_stale:
+            return
+        edited = []
+        for index, expected in self._anchors.items():
+            start = self.text.index(f"diagnostic_start_{index}")
+            end = self.text.index(f"diagnostic_end_{index}")
+            if self.text.get(start, end) != expected or (not expected and start != end):
+                edited.append(index)
+                continue
+            line, column = map(int, start.split("."))
+            end_column = int(end.split(".")[1])
+            diagnostic = self._live[index]
+            if (line, column + 1, end_column + 1) != (
+                diagnostic.line,
+                diagnostic.start_column,
+                diagnostic.end_column,
+            ):
+                self._live[index] = replace(
+                    diagnostic,
+                    line=line,
+                    start_column=column + 1,
+                    end_column=end_column + 1,
+                )
+                if line != diagnostic.line and not self._streamed:
+                    self.issues.set(str(index), "line", line)
+        for index in edited:
+            del self._anchors[index]
+            del self._live[index]
+            self.text.mark_unset(f"diagnostic_start_{index}", f"diagnostic_end_{index}")
+        if edited and not self._streamed:
+            for index in edited:
+                self.issues.item(str(index), tags=("edited",))
+            # Overlapping spans share tags, so highlight the remaining ones anew.
+            self._clear_highlights()
+            for diagnostic in self._live.values():
+                self._highlight_diagnostic(diagnostic)
+            if not self._running:
+                self.status_var.set(self._result_status(self._last_result))
+        if self._output_refresh_id is not None:
+            self.after_cancel(self._output_refresh_id)
+        self._output_refresh_id = self.after(OUTPUT_REFRESH_MS, self._refresh_output)
+
+    def _catch_up_tracking(self) -> None:
+        if self._track_id is not None:
+            # Catch up with edits that were not tracked yet.
+            self.after_cancel(self._track_id)
+            self._track_diagnostics()
+
+    def _refresh_output(self) -> None:
+        self._output_refresh_id = None
+        if not self._closing:
+            self._render_last_result()
+
+    def _anchor_diagnostics(self) -> None:
+        """Pin each diagnostic of a result that matches the text to marks."""
+
+        self._forget_anchors()
+        if self._last_result is None or self._result_stale:
+            return
+        for index, diagnostic in enumerate(self._last_result.diagnostics):
+            start = f"diagnostic_start_{index}"
+            end = f"diagnostic_end_{index}"
+            # Text typed at either edge stays outside the span.
+            self.text.mark_set(
+                start, f"{diagnostic.line}.{diagnostic.start_column - 1}"
+            )
+            self.text.mark_gravity(start, "right")
+            self.text.mark_set(end, f"{diagnostic.line}.{diagnostic.end_column - 1}")
+            self.text.mark_gravity(end, "left")
+            self._anchors[index] = self._last_source.line(diagnostic.line)[
+                diagnostic.start_column - 1 : diagnostic.end_column - 1
+            ]
+            self._live[index] = diagnostic
+
+    def _forget_anchors(self) -> None:
+        for index in self._anchors:
+            self.text.mark_unset(f"diagnostic_start_{index}", f"diagnostic_end_{index}")
+        self._anchors = {}
+        self._live = {}
+        self._source_outdated = False
+
+    def toggle_auto_check(self) -> None:
+        enabled = bool(self.auto_check_var.get())
+        try:
+            self.cfg.set_nested("auto_check", "enabled", enabled)
+        except (OSError, UnicodeError, TypeError, ValueError) as error:
+            self.auto_check_var.set(not enabled)
+            messagebox.showerror(APP_NAME, t("msg.config_failed", err=str(error)))
+            return
+        if not enabled:
+            self._cancel_auto_check()
+            self._forget_dirty()
+
+    def _watch_edits(self) -> None:
+        """Report the lines of every insert, delete, and replace in the editor.
+
+        The text widget's command is renamed behind a Tcl procedure of the same
+        name, so typed, pasted, and undone edits all pass through it. Errors stay
+        Tcl errors for the bindings that catch them.
+        """
+
+        widget = str(self.text)
+        edits = f"{widget}_edits"
+        callback = self.register(self._on_text_edit)
+        self.tk.call("rename", widget, edits)
+        self.tk.call(
+            "proc",
+            widget,
+            "operation args",
+            f"""
+            if {{$operation ni {{insert delete replace}}
+                || [catch {{{edits} index [lindex $args 0]}} start]}} {{
+                return [{edits} $operation {{*}}$args]
+            }}
+            set result [{edits} $operation {{*}}$args]
+            {callback} $operation $start {{*}}$args
+            return $result
+            """,
+        )
+
+    def _on_text_edit(self, operation: str, start: str, *args: str) -> None:
+        """Mark the lines an edit starting at ``start`` left behind as dirty."""
+
+        if not self.auto_check_var.get():
+            return
+        bottom = self._mark_line("end-1c")
+        first = min(int(start.split(".")[0]), bottom)
+        if operation == "insert":
+            last = first + sum(text.count("\n") for text in args[1::2])
+        elif operation == "replace":
+            last = first + sum(text.count("\n") for text in args[2::2])
+        elif len(args) > 2:
+            # Several ranges deleted at once; later ones joined lines further on.
+            last = bottom
+        else:
+            last = first
+        self._mark_dirty(first, min(last, bottom))
+
+    def _mark_dirty(self, first: int, last: int) -> None:
+        """Remember lines ``first`` to ``last`` as edited since last checked."""
+
+        for start, end in self._dirty_ranges:
+            low, high = self._mark_line(start), self._mark_line(end)
+            if low <= last + 1 and first <= high + 1:
+                if first < low:
+                    self.text.mark_set(start, f"{first}.0")
+                if last > high:
+                    self.text.mark_set(end, f"{last}.0")
+                return
+        if len(self._dirty_ranges) >= AUTO_CHECK_MAX_RANGES:
+            lines = [
+                self._mark_line(name) for pair in self._dirty_ranges for name in pair
+            ]
+            first, last = min(first, *lines), max(last, *lines)
+            self._forget_dirty()
+        self._dirty_ranges.append(
+            (self._line_mark("auto_check", first), self._line_mark("auto_check", last))
+        )
+
+    def _line_mark(self, prefix: str, line: int) -> str:
+        """Set a new mark that stays at the start of ``line`` through edits."""
+
+        self._mark_serial += 1
+        name = f"{prefix}_{self._mark_serial}"
+        self.text.mark_set(name, f"{line}.0")
+        self.text.mark_gravity(name, "left")
+        return name
+
+    def _mark_line(self, name: str) -> int:
+        return int(self.text.index(name).split(".")[0])
+
+    def _forget_dirty(self) -> None:
+        for pair in self._dirty_ranges:
+            self.text.mark_unset(*pair)
+        self._dirty_ranges = []
+
+    def _forget_rejected(self) -> None:
+        names = [name for name, _rejection in self._rejected if name is not None]
+        if names:
+            self.text.mark_unset(*names)
+        self._rejected = []
+
+    def _pin_rejected(self, result: CompileResult) -> None:
+        """Pin a full analysis's rejections to the lines they name.
+
+        A stale result's lines are those of the text it analyzed, so its
+        rejections wait for ``_reanchor_stale_result``.
+        """
+
+        self._forget_rejected()
+        for rejection in result.rejected:
+            line = None
+            if not self._result_stale:
+                line = rejection_line(rejection, self._last_source)
+            name = None if line is None else self._line_mark("rejected", line)
+            self._rejected.append((name, rejection))
+
+    def _schedule_auto_check(self) -> None:
+        """Wait for typing to pause again, pre-empting any check under way."""
+
+        self._cancel_auto_check()
+        if self._closing or not self._dirty_ranges or not self.auto_check_var.get():
+            return
+        delay_ms = self.cfg.get_nested("auto_check", "delay_ms", default=800)
+        self._auto_check_id = self.after(delay_ms, self._start_auto_check)
+
+    def _cancel_auto_check(self) -> None:
+        if self._auto_check_id is not None:
+            self.after_cancel(self._auto_check_id)
+            self._auto_check_id = None
+        if self._auto_token is not None:
+            self._auto_token.cancel()
+            self._auto_token = None
+        self._auto_generation += 1
+
+    def _paragraph_bounds(self, line: int, top: int) -> tuple[int, int] | None:
+        """Return the first and last line of the paragraph around ``line``."""
+
+        def blank(number: int) -> bool:
+            return not self.text.get(f"{number}.0", f"{number}.end").strip()
+
+        if blank(line):
+            return None
+        bottom = int(self.text.index("end-1c").split(".")[0])
+        first = last = line
+        while first > max(top, line - AUTO_CHECK_MAX_LINES) and not blank(first - 1):
+            first -= 1
+        while last < min(bottom, line + AUTO_CHECK_MAX_LINES) and not blank(last + 1):
+            last += 1
+        return first, last
+
+    def _dirty_paragraphs(self) -> list[tuple[int, int]]:
+        """Widen the edited ranges to paragraphs, leaving one range on each."""
+
+        ranges = sorted(
+            (self._mark_line(start), self._mark_line(end))
+            for start, end in self._dirty_ranges
+        )
+        self._forget_dirty()
+        paragraphs: list[tuple[int, int]] = []
+        for low, high in ranges:
+            line = max(low, paragraphs[-1][1] + 1) if paragraphs else low
+            while line <= high:
+                top = paragraphs[-1][1] + 1 if paragraphs else 1
+                bounds = self._paragraph_bounds(line, top)
+                if bounds is None:
+                    line += 1
+                    continue
+                paragraphs.append(bounds)
+                line = bounds[1] + 1
+        for first, last in paragraphs:
+            self._dirty_ranges.append(
+                (
+                    self._line_mark("auto_check", first),
+                    self._line_mark("auto_check", last),
+                )
+            )
+        return paragraphs
+
+    def _start_auto_check(self) -> None:
+        """Check the edited paragraphs one at a time on a background thread.
+
+        A single worker keeps checking as you type to one request at a time;
+        the next keystroke or an explicit run cancels it.
+        """
+
+        self._auto_check_id = None
+        if self._closing or self._running or not self._dirty_ranges:
+            return
+        style = self.default_style_var.get()
+        if not style:
+            return
+        token = CancellationToken()
+        parts = []
+        for first, last in self._dirty_paragraphs():
+            text = self.text.get(f"{first}.0", f"{last}.end")
+            try:
+                request = self.llm.prepare_document_analysis(
+                    style, text, cancel_token=token
+                )
+            except (TypeError, ValueError):
+                # Settings that cannot make a request are reported by a run.
+                return
+            parts.append((first, request))
+        if not parts:
+            return
+        self._auto_token = token
+        threading.Thread(
+            target=self._do_auto_check,
+            args=(self._auto_generation, parts),
+            daemon=True,
+        ).start()
+
+    def _do_auto_check(
+        self,
+        generation: int,
+        parts: list[tuple[int, AnalysisRequest | ChunkedAnalysisRequest]],
+    ) -> None:
+        for first_line, request in parts:
+            try:
+                result = self.llm.run_analysis(request)
+            except AnalysisCancelled:
+                return
+            except Exception:
+                # Leave the paragraph marked; an explicit run reports the error.
+                continue
+            self._worker_results.put(
+                _WorkerEvent(
+                    "auto_check", generation, (first_line, request.source_text, result)
+                )
+            )
+
+    def _merge_auto_check(
+        self, first_line: int, text: str, result: CompileResult
+    ) -> None:
+        """Replace one checked paragraph's diagnostics and rejections.
+
+        The document's language and raw response stay, as do its diagnostics
+        and rejections outside the paragraph. A stale result is carried over
+        to the current text first. Without a result to merge into, the
+        paragraph's result stands alone until the other paragraphs are checked
+        or run.
+        """
+
+        last_line = first_line + text.count("\n")
+        if self.text.get(f"{first_line}.0", f"{last_line}.end") != text:
+            return
+        self._catch_up_tracking()
+        if self._last_result is not None and self._result_stale:
+            self._reanchor_stale_result()
+        chunk = Chunk(text, first_line - 1, 0)
+        fresh = [remap_diagnostic(item, chunk) for item in result.diagnostics]
+        previous = self._last_result
+        if previous is None:
+            self._forget_rejected()
+            previous = replace(result, diagnostics=(), rejected=())
+            kept: list[Diagnostic] = []
+        else:
+            kept = [
+                diagnostic
+                for diagnostic in self._live.values()
+                if not first_line <= diagnostic.line <= last_line
+            ]
+        rejected = []
+        for name, rejection in self._rejected:
+            if name is not None and first_line <= self._mark_line(name) <= last_line:
+                self.text.mark_unset(name)
+            else:
+                rejected.append((name, rejection))
+        paragraph = SourceIndex.of(text)
+        for rejection in result.rejected:
+            line = first_line + (rejection_line(rejection, paragraph) or 1) - 1
+            rejected.append((self._line_mark("rejected", line), rejection))
+        rejected.sort(
+            key=lambda entry: 0 if entry[0] is None else self._mark_line(entry[0])
+        )
+        self._rejected = rejected
+        self._last_result = replace(
+            previous,
+            diagnostics=canonical_diagnostics([*kept, *fresh]),
+            rejected=tuple(rejection for _name, rejection in rejected),
+        )
+        self._last_source = SourceIndex.of(self.text.get("1.0", "end-1c"))
+        self._result_stale = False
+        self._anchor_diagnostics()
+        self._populate_diagnostics(self._last_result)
+        self._render_last_result()
+        self.status_var.set(self._result_status(self._last_result))
+        checked = [
+            pair
+            for pair in self._dirty_ranges
+            if first_line <= self._mark_line(pair[0]) <= last_line
+        ]
+        for pair in checked:
+            self.text.mark_unset(*pair)
+            self._dirty_ranges.remove(pair)
+
+    def _reanchor_stale_result(self) -> None:
+        """Carry a result analyzed from older text over to the current text.
+
+        Diagnostics and rejections on lines unchanged since move to where those
+        lines are now. Those on edited lines are dropped; their paragraphs are
+        marked for checking.
+        """
+
+        current = self.text.get("1.0", "end-1c")
+        matcher = difflib.SequenceMatcher(
+            None, self._last_source.text.split("\n"), current.split("\n")
+        )
+        moved = {
+            old + offset + 1: new + offset + 1
+            for old, new, size in matcher.get_matching_blocks()
+            for offset in range(size)
+        }
+        diagnostics = [
+            replace(diagnostic, line=moved[diagnostic.line])
+            for diagnostic in self._last_result.diagnostics
+            if diagnostic.line in moved
+        ]
+        rejected = []
+        for name, rejection in self._rejected:
+            line = rejection_line(rejection, self._last_source)
+            if name is not None or line is None:
+                rejected.append((name, rejection))
+            elif line in moved:
+                rejected.append((self._line_mark("rejected", moved[line]), rejection))
+        self._rejected = rejected
+        self._last_result = replace(
+            self._last_result,
+            diagnostics=canonical_diagnostics(diagnostics),
+            rejected=tuple(rejection for _name, rejection in rejected),
+        )
+        self._last_source = SourceIndex.of(current)
+        self._result_stale = False
+        self._anchor_diagnostics()
+
     def update_cursor_status(self, _event=None) -> None:
         line_text, column_text = self.text.index("insert").split(".")
         self.position_var.set(
@@ -682,25 +1210,39 @@ class TypoCompilerApp(tk.Tk):
         elif self._result_stale:
             self.status_var.set(t("status.results_stale"))
         elif self._last_result is not None:
-            if self._last_result.clean:
-                self.status_var.set(t("run.no_output"))
-            else:
-                self.status_var.set(
-                    t("status.issue_count", count=len(self._last_result.diagnostics))
-                )
+            self.status_var.set(self._result_status(self._last_result))
         else:
             self._set_ready_status()
 
+    def _result_status(self, result: CompileResult) -> str:
+        edited = 0 if self._result_stale else len(result.diagnostics) - len(self._live)
+        if edited:
+            return t("status.issues_edited", count=len(self._live), edited=edited)
+        if result.rejected:
+            return t(
+                "status.issue_count_rejected",
+                count=len(result.diagnostics),
+                rejected=len(result.rejected),
+            )
+        if result.clean:
+            return t("run.no_output")
+        return t("status.issue_count", count=len(result.diagnostics))
+
     def _invalidate_run(self) -> None:
         if self._running:
+            self._abort_active_request()
             self._generation += 1
             self._set_running(False)
 
     def _clear_results(self) -> None:
         self._invalidate_run()
+        self._cancel_auto_check()
+        self._forget_dirty()
+        self._forget_rejected()
         self._last_result = None
-        self._last_source = ""
+        self._last_source = SourceIndex("")
         self._result_stale = False
+        self._forget_anchors()
         self._clear_highlights()
         for item in self.issues.get_children():
             self.issues.delete(item)
@@ -752,8 +1294,32 @@ class TypoCompilerApp(tk.Tk):
         self.set_clean_state()
         self.update_title()
         self._set_ready_status()
+        self._show_cached_result()
         self.text.focus_set()
 
+    def _show_cached_result(self) -> None:
+        """Show an earlier analysis of identical text without any network IO."""
+
+        source = self.text.get("1.0", "end-1c")
+        style = self.default_style_var.get()
+        if not source.strip() or not style:
+            return
+        try:
+            request = self.llm.prepare_document_analysis(style, source)
+        except (TypeError, ValueError):
+            return
+        result = self.llm.cached_result(request)
+        if result is None:
+            return
+        self._last_result = result
+        self._last_source = SourceIndex.of(source)
+        self._result_stale = False
+        self._pin_rejected(result)
+        self._anchor_diagnostics()
+        self._populate_diagnostics(result)
+        self._render_last_result()
+        self.status_var.set(t("status.cached", count=len(result.diagnostics)))
+
     def save_file(self) -> bool:
         if not self.current_file:
             return self.save_file_as()
@@ -818,13 +1384,18 @@ class TypoCompilerApp(tk.Tk):
             messagebox.showwarning(APP_NAME, t("warn.no_style"))
             return
         try:
-            request = self.llm.prepare_analysis(style, source)
+            request = self.llm.prepare_document_analysis(style, source)
         except (TypeError, ValueError) as error:
             messagebox.showerror(APP_NAME, t("msg.llm_failed", err=str(error)))
             return
 
+        self._abort_active_request()
+        self._cancel_auto_check()
         self._generation += 1
         request_id = self._generation
+        self._active_request = request
+        self._streamed = []
+        self._edited_during_run = False
         self._set_running(True)
         self.status_var.set(t("run.running"))
         threading.Thread(
@@ -837,10 +1408,20 @@ class TypoCompilerApp(tk.Tk):
         """Compatibility alias: running now stays in the main workspace."""
         self.run_analysis()
 
-    def _do_analysis(self, request_id: int, request: AnalysisRequest) -> None:
+    def _do_analysis(
+        self, request_id: int, request: AnalysisRequest | ChunkedAnalysisRequest
+    ) -> None:
+        def on_diagnostic(diagnostic: Diagnostic) -> None:
+            self._worker_results.put(
+                _WorkerEvent("diagnostic", request_id, (diagnostic,))
+            )
+
         try:
-            result = self.llm.run_analysis(request)
+            result = self.llm.run_analysis(request, on_diagnostic=on_diagnostic)
             error = None
+        except AnalysisCancelled:
+            # The UI already moved on; there is no outcome left to report.
+            return
         except Exception as caught:
             result = None
             error = str(caught)
@@ -851,30 +1432,40 @@ class TypoCompilerApp(tk.Tk):
     def _finish_analysis(
         self,
         request_id: int,
-        request: AnalysisRequest,
+        request: AnalysisRequest | ChunkedAnalysisRequest,
         result: CompileResult | None,
         error: str | None,
     ) -> None:
         if request_id != self._generation:
             return
+        self._active_request = None
         self._set_running(False)
         if error is not None or result is None:
+            if self._streamed:
+                self._restore_last_diagnostics()
+            self._schedule_auto_check()
             self.status_var.set(t("status.analysis_failed"))
             messagebox.showerror(
                 APP_NAME, t("msg.llm_failed", err=error or "Unknown error")
             )
             return
+        self._streamed = []
         self._last_result = result
-        self._last_source = request.source_text
+        self._last_source = SourceIndex.of(request.source_text)
         self._result_stale = self.text.get("1.0", "end-1c") != request.source_text
+        self._pin_rejected(result)
+        if self._result_stale:
+            # Paragraphs edited during the run are still marked for checking.
+            self._schedule_auto_check()
+        else:
+            self._forget_dirty()
+        self._anchor_diagnostics()
         self._populate_diagnostics(result)
         self._render_last_result()
         if self._result_stale:
             self.status_var.set(t("status.results_stale"))
-        elif result.clean:
-            self.status_var.set(t("run.no_output"))
         else:
-            self.status_var.set(t("status.issue_count", count=len(result.diagnostics)))
+            self.status_var.set(self._result_status(result))
 
     def _set_running(self, running: bool) -> None:
         self._running = running
@@ -882,11 +1473,22 @@ class TypoCompilerApp(tk.Tk):
         self.cancel_btn.configure(state="normal" if running else "disabled")
         self.style_box.configure(state="disabled" if running else "readonly")
 
+    def _abort_active_request(self) -> None:
+        """Close the running analysis's connections instead of letting it finish."""
+
+        if self._active_request is not None:
+            self._active_request.cancel_token.cancel()
+            self._active_request = None
+
     def cancel_analysis(self) -> None:
         if not self._running:
             return
+        self._abort_active_request()
         self._generation += 1
         self._set_running(False)
+        if self._streamed:
+            self._restore_last_diagnostics()
+        self._schedule_auto_check()
         self.status_var.set(t("status.cancelled"))
 
     def _populate_diagnostics(self, result: CompileResult) -> None:
@@ -894,18 +1496,48 @@ class TypoCompilerApp(tk.Tk):
             self.issues.delete(item)
         self._clear_highlights()
         for index, diagnostic in enumerate(result.diagnostics):
+            current = self._live.get(index)
+            edited = current is None and not self._result_stale
             self.issues.insert(
                 "",
                 "end",
                 iid=str(index),
                 values=(
-                    diagnostic.line,
+                    (current or diagnostic).line,
                     diagnostic.severity,
                     diagnostic.message,
                 ),
+                tags=("edited",) if edited else (),
             )
-            if not self._result_stale:
-                self._highlight_diagnostic(diagnostic)
+            if current is not None:
+                self._highlight_diagnostic(current)
+
+    def _show_streamed_diagnostic(self, diagnostic: Diagnostic) -> None:
+        """Show a diagnostic from a still-running streamed analysis."""
+
+        if not self._streamed:
+            for item in self.issues.get_children():
+                self.issues.delete(item)
+            self._clear_highlights()
+        self.issues.insert(
+            "",
+            "end",
+            iid=f"stream-{len(self._streamed)}",
+            values=(diagnostic.line, diagnostic.severity, diagnostic.message),
+        )
+        self._streamed.append(diagnostic)
+        if not self._edited_during_run:
+            self._highlight_diagnostic(diagnostic)
+        self.status_var.set(t("status.streaming", count=len(self._streamed)))
+
+    def _restore_last_diagnostics(self) -> None:
+        self._streamed = []
+        if self._last_result is not None:
+            self._populate_diagnostics(self._last_result)
+            return
+        for item in self.issues.get_children():
+            self.issues.delete(item)
+        self._clear_highlights()
 
     def _highlight_diagnostic(self, diagnostic: Diagnostic) -> None:
         start = f"{diagnostic.line}.{diagnostic.start_column - 1}"
@@ -920,10 +1552,15 @@ class TypoCompilerApp(tk.Tk):
     def _render_last_result(self) -> None:
         if self._last_result is None:
             return
+        result = self._last_result
+        if not self._result_stale:
+            self._catch_up_tracking()
+            if self._source_outdated:
+                self._last_source = SourceIndex.of(self.text.get("1.0", "end-1c"))
+                self._source_outdated = False
+            result = replace(result, diagnostics=tuple(self._live.values()))
         output = render_diagnostics(
-            self.default_style_var.get(),
-            self._last_result,
-            self._last_source,
+            self.default_style_var.get(), result, self._last_source
         )
         self._set_output(output or t("run.no_output"))
 
@@ -935,12 +1572,21 @@ class TypoCompilerApp(tk.Tk):
 
     def jump_to_selected_diagnostic(self, _event=None):
         selected = self.issues.selection()
-        if not selected or self._last_result is None:
+        if selected and selected[0].startswith("stream-"):
+            if self._edited_during_run:
+                self.status_var.set(t("status.results_stale"))
+                return "break"
+            diagnostic = self._streamed[int(selected[0].removeprefix("stream-"))]
+        elif not selected or self._last_result is None:
             return "break"
-        if self._result_stale:
+        elif self._result_stale:
             self.status_var.set(t("status.results_stale"))
             return "break"
-        diagnostic = self._last_result.diagnostics[int(selected[0])]
+        else:
+            diagnostic = self._live.get(int(selected[0]))
+            if diagnostic is None:
+                self.status_var.set(t("status.diagnostic_edited"))
+                return "break"
         index = f"{diagnostic.line}.{diagnostic.start_column - 1}"
         self.text.mark_set("insert", index)
         self.text.see(index)
@@ -979,18 +1625,22 @@ class TypoCompilerApp(tk.Tk):
         if not self.confirm_discard():
             return
         self._closing = True
+        self._abort_active_request()
+        self._cancel_auto_check()
         self._generation += 1
         self._test_generation += 1
-        if self._worker_poll_id is not None:
-            try:
-                self.after_cancel(self._worker_poll_id)
-            except tk.TclError:
-                pass
-            self._worker_poll_id = None
+        for pending in (self._worker_poll_id, self._track_id, self._output_refresh_id):
+            if pending is not None:
+                try:
+                    self.after_cancel(pending)
+                except tk.TclError:
+                    pass
+        self._worker_poll_id = self._track_id = self._output_refresh_id = None
         try:
             unregister_listener(self.on_lang_changed)
         except ValueError:
             pass
+        self.llm.close()
         self.destroy()
 
 
@@ -1037,6 +1687,7 @@ class LLMSettingsDialog(tk.Toplevel):
         self.timeout = tk.IntVar(
             value=self._safe_int(cfg.get_nested("llm", "timeout_seconds"), 60)
         )
+        self.stream = tk.BooleanVar(value=cfg.get_nested("llm", "stream") is True)
 
         row = 0
         self.lbl_base = ttk.Label(frm, text=t("llm.base_url"))
@@ -1114,6 +1765,11 @@ class LLMSettingsDialog(tk.Toplevel):
             row=row, column=1, sticky="w", **pad
         )
         row += 1
+        self.stream_check = ttk.Checkbutton(
+            frm, text=t("llm.stream"), variable=self.stream
+        )
+        self.stream_check.grid(row=row, column=1, sticky="w", **pad)
+        row += 1
 
         self.security_note = ttk.Label(
             frm, text=t("llm.security_note"), foreground="red", wraplength=560
@@ -1180,6 +1836,7 @@ class LLMSettingsDialog(tk.Toplevel):
                 "max_tokens": max_tokens,
                 "token_parameter": self.token_parameter.get(),
                 "timeout_seconds": timeout,
+                "stream": bool(self.stream.get()),
             }
         }
         try:
@@ -1200,6 +1857,7 @@ class LLMSettingsDialog(tk.Toplevel):
         self.lbl_max.configure(text=t("llm.max_tokens"))
         self.lbl_token_parameter.configure(text=t("llm.token_parameter"))
         self.lbl_timeout.configure(text=t("llm.timeout"))
+        self.stream_check.configure(text=t("llm.stream"))
         self.key_environment.configure(text=t("llm.key_source.environment"))
         self.key_local.configure(text=t("llm.key_source.local"))
         self.security_note.configure(text=t("llm.security_note"))
@@ -1212,7 +1870,12 @@ class LLMSettingsDialog(tk.Toplevel):
             overrides = self._build_llm_overrides()
             if overrides is None:
                 return
-            self.cfg.update({"llm": overrides["llm"]})
+            # Keep settings that the dialog does not edit, such as chunking.
+            llm = self.cfg.get("llm", {})
+            if not isinstance(llm, dict):
+                llm = {}
+            llm.update(overrides["llm"])
+            self.cfg.update({"llm": llm})
             messagebox.showinfo(APP_NAME, t("msg.config_saved"))
         except Exception as e:
             messagebox.showerror(APP_NAME, t("msg.config_failed", err=str(e)))
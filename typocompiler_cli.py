@@ -0,0 +1,352 @@
+"""Headless command line for reviewing files without the Tk interface."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from collections.abc import Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+
+from circuit_breaker import CIRCUIT_PATH, CircuitBreakers
+from config_manager import ConfigManager
+from diagnostics import SEVERITIES, CompileResult, render_diagnostics
+from file_ops import read_document, write_text_utf8
+from http_pool import ConnectionPool
+from llm_client import LLMClient
+from result_cache import ResultCache
+from styles import StyleManager
+
+DEFAULT_EXTENSIONS = (".md", ".markdown", ".mdx", ".rst", ".txt")
+DEFAULT_JOBS = 8
+MAX_JOBS = 64
+_SEVERITY_RANK = {"hint": 0, "info": 1, "warning": 2, "error": 3}
+EXIT_CLEAN = 0
+EXIT_FINDINGS = 1
+EXIT_FAILURE = 2
+EXIT_INTERRUPTED = 130
+
+
+@dataclass(frozen=True)
+class FileReport:
+    """The outcome of checking one file: a result, or the reason it failed."""
+
+    path: str
+    source_text: str = ""
+    result: CompileResult | None = None
+    error: str = ""
+
+
+def iter_files(paths: Sequence[str], extensions: Sequence[str]) -> Iterator[str]:
+    """Yield named files and matching files under named folders, in order.
+
+    Folders are walked in sorted order and hidden entries are skipped, so the
+    same tree always yields the same file list.
+    """
+
+    suffixes = tuple(extension.casefold() for extension in extensions)
+    seen: set[str] = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, folders, files in os.walk(path):
+                folders[:] = sorted(
+                    name for name in folders if not name.startswith(".")
+                )
+                for name in sorted(files):
+                    if name.startswith(".") or not name.casefold().endswith(suffixes):
+                        continue
+                    candidate = os.path.join(root, name)
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        yield candidate
+        elif path not in seen:
+            # Explicit files are checked whatever their extension; missing ones fail.
+            seen.add(path)
+            yield path
+
+
+def check_file(client: LLMClient, style_name: str, path: str) -> FileReport:
+    try:
+        source_text = read_document(path).text
+    except (OSError, UnicodeError, ValueError) as error:
+        return FileReport(path, error=str(error) or type(error).__name__)
+    if not source_text.strip():
+        return FileReport(path, source_text, CompileResult("und", ()))
+    try:
+        request = client.prepare_document_analysis(style_name, source_text)
+        result = client.run_analysis(request)
+    except Exception as error:
+        return FileReport(path, source_text, error=str(error) or type(error).__name__)
+    return FileReport(path, source_text, result)
+
+
+def check_files(
+    client: LLMClient, style_name: str, paths: Sequence[str]
+) -> list[FileReport]:
+    """Check several files, packing the short ones into shared requests."""
+
+    reports: dict[str, FileReport] = {}
+    documents: dict[str, str] = {}
+    for path in paths:
+        try:
+            source_text = read_document(path).text
+        except (OSError, UnicodeError, ValueError) as error:
+            reports[path] = FileReport(path, error=str(error) or type(error).__name__)
+            continue
+        if source_text.strip():
+            documents[path] = source_text
+        else:
+            reports[path] = FileReport(path, source_text, CompileResult("und", ()))
+    try:
+        request = client.prepare_batch_analysis(style_name, documents)
+    except ValueError:
+        # One unusable file must not cost the others their batch.
+        return [check_file(client, style_name, path) for path in paths]
+    for path, outcome in client.run_batch_analysis(request).items():
+        if isinstance(outcome, CompileResult):
+            reports[path] = FileReport(path, documents[path], outcome)
+        else:
+            error = str(outcome) or type(outcome).__name__
+            reports[path] = FileReport(path, documents[path], error=error)
+    return [reports[path] for path in paths]
+
+
+def _positive_jobs(value: str) -> int:
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be an integer") from None
+    if not 1 <= jobs <= MAX_JOBS:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_JOBS}")
+    return jobs
+
+
+def _extensions(value: str) -> tuple[str, ...]:
+    extensions = tuple(
+        item if item.startswith(".") else f".{item}"
+        for item in (part.strip() for part in value.split(","))
+        if item
+    )
+    if not extensions:
+        raise argparse.ArgumentTypeError("needs at least one extension")
+    return extensions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="typocompiler-cli",
+        description="Review text files and print compiler-style diagnostics.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser(
+        "check",
+        help="analyze files and folders",
+        description=(
+            "Analyze files and folders concurrently. Output for each file is "
+            "printed as soon as it finishes. Exit status is 0 when no diagnostic "
+            "reaches --fail-on, 1 when one does, and 2 when a file could not be "
+            "analyzed."
+        ),
+    )
+    check.add_argument("paths", nargs="+", metavar="PATH")
+    check.add_argument(
+        "-p",
+        "--profile",
+        help="analysis profile; defaults to the configured default profile",
+    )
+    check.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_jobs,
+        default=DEFAULT_JOBS,
+        help=f"files analyzed at the same time (default {DEFAULT_JOBS})",
+    )
+    check.add_argument(
+        "--extensions",
+        type=_extensions,
+        default=DEFAULT_EXTENSIONS,
+        help="comma-separated suffixes searched in folders "
+        f"(default {','.join(DEFAULT_EXTENSIONS)})",
+    )
+    check.add_argument(
+        "--fail-on",
+        choices=sorted(SEVERITIES, key=_SEVERITY_RANK.__getitem__),
+        default="error",
+        help="lowest severity that makes the exit status 1 (default error)",
+    )
+    check.add_argument(
+        "--config",
+        help="configuration file; defaults to TYPOCOMPILER_CONFIG_PATH or "
+        "~/.typocompiler/config.json",
+    )
+    check.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="neither read nor write the result cache",
+    )
+    check.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="write LLM call metrics when done: JSON lines if FILE ends in "
+        ".jsonl, Prometheus text otherwise",
+    )
+    return parser
+
+
+def _client(cfg: ConfigManager, jobs: int, use_cache: bool) -> LLMClient:
+    chunking = cfg.get_nested("llm", "chunking", default={}) or {}
+    chunk_workers = chunking.get("max_workers", 4) if isinstance(chunking, dict) else 4
+    cache = None
+    if use_cache and cfg.get_nested("cache", "enabled", default=True) is True:
+        megabytes = cfg.get_nested("cache", "max_megabytes", default=64)
+        cache = ResultCache(max_bytes=megabytes * 1024 * 1024)
+    # Each file may fan out into chunk requests; size the pool so none of them
+    # spend their timeout waiting for a connection.
+    pool = ConnectionPool(max_per_host=jobs * max(1, chunk_workers))
+    return LLMClient(
+        cfg,
+        StyleManager(cfg),
+        pool=pool,
+        cache=cache,
+        circuits=CircuitBreakers(CIRCUIT_PATH),
+    )
+
+
+def _print_report(
+    report: FileReport, style_name: str, fail_rank: int, counts: dict[str, int]
+) -> None:
+    if report.result is None:
+        counts["failed"] += 1
+        print(f"{report.path}: error: {report.error}", file=sys.stderr, flush=True)
+        return
+    for rejection in report.result.rejected:
+        print(
+            f"{report.path}: warning: left out invalid diagnostic "
+            f"{rejection.index + 1}: {rejection.reason}",
+            file=sys.stderr,
+            flush=True,
+        )
+    diagnostics = report.result.diagnostics
+    for diagnostic in diagnostics:
+        counts[diagnostic.severity] += 1
+        if _SEVERITY_RANK[diagnostic.severity] >= fail_rank:
+            counts["failing"] += 1
+    if diagnostics:
+        output = render_diagnostics(
+            style_name, report.result, report.source_text, filename=report.path
+        )
+        print(output, end="\n\n", flush=True)
+
+
+def run_check(args: argparse.Namespace) -> int:
+    cfg = ConfigManager(args.config)
+    styles_available = StyleManager(cfg).names
+    style_name = args.profile or cfg.get("default_style", "Python")
+    if style_name not in styles_available:
+        print(
+            f"typocompiler-cli: error: no analysis profile named {style_name!r}; "
+            f"choose from {', '.join(styles_available)}",
+            file=sys.stderr,
+        )
+        return EXIT_FAILURE
+    files = list(iter_files(args.paths, args.extensions))
+    fail_rank = _SEVERITY_RANK[args.fail_on]
+    counts = dict.fromkeys((*SEVERITIES, "failed", "failing"), 0)
+    client = _client(cfg, args.jobs, not args.no_cache)
+    batching = cfg.get_nested("llm", "batching", default={}) or {}
+    batch_size = 1
+    if isinstance(batching, dict) and batching.get("enabled") is True:
+        batch_size = batching.get("max_documents", 16)
+    executor = ThreadPoolExecutor(
+        max_workers=args.jobs, thread_name_prefix="typocompiler-check"
+    )
+    pending: set[Future[FileReport | list[FileReport]]] = set()
+    queued = iter(files)
+    try:
+        # Keep a bounded window of submitted files so a huge tree is not read
+        # into memory up front, and print each report as soon as it is ready.
+        while True:
+            while len(pending) < args.jobs * 2:
+                group = list(islice(queued, batch_size))
+                if not group:
+                    break
+                if batch_size == 1:
+                    future = executor.submit(check_file, client, style_name, group[0])
+                else:
+                    future = executor.submit(check_files, client, style_name, group)
+                pending.add(future)
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                reports = future.result()
+                if isinstance(reports, FileReport):
+                    reports = [reports]
+                for report in reports:
+                    _print_report(report, style_name, fail_rank, counts)
+    except KeyboardInterrupt:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        client.close()
+        print("typocompiler-cli: interrupted", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    executor.shutdown()
+    client.close()
+
+    print(
+        f"Checked {len(files)} files: {counts['error']} errors, "
+        f"{counts['warning']} warnings, {counts['info']} info, "
+        f"{counts['hint']} hints, {counts['failed']} failed.",
+        file=sys.stderr,
+    )
+    retries = client.retry_stats.stats()
+    if retries["retries"]:
+        print(
+            f"Retried {retries['retries']} transient failures: "
+            f"{retries['recovered']} requests recovered, "
+            f"{retries['exhausted']} gave up.",
+            file=sys.stderr,
+        )
+    usage = client.usage_stats.stats()
+    if usage["cached_tokens"]:
+        print(
+            f"Reused {usage['cached_tokens']} of {usage['prompt_tokens']} prompt "
+            "tokens from the provider's prompt cache.",
+            file=sys.stderr,
+        )
+    if client.circuits.rejected:
+        print(
+            f"Skipped {client.circuits.rejected} attempts to LLM endpoints "
+            "paused after repeated failures.",
+            file=sys.stderr,
+        )
+    if args.metrics:
+        if args.metrics.lower().endswith(".jsonl"):
+            exported = client.metrics.json_lines()
+        else:
+            exported = client.metrics.prometheus_text()
+        try:
+            write_text_utf8(args.metrics, exported)
+        except OSError as error:
+            print(
+                f"typocompiler-cli: error: cannot write metrics: {error}",
+                file=sys.stderr,
+            )
+            return EXIT_FAILURE
+    if counts["failed"]:
+        return EXIT_FAILURE
+    return EXIT_FINDINGS if counts["failing"] else EXIT_CLEAN
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "check":
+        return run_check(args)
+    return EXIT_FAILURE
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())